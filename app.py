@@ -10,17 +10,47 @@ import json
 import zipfile
 import tempfile
 import base64
+import io
+import struct
 import hashlib
-from flask import Flask, render_template, request, jsonify, send_file
+import html
+import collections
+import heapq
+import math
+import sqlite3
+import concurrent.futures
+import contextlib
+import itertools
+import random
+import signal
+import gzip
+import zlib
+import abc
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 from werkzeug.utils import secure_filename
-from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 from flasgger import Swagger
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; incremental builds then only lock within a process
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow app icons are generated by icons_launcher
+    Image = None
+
 # ---------------- Logging Configuration ----------------
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
@@ -35,28 +65,11 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 app = Flask(__name__, template_folder=os.path.join(BASE_DIR, 'templates', 'ui'))
 app.config['SECRET_KEY'] = 'swab-secret-key-change-in-production'
-app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
-app.config['BUILD_FOLDER'] = os.path.join(BASE_DIR, 'builds')
+app.config['UPLOAD_FOLDER'] = os.getenv('SWAB_UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
+app.config['BUILD_FOLDER'] = os.getenv('SWAB_BUILD_FOLDER', os.path.join(BASE_DIR, 'builds'))
 app.config['FLUTTER_TEMPLATE'] = os.path.join(BASE_DIR, 'templates', 'webview_app')
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
-# ===== Webhook Helper =====
-
-def send_webhook_notification(webhook_url, payload):
-    """Send webhook notification in a safe, non-blocking way."""
-    if not webhook_url:
-        return
-
-    try:
-        response = requests.post(
-            webhook_url,
-            json=payload,
-            timeout=5
-        )
-        response.raise_for_status()
-    except Exception as e:
-        app.logger.warning(f"Webhook notification failed: {e}")
-
 # ---------------- Swagger Configuration ----------------
 
 swagger_config = {
@@ -90,26 +103,287 @@ def handle_exception(e):
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['BUILD_FOLDER'], exist_ok=True)
 
-# Store build progress
-build_progress = {}
+# ---------------- Build State Store ----------------
+
+TERMINAL_STATUSES = ('completed', 'error')
+
+
+class BuildStore(abc.ABC):
+    """Base class for build state backends.
+
+    Every backend keeps the latest state of each build plus an append-only
+    history of its stage transitions. Finished builds older than
+    ``retention`` seconds are evicted opportunistically on write.
+    """
+
+    EVICT_INTERVAL = 600
+
+    def __init__(self, retention):
+        self.retention = retention
+        self._last_evict = 0.0
+        self._changed = threading.Condition()
+        self.version = 0
+
+    def set(self, build_id, state, record=True):
+        """Replace the current state of a build, appending it to the history if ``record``"""
+        now = time.time()
+        self._write(build_id, dict(state), now, record)
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+        if state.get('status') in TERMINAL_STATUSES and now - self._last_evict > self.EVICT_INTERVAL:
+            self._last_evict = now
+            self.evict(now - self.retention)
+
+    def wait_for_update(self, version, timeout):
+        """Block until a write from this process bumps ``version`` or ``timeout`` expires.
+
+        Writes made by other processes are not signalled, so callers must
+        re-read the state after every timeout.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+
+    @abc.abstractmethod
+    def get(self, build_id):
+        """Return the current state of a build, None if it is unknown"""
+
+    @abc.abstractmethod
+    def history(self, build_id):
+        """Return the recorded stage transitions of a build, oldest first"""
+
+    @abc.abstractmethod
+    def evict(self, cutoff):
+        """Drop finished builds last updated before ``cutoff`` and return how many"""
+
+    @abc.abstractmethod
+    def _write(self, build_id, state, now, record):
+        """Store ``state`` as the current state, appending it to the history if ``record``"""
+
+    @staticmethod
+    def _event(state, now):
+        return {
+            'status': state.get('status'),
+            'progress': state.get('progress'),
+            'message': state.get('message'),
+            'created_at': now,
+        }
+
+
+class MemoryBuildStore(BuildStore):
+    """Process-local build state, lost on restart"""
+
+    def __init__(self, retention):
+        super().__init__(retention)
+        self._lock = threading.Lock()
+        self._builds = {}
+        self._history = {}
+
+    def get(self, build_id):
+        with self._lock:
+            entry = self._builds.get(build_id)
+            return dict(entry['state']) if entry else None
+
+    def history(self, build_id):
+        with self._lock:
+            return list(self._history.get(build_id, []))
+
+    def evict(self, cutoff):
+        with self._lock:
+            expired = [
+                build_id for build_id, entry in self._builds.items()
+                if entry['updated_at'] < cutoff and entry['state'].get('status') in TERMINAL_STATUSES
+            ]
+            for build_id in expired:
+                del self._builds[build_id]
+                self._history.pop(build_id, None)
+        return len(expired)
+
+    def _write(self, build_id, state, now, record):
+        with self._lock:
+            entry = self._builds.setdefault(build_id, {'created_at': now})
+            entry['state'] = state
+            entry['updated_at'] = now
+            if record:
+                self._history.setdefault(build_id, []).append(self._event(state, now))
+
+
+class SQLiteBuildStore(BuildStore):
+    """Build state shared by every process on the host through an SQLite database in WAL mode"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS builds (
+            build_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            state TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_builds_status ON builds (status);
+        CREATE INDEX IF NOT EXISTS idx_builds_created_at ON builds (created_at);
+        CREATE TABLE IF NOT EXISTS build_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            build_id TEXT NOT NULL,
+            status TEXT,
+            progress INTEGER,
+            message TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_build_events_build_id ON build_events (build_id);
+    """
+
+    def __init__(self, path, retention):
+        super().__init__(retention)
+        self.path = path
+        self._local = threading.local()
+        # The schema is created over a short-lived connection, so none is open at import time
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use in each process"""
+        conn = getattr(self._local, 'conn', None)
+        # Never reuse a connection inherited through fork, e.g. by preloaded gunicorn workers
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, build_id):
+        row = self._connect().execute(
+            'SELECT state FROM builds WHERE build_id = ?', (build_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def history(self, build_id):
+        rows = self._connect().execute(
+            'SELECT status, progress, message, created_at FROM build_events '
+            'WHERE build_id = ? ORDER BY id', (build_id,)
+        ).fetchall()
+        return [
+            {'status': status, 'progress': progress, 'message': message, 'created_at': created_at}
+            for status, progress, message, created_at in rows
+        ]
+
+    def evict(self, cutoff):
+        conn = self._connect()
+        with conn:
+            expired = [row[0] for row in conn.execute(
+                f'SELECT build_id FROM builds WHERE updated_at < ? '
+                f'AND status IN ({",".join("?" * len(TERMINAL_STATUSES))})',
+                (cutoff, *TERMINAL_STATUSES)
+            )]
+            conn.executemany('DELETE FROM build_events WHERE build_id = ?', [(b,) for b in expired])
+            conn.executemany('DELETE FROM builds WHERE build_id = ?', [(b,) for b in expired])
+        return len(expired)
+
+    def _write(self, build_id, state, now, record):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO builds (build_id, status, state, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(build_id) DO UPDATE SET '
+                'status = excluded.status, state = excluded.state, updated_at = excluded.updated_at',
+                (build_id, state.get('status', ''), json.dumps(state), now, now)
+            )
+            if record:
+                event = self._event(state, now)
+                conn.execute(
+                    'INSERT INTO build_events (build_id, status, progress, message, created_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (build_id, event['status'], event['progress'], event['message'], now)
+                )
+
+
+def create_build_store():
+    """Create the build state backend selected by SWAB_STATE_BACKEND"""
+    backend = os.getenv('SWAB_STATE_BACKEND', 'memory').lower()
+    retention = int(os.getenv('SWAB_BUILD_RETENTION', str(7 * 24 * 3600)))
+
+    if backend == 'sqlite':
+        path = os.getenv('SWAB_STATE_DB', os.path.join(app.config['BUILD_FOLDER'], 'state.db'))
+        return SQLiteBuildStore(path, retention)
+    if backend != 'memory':
+        raise ValueError(f'Unknown SWAB_STATE_BACKEND: {backend}')
+    return MemoryBuildStore(retention)
+
+
+build_store = create_build_store()
 
 # SWAB file encryption key derived from machine-specific identifier
 SWAB_SALT = b'swab_project_file_v1'
 
-def get_machine_key():
-    """Generate a machine-specific encryption key"""
-    # Combine multiple machine identifiers for uniqueness
-    machine_id = f"{os.getenv('USER', 'user')}_{os.path.expanduser('~')}_{BASE_DIR}"
-    machine_hash = hashlib.sha256(machine_id.encode()).digest()
-
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=SWAB_SALT,
-        iterations=480000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(machine_hash))
-    return Fernet(key)
+# Named key derivation parameters. To rotate, add a new version and point
+# SWAB_KEY_VERSION at it: new files use the current version while files
+# written with any older version can still be opened.
+SWAB_KEY_VERSIONS = {
+    'v1': {'salt': SWAB_SALT, 'iterations': 480000},
+}
+SWAB_KEY_VERSION = os.getenv('SWAB_KEY_VERSION', 'v1')
+
+# PBKDF2 is deliberately slow, so each derived key is cached for the process lifetime
+_machine_keys = {}
+_machine_keys_lock = threading.Lock()
+
+def _get_key_material(version):
+    """Return the cached keys of ``version``, deriving them on first use"""
+    keys = _machine_keys.get(version)
+    if keys is not None:
+        return keys
+
+    with _machine_keys_lock:
+        keys = _machine_keys.get(version)
+        if keys is None:
+            params = SWAB_KEY_VERSIONS[version]
+
+            # Combine multiple machine identifiers for uniqueness
+            machine_id = f"{os.getenv('USER', 'user')}_{os.path.expanduser('~')}_{BASE_DIR}"
+            machine_hash = hashlib.sha256(machine_id.encode()).digest()
+
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=params['salt'],
+                iterations=params['iterations'],
+            )
+            master_key = kdf.derive(machine_hash)
+
+            # v2 containers use an independent AES-GCM key expanded from the same secret
+            stream_key = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=None,
+                info=b'swab-project-stream-v2',
+            ).derive(master_key)
+
+            keys = _machine_keys[version] = {
+                'fernet': Fernet(base64.urlsafe_b64encode(master_key)),
+                'stream': AESGCM(stream_key),
+            }
+    return keys
+
+def get_machine_key(version=None):
+    """Return the machine-specific Fernet key for ``version``, deriving it once"""
+    return _get_key_material(version or SWAB_KEY_VERSION)['fernet']
+
+def get_stream_key(version=None):
+    """Return the machine-specific AES-GCM key used by .swab v2 containers"""
+    return _get_key_material(version or SWAB_KEY_VERSION)['stream']
+
+def prewarm_machine_keys():
+    """Derive every key version up front so the first save/open request is not slowed down"""
+    started = time.time()
+    for version in SWAB_KEY_VERSIONS:
+        _get_key_material(version)
+    logger.info(f"Derived {len(SWAB_KEY_VERSIONS)} project key(s) in {time.time() - started:.2f}s")
 
 def encrypt_data(data: bytes) -> bytes:
     """Encrypt data using machine-specific key"""
@@ -117,14 +391,318 @@ def encrypt_data(data: bytes) -> bytes:
     return fernet.encrypt(data)
 
 def decrypt_data(data: bytes) -> bytes:
-    """Decrypt data using machine-specific key"""
-    fernet = get_machine_key()
+    """Decrypt data using machine-specific key, trying the current version first"""
+    versions = [SWAB_KEY_VERSION] + [v for v in SWAB_KEY_VERSIONS if v != SWAB_KEY_VERSION]
+    fernet = MultiFernet([get_machine_key(v) for v in versions])
     return fernet.decrypt(data)
 
+# .swab v2 container:
+#   header: magic | key version length (1 byte) | key version | nonce prefix (8 bytes)
+#   chunks: ciphertext length (4 bytes) | final flag (1 byte) | AES-GCM ciphertext
+# Each chunk's nonce is the prefix plus its index, and the header, index and final
+# flag are authenticated, so chunks cannot be reordered, dropped or truncated.
+# Nothing writes v2 any more: the reader only exists for files saved before the
+# v3 container replaced it. v1 files are a single Fernet token and are still readable.
+SWAB_V2_MAGIC = b'SWAB\x02'
+SWAB_CHUNK_SIZE = 64 * 1024
+
+
+class SwabFormatError(Exception):
+    """Raised when a .swab file is truncated or malformed"""
+
+
+def _read_exact(src, size):
+    data = src.read(size)
+    while data is not None and len(data) < size:
+        more = src.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data or b''
+
+def _chunk_aad(header, index, final):
+    return header + struct.pack('>I?', index, final)
+
+def decrypt_stream(src, dst):
+    """Decrypt a .swab container from ``src`` into ``dst``.
+
+    v2 containers are processed chunk by chunk. Legacy v1 files are a single
+    Fernet token and have to be decrypted in memory.
+    """
+    magic = _read_exact(src, len(SWAB_V2_MAGIC))
+    if magic != SWAB_V2_MAGIC:
+        dst.write(decrypt_data(magic + src.read()))
+        return
+
+    version_length = _read_exact(src, 1)
+    if not version_length:
+        raise SwabFormatError('Truncated header')
+    version = _read_exact(src, version_length[0]).decode('ascii', 'replace')
+    nonce_prefix = _read_exact(src, 8)
+    if version not in SWAB_KEY_VERSIONS or len(nonce_prefix) != 8:
+        raise SwabFormatError('Unknown key version')
+
+    aead = get_stream_key(version)
+    header = magic + version_length + version.encode() + nonce_prefix
+    index = 0
+    while True:
+        frame = _read_exact(src, 5)
+        if len(frame) != 5:
+            raise SwabFormatError('Truncated file')
+        length, final = struct.unpack('>I?', frame)
+        ciphertext = _read_exact(src, length)
+        if len(ciphertext) != length:
+            raise SwabFormatError('Truncated file')
+        nonce = nonce_prefix + struct.pack('>I', index)
+        dst.write(aead.decrypt(nonce, ciphertext, _chunk_aad(header, index, final)))
+        if final:
+            break
+        index += 1
+
+    if src.read(1):
+        raise SwabFormatError('Trailing data after final chunk')
+
+# .swab v3 container:
+#   header: magic | key version length (1 byte) | key version | nonce prefix (8 bytes)
+#   index:  sealed length (4 bytes) | AES-GCM sealed JSON {project, assets}
+#   assets: one v2-style chunk run per asset, back to back
+# The index records each asset's offset, size and first chunk number, so the
+# project settings open without touching the assets and a single asset can be
+# decrypted by seeking straight to it. Asset chunks authenticate the header and
+# the asset name, so assets cannot be swapped between files or names.
+SWAB_V3_MAGIC = b'SWAB\x03'
+SWAB_INDEX_NONCE = b'\xff\xff\xff\xff'
+SWAB_CHUNK_OVERHEAD = 5 + 16  # frame header + GCM tag
+
+# Opened v3 projects are kept encrypted here and referenced as swab://<id>/<asset>
+PROJECT_ASSET_SCHEME = 'swab://'
+PROJECT_CONTAINER_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], 'projects')
+
+
+def _asset_chunk_count(size):
+    return max(1, math.ceil(size / SWAB_CHUNK_SIZE))
+
+def _asset_chunk_aad(header, name, index, final):
+    return header + name.encode() + struct.pack('>I?', index, final)
+
+
+class SwabContainer:
+    """Random-access reader for .swab v3 containers"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._read_index()
+        except Exception:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _read_index(self):
+        src = self._file
+        magic = _read_exact(src, len(SWAB_V3_MAGIC))
+        if magic != SWAB_V3_MAGIC:
+            raise SwabFormatError('Not a v3 container')
+        version_length = _read_exact(src, 1)
+        if not version_length:
+            raise SwabFormatError('Truncated header')
+        version = _read_exact(src, version_length[0]).decode('ascii', 'replace')
+        nonce_prefix = _read_exact(src, 8)
+        if version not in SWAB_KEY_VERSIONS or len(nonce_prefix) != 8:
+            raise SwabFormatError('Unknown key version')
+
+        frame = _read_exact(src, 4)
+        if len(frame) != 4:
+            raise SwabFormatError('Truncated index')
+        sealed = _read_exact(src, struct.unpack('>I', frame)[0])
+
+        self._aead = get_stream_key(version)
+        self._nonce_prefix = nonce_prefix
+        self._header = magic + version_length + version.encode() + nonce_prefix
+        index = json.loads(self._aead.decrypt(nonce_prefix + SWAB_INDEX_NONCE, sealed, self._header))
+        self.project = index['project']
+        self.assets = index['assets']
+        self._data_offset = src.tell()
+
+        # The index fixes the length of every asset, so truncation shows up before any asset is read
+        data_size = sum(
+            entry['size'] + _asset_chunk_count(entry['size']) * SWAB_CHUNK_OVERHEAD
+            for entry in self.assets.values()
+        )
+        if os.fstat(src.fileno()).st_size != self._data_offset + data_size:
+            raise SwabFormatError('Truncated file')
+
+    def extract(self, name, dst):
+        """Decrypt asset ``name`` into ``dst``, one chunk in memory at a time"""
+        entry = self.assets.get(name)
+        if entry is None:
+            raise KeyError(name)
+
+        src = self._file
+        src.seek(self._data_offset + entry['offset'])
+        count = _asset_chunk_count(entry['size'])
+        for i in range(count):
+            index = entry['first_chunk'] + i
+            frame = _read_exact(src, 5)
+            if len(frame) != 5:
+                raise SwabFormatError('Truncated file')
+            length, final = struct.unpack('>I?', frame)
+            if final != (i == count - 1):
+                raise SwabFormatError('Unexpected chunk boundary')
+            ciphertext = _read_exact(src, length)
+            if len(ciphertext) != length:
+                raise SwabFormatError('Truncated file')
+            nonce = self._nonce_prefix + struct.pack('>I', index)
+            dst.write(self._aead.decrypt(nonce, ciphertext, _asset_chunk_aad(self._header, name, index, final)))
+
+
+def parse_asset_ref(path):
+    """Split a swab://<project id>/<asset> reference into (container path, asset name)"""
+    if not isinstance(path, str) or not path.startswith(PROJECT_ASSET_SCHEME):
+        return None
+    match = re.fullmatch(r'([0-9a-f]{32}|[0-9a-f]{64})/([A-Za-z0-9_.-]+)', path[len(PROJECT_ASSET_SCHEME):])
+    if not match:
+        return None
+    return os.path.join(PROJECT_CONTAINER_FOLDER, f'{match.group(1)}.swab'), match.group(2)
+
+def asset_info(path):
+    """Return (size, sha256) of a local file or project asset reference, or None if it is missing"""
+    ref = parse_asset_ref(path)
+    if ref is None:
+        if not path or not os.path.isfile(path):
+            return None
+        return os.path.getsize(path), file_sha256(path)
+
+    container_path, name = ref
+    try:
+        with SwabContainer(container_path) as container:
+            entry = container.assets.get(name)
+    except (OSError, InvalidTag, SwabFormatError, ValueError):
+        return None
+    return (entry['size'], entry['sha256']) if entry else None
+
+@contextlib.contextmanager
+def open_asset(path):
+    """Open a local file or project asset reference for reading"""
+    ref = parse_asset_ref(path)
+    if ref is None:
+        with open(path, 'rb') as f:
+            yield f
+        return
+
+    container_path, name = ref
+    buffer = tempfile.TemporaryFile()
+    try:
+        with SwabContainer(container_path) as container:
+            container.extract(name, buffer)
+        buffer.seek(0)
+        yield buffer
+    finally:
+        buffer.close()
+
+def write_project_container(dst, project_data, assets, version=None):
+    """Write a .swab v3 container with ``assets``, a list of (name, local path or reference)"""
+    version = version or SWAB_KEY_VERSION
+    aead = get_stream_key(version)
+    nonce_prefix = os.urandom(8)
+    header = SWAB_V3_MAGIC + bytes([len(version)]) + version.encode() + nonce_prefix
+
+    # Ciphertext sizes are fixed by the plaintext sizes, so the index can lead the file
+    index = {}
+    offset = 0
+    first_chunk = 0
+    for name, path in assets:
+        size, digest = asset_info(path)
+        index[name] = {'offset': offset, 'size': size, 'first_chunk': first_chunk, 'sha256': digest}
+        count = _asset_chunk_count(size)
+        offset += size + count * SWAB_CHUNK_OVERHEAD
+        first_chunk += count
+
+    sealed = aead.encrypt(
+        nonce_prefix + SWAB_INDEX_NONCE,
+        json.dumps({'project': project_data, 'assets': index}).encode(),
+        header
+    )
+    dst.write(header)
+    dst.write(struct.pack('>I', len(sealed)))
+    dst.write(sealed)
+
+    for name, path in assets:
+        entry = index[name]
+        count = _asset_chunk_count(entry['size'])
+        with open_asset(path) as src:
+            for i in range(count):
+                chunk_index = entry['first_chunk'] + i
+                final = i == count - 1
+                chunk = _read_exact(src, SWAB_CHUNK_SIZE)
+                if len(chunk) != min(SWAB_CHUNK_SIZE, entry['size'] - i * SWAB_CHUNK_SIZE):
+                    raise SwabFormatError(f'Asset {name} changed while saving')
+                nonce = nonce_prefix + struct.pack('>I', chunk_index)
+                ciphertext = aead.encrypt(nonce, chunk, _asset_chunk_aad(header, name, chunk_index, final))
+                dst.write(struct.pack('>I?', len(ciphertext), final))
+                dst.write(ciphertext)
+
+def materialize_project_assets(config, dest_dir):
+    """Decrypt the project asset references in a build config into ``dest_dir``"""
+    for key in ('icon_path', 'keystore_path'):
+        ref = parse_asset_ref(config.get(key))
+        if ref is None:
+            continue
+        container_path, name = ref
+        os.makedirs(dest_dir, exist_ok=True)
+        local_path = os.path.join(dest_dir, name)
+        try:
+            with SwabContainer(container_path) as container, open(local_path, 'wb') as f:
+                container.extract(name, f)
+        except (InvalidTag, SwabFormatError, OSError, KeyError) as e:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+            if isinstance(e, (OSError, KeyError)):
+                raise SwabFormatError(f'Project asset {name} could not be read: {e}') from e
+            raise SwabFormatError(
+                f'Project asset {name} failed authentication, the project file is corrupted or was tampered with'
+            ) from e
+        config[key] = local_path
+
 def sanitize_package_name(name):
     """Sanitize package name for Android/iOS"""
     return re.sub(r'[^a-zA-Z0-9_.]', '', name).lower()
 
+def file_sha256(path):
+    """Hash a file in chunks without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def tree_sha256(root_dir):
+    """Hash the relative paths and contents of every file below a directory"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(root_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, root_dir).encode())
+            digest.update(file_sha256(path).encode())
+    return digest.hexdigest()
+
+def link_or_copy(src, dst):
+    """Hard-link a file, falling back to a copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 def generate_password(length=16):
     """Generate a secure random password"""
     alphabet = string.ascii_letters + string.digits
@@ -166,12 +744,15 @@ def generate_keystore(build_dir, config):
     ]
 
     try:
-        result = subprocess.run(
-            keytool_cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        with timed_command(keytool_cmd) as outcome:
+            result = subprocess.run(
+                keytool_cmd,
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            if result.returncode != 0:
+                outcome['result'] = 'error'
 
         if result.returncode == 0 and os.path.exists(keystore_path):
             # Save keystore info to a file for user reference
@@ -201,11 +782,693 @@ def generate_keystore(build_dir, config):
 
     return None
 
-def setup_app_icon(project_dir, icon_path, build_id):
-    """Setup app icon using icons_launcher package"""
+# ---------------- Metrics ----------------
+
+# Histogram buckets in seconds, from template renders up to cold Gradle builds
+METRIC_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+
+
+def _metric_labels(labels):
+    return tuple(sorted((labels or {}).items()))
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(pairs) + '}'
+
+
+class Metrics:
+    """Process-wide counters, histograms and gauges exported in the Prometheus text format.
+
+    Counters and histograms are updated where things happen. Gauges, and
+    counters that a component already keeps, are read through a ``collect``
+    callable when the metrics are rendered; it returns a value or a list of
+    ``(labels, value)`` pairs.
+    """
+
+    def __init__(self, buckets=METRIC_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._samples = {}
+        self._collectors = {}
+
+    def register(self, name, kind, help_text, collect=None):
+        self._meta[name] = (kind, help_text)
+        self._samples.setdefault(name, {})
+        if collect:
+            self._collectors[name] = collect
+
+    def inc(self, name, labels=None, value=1):
+        key = _metric_labels(labels)
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        key = _metric_labels(labels)
+        with self._lock:
+            samples = self._samples[name]
+            histogram = samples.get(key)
+            if histogram is None:
+                # Cumulative bucket counts followed by the sum and the count
+                histogram = samples[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def value(self, name, labels=None):
+        """Current value of a counter sample, 0 when it was never incremented"""
+        with self._lock:
+            return self._samples[name].get(_metric_labels(labels), 0)
+
+    def render(self):
+        with self._lock:
+            snapshot = {
+                name: {key: list(value) if isinstance(value, list) else value for key, value in samples.items()}
+                for name, samples in self._samples.items()
+            }
+
+        lines = []
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if name in self._collectors:
+                try:
+                    values = self._collectors[name]()
+                except Exception as e:
+                    logger.warning(f"Failed to collect metric {name}: {e}")
+                    continue
+                if not isinstance(values, list):
+                    values = [({}, values)]
+                for labels, value in values:
+                    if value is not None:
+                        lines.append(f'{name}{_format_labels(_metric_labels(labels))} {float(value)!r}')
+            elif kind == 'histogram':
+                for key, histogram in sorted(snapshot[name].items()):
+                    for bound, count in zip(self.buckets, histogram):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', repr(float(bound))),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {histogram[-1]}")
+                    lines.append(f'{name}_sum{_format_labels(key)} {histogram[-2]!r}')
+                    lines.append(f'{name}_count{_format_labels(key)} {histogram[-1]}')
+            else:
+                for key, value in sorted(snapshot[name].items()):
+                    lines.append(f'{name}{_format_labels(key)} {float(value)!r}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class BuildTimings:
+    """Wall-clock seconds spent in each stage and platform of one build.
+
+    ``stage`` closes the running stage and starts the next one. Every closed
+    stage and platform is also observed into the metrics histograms, and
+    ``summary`` is attached to the final build status.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.stages = {}
+        self.platforms = {}
+        self._stage = None
+        self._stage_started = self.started
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        if name == self._stage:
+            return
+        now = time.monotonic()
+        if self._stage:
+            seconds = now - self._stage_started
+            self.stages[self._stage] = round(self.stages.get(self._stage, 0) + seconds, 3)
+            metrics.observe('swab_stage_duration_seconds', seconds, {'stage': self._stage})
+        self._stage = name
+        self._stage_started = now
+
+    @contextlib.contextmanager
+    def platform(self, platform):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            with self._lock:
+                self.platforms[platform] = round(seconds, 3)
+            metrics.observe('swab_platform_duration_seconds', seconds, {'platform': platform})
+
+    def summary(self):
+        """Close the running stage and return the timings of the build so far"""
+        self.stage(None)
+        return {
+            'total': round(time.monotonic() - self.started, 3),
+            'stages': dict(self.stages),
+            'platforms': dict(self.platforms),
+        }
+
+
+@contextlib.contextmanager
+def timed_command(command):
+    """Observe how long a toolchain command runs; the caller may set ``outcome['result']``"""
+    label = ' '.join(command[:3])
+    outcome = {'result': 'ok'}
+    started = time.monotonic()
+    try:
+        yield outcome
+    except Exception:
+        if outcome['result'] == 'ok':
+            outcome['result'] = 'error'
+        raise
+    finally:
+        metrics.observe(
+            'swab_command_duration_seconds', time.monotonic() - started,
+            {'command': label, 'result': outcome['result']}
+        )
+
+def cache_hit_ratios():
+    ratios = []
+    for cache in ('artifact', 'workspace', 'icon'):
+        hits = metrics.value('swab_cache_lookups_total', {'cache': cache, 'result': 'hit'})
+        misses = metrics.value('swab_cache_lookups_total', {'cache': cache, 'result': 'miss'})
+        if hits + misses:
+            ratios.append(({'cache': cache}, hits / (hits + misses)))
+    return ratios
+
+
+metrics.register('swab_builds_total', 'counter', 'Finished builds by final status')
+metrics.register('swab_platform_builds_total', 'counter', 'Platform builds by platform and result')
+metrics.register('swab_build_duration_seconds', 'histogram', 'Time from a build leaving the queue until it finished')
+metrics.register('swab_queue_wait_seconds', 'histogram', 'Time builds spent waiting in the queue')
+metrics.register('swab_stage_duration_seconds', 'histogram', 'Time spent in each build stage')
+metrics.register('swab_platform_duration_seconds', 'histogram', 'Time spent building each platform')
+metrics.register('swab_command_duration_seconds', 'histogram', 'Run time of toolchain commands by command and result')
+metrics.register('swab_cache_lookups_total', 'counter', 'Artifact cache, workspace pool and icon cache lookups by result')
+metrics.register('swab_cache_hit_ratio', 'gauge', 'Share of cache lookups that were hits', cache_hit_ratios)
+metrics.register('swab_webhook_duration_seconds', 'histogram', 'Webhook delivery attempt latency by result')
+metrics.register('swab_webhook_deliveries_total', 'counter', 'Webhook delivery attempts by result: delivered, retry, failed or dropped')
+metrics.register('swab_webhook_queue_depth', 'gauge', 'Webhook deliveries waiting to be sent or retried', lambda: webhook_dispatcher.depth())
+metrics.register('swab_queue_pending', 'gauge', 'Builds waiting in the queue', lambda: build_queue.stats()['pending'])
+metrics.register('swab_queue_running', 'gauge', 'Builds being run by a worker', lambda: build_queue.stats()['running'])
+metrics.register('swab_queue_workers', 'gauge', 'Build workers of this process', lambda: build_queue.stats()['workers'])
+metrics.register('swab_queue_capacity_used', 'gauge', 'Resource weight of the running builds', lambda: build_queue.stats()['capacity_used'])
+
+# ---------------- Webhooks ----------------
+
+WEBHOOK_TIMEOUT = float(os.getenv('SWAB_WEBHOOK_TIMEOUT', '5'))
+
+
+class WebhookDispatcher:
+    """Delivers webhook notifications from a small pool of worker threads.
+
+    Notifications wait in a bounded queue and are posted over keep-alive
+    sessions, one per host. Connection errors, timeouts, 429 and 5xx
+    responses are retried with exponential backoff and full jitter; a
+    scheduled retry does not occupy a worker while it waits. Deliveries that
+    exhaust their attempts, are rejected with another 4xx or do not fit into
+    the queue are appended to a JSON lines dead-letter file.
+    """
+
+    def __init__(self, dead_letter_path, workers=4, queue_size=1000, max_attempts=5,
+                 backoff=1.0, max_backoff=60.0, timeout=WEBHOOK_TIMEOUT):
+        self.dead_letter_path = dead_letter_path
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.counts = collections.Counter()
+
+        self._cond = threading.Condition()
+        self._scheduled = []
+        self._sequence = itertools.count()
+        self._sessions = {}
+        self._threads = []
+        self._dead_letter_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'webhook-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self, url, payload):
+        """Queue a delivery; returns False when the queue is full and it was dead-lettered"""
+        if not url:
+            return False
+        self.start()
+        delivery = {'id': uuid.uuid4().hex, 'url': url, 'payload': payload, 'attempts': 0, 'queued_at': time.time()}
+        with self._cond:
+            if len(self._scheduled) < self.queue_size:
+                heapq.heappush(self._scheduled, (time.monotonic(), next(self._sequence), delivery))
+                self._cond.notify()
+                return True
+        self._dead_letter(delivery, 'queue full', 'dropped')
+        return False
+
+    def depth(self):
+        with self._cond:
+            return len(self._scheduled)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'queued': len(self._scheduled),
+                'queue_size': self.queue_size,
+                'max_attempts': self.max_attempts,
+                'delivered': self.counts['delivered'],
+                'retried': self.counts['retry'],
+                'failed': self.counts['failed'],
+                'dropped': self.counts['dropped'],
+                'dead_letter_path': self.dead_letter_path,
+            }
+
+    def dead_letters(self, limit=50):
+        """The most recent dead-lettered deliveries, newest first"""
+        with self._dead_letter_lock:
+            try:
+                with open(self.dead_letter_path, 'r') as f:
+                    lines = collections.deque(f, maxlen=limit)
+            except OSError:
+                return []
+        return [json.loads(line) for line in reversed(lines)]
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._scheduled or self._scheduled[0][0] > time.monotonic():
+                    self._cond.wait(self._scheduled[0][0] - time.monotonic() if self._scheduled else None)
+                _, _, delivery = heapq.heappop(self._scheduled)
+            self._deliver(delivery)
+
+    def _session(self, url):
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+        with self._cond:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+                session.mount(host, adapter)
+            return session
+
+    def _deliver(self, delivery):
+        delivery['attempts'] += 1
+        started = time.monotonic()
+        retry, error = False, None
+        try:
+            response = self._session(delivery['url']).post(delivery['url'], json=delivery['payload'], timeout=self.timeout)
+            if response.status_code == 429 or response.status_code >= 500:
+                retry, error = True, f'HTTP {response.status_code}'
+            elif response.status_code >= 400:
+                error = f'HTTP {response.status_code}'
+        except requests.RequestException as e:
+            retry, error = True, str(e)
+
+        if error is None:
+            result = 'delivered'
+        elif retry and delivery['attempts'] < self.max_attempts:
+            result = 'retry'
+        else:
+            result = 'failed'
+        metrics.observe('swab_webhook_duration_seconds', time.monotonic() - started, {'result': result})
+        metrics.inc('swab_webhook_deliveries_total', {'result': result})
+
+        if result == 'retry':
+            # Full jitter keeps retries of many builds to one endpoint from arriving in lockstep
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (delivery['attempts'] - 1)))
+            with self._cond:
+                self.counts['retry'] += 1
+                heapq.heappush(self._scheduled, (time.monotonic() + delay, next(self._sequence), delivery))
+                self._cond.notify()
+        elif result == 'failed':
+            logger.warning(f"Webhook delivery to {delivery['url']} failed after {delivery['attempts']} attempt(s): {error}")
+            self._dead_letter(delivery, error, 'failed')
+        else:
+            with self._cond:
+                self.counts['delivered'] += 1
+
+    def _dead_letter(self, delivery, error, reason):
+        with self._cond:
+            self.counts[reason] += 1
+        if reason == 'dropped':
+            metrics.inc('swab_webhook_deliveries_total', {'result': 'dropped'})
+        record = dict(delivery, error=error, reason=reason, failed_at=time.time())
+        with self._dead_letter_lock:
+            try:
+                os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+                with open(self.dead_letter_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                logger.error(f"Failed to record undelivered webhook {delivery['id']}: {e}")
+
+
+webhook_dispatcher = WebhookDispatcher(
+    dead_letter_path=os.getenv(
+        'SWAB_WEBHOOK_DEAD_LETTERS', os.path.join(app.config['BUILD_FOLDER'], '_webhooks', 'dead_letters.jsonl')
+    ),
+    workers=int(os.getenv('SWAB_WEBHOOK_WORKERS', '4')),
+    queue_size=int(os.getenv('SWAB_WEBHOOK_QUEUE_SIZE', '1000')),
+    max_attempts=int(os.getenv('SWAB_WEBHOOK_MAX_ATTEMPTS', '5')),
+    backoff=float(os.getenv('SWAB_WEBHOOK_BACKOFF', '1')),
+)
+
+def send_webhook_notification(webhook_url, payload):
+    """Hand a notification to the webhook dispatcher without blocking the caller"""
+    webhook_dispatcher.notify(webhook_url, payload)
+
+# ---------------- Build Logs ----------------
+
+# Lines of toolchain output kept in memory per log, the tail of a failure is reported from it
+LOG_TAIL_LINES = max(1, int(os.getenv('SWAB_LOG_TAIL_LINES', '200')))
+# Uncompressed bytes written to one log file before further output only reaches the tail
+LOG_MAX_BYTES = int(os.getenv('SWAB_LOG_MAX_BYTES', str(64 * 1024 * 1024)))
+# Seconds buffered output may wait before it is flushed for followers
+LOG_FLUSH_INTERVAL = 1.0
+# Lines of the tail quoted in the message of a failed command
+LOG_ERROR_LINES = 20
+LOG_READ_SIZE = 64 * 1024
+LOG_NAME_PATTERN = re.compile(r'^[a-z_]+$')
+
+
+class ToolchainError(subprocess.SubprocessError):
+    """A toolchain command failed; the message ends with the last lines of its output"""
+
+    def __init__(self, command, reason, tail):
+        self.command = command
+        self.tail = tail
+        message = f"`{' '.join(command)}` {reason}"
+        if tail:
+            message += ':\n' + '\n'.join(tail[-LOG_ERROR_LINES:])
+        super().__init__(message)
+
+
+class BuildLog:
+    """Gzip-compressed log of one build stage with the last lines kept in memory.
+
+    Output is written line by line and sync-flushed at least once per
+    ``LOG_FLUSH_INTERVAL``, or on every line while somebody follows the log,
+    so a reader can decompress everything written so far while the build is
+    still running. Without a ``path`` only the in-memory tail is kept.
+    """
+
+    _open = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path=None, max_bytes=LOG_MAX_BYTES, tail_lines=LOG_TAIL_LINES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self.followers = 0
+        self._tail = collections.deque(maxlen=tail_lines)
+        self._changed = threading.Condition()
+        self._flushed_at = time.monotonic()
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = gzip.open(path, 'wb', compresslevel=6)
+            with BuildLog._open_lock:
+                BuildLog._open[path] = self
+
+    @classmethod
+    def active(cls, path):
+        """The log currently being written to ``path``, if any"""
+        with cls._open_lock:
+            return cls._open.get(path)
+
+    def write(self, line):
+        """Append one line of output (bytes, with or without its newline)"""
+        if not line.endswith(b'\n'):
+            line += b'\n'
+        self._tail.append(line.decode('utf-8', errors='replace').rstrip('\r\n'))
+        with self._changed:
+            if self._file is None:
+                return
+            if self.size + len(line) > self.max_bytes:
+                if not self.truncated:
+                    self.truncated = True
+                    notice = f'[log truncated after {self.max_bytes} bytes]\n'.encode()
+                    self._file.write(notice)
+                    self.size += len(notice)
+                    self._flush()
+                return
+            self._file.write(line)
+            self.size += len(line)
+            if self.followers or time.monotonic() - self._flushed_at >= LOG_FLUSH_INTERVAL:
+                self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        self._flushed_at = time.monotonic()
+        self._changed.notify_all()
+
+    def tail(self, lines=None):
+        """The last ``lines`` lines of output, all kept lines by default"""
+        tail = list(self._tail)
+        return tail[-lines:] if lines else tail
+
+    def wait(self, timeout):
+        """Block until more output is flushed or the log is closed"""
+        with self._changed:
+            if self._file is not None:
+                self._changed.wait(timeout)
+
+    def follow(self):
+        """Flush every line from now on, until ``unfollow``"""
+        with self._changed:
+            self.followers += 1
+            if self._file is not None:
+                self._flush()
+
+    def unfollow(self):
+        with self._changed:
+            self.followers -= 1
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._changed:
+            self._file.close()
+            self._file = None
+            self._changed.notify_all()
+        with BuildLog._open_lock:
+            BuildLog._open.pop(self.path, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_log_path(build_dir, name):
+    """Compressed log receiving the output of one platform, or of the shared ``build`` stages"""
+    return os.path.join(build_dir, 'logs', f'{name}.log.gz')
+
+def run_toolchain(command, cwd, log, timeout):
+    """Run a toolchain command, streaming its combined output into ``log`` line by line"""
+    log.write(f"$ {' '.join(command)}".encode())
+    # Own process group, so a timeout also stops the Gradle and Xcode children holding the pipe
+    process = subprocess.Popen(
+        command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        start_new_session=hasattr(os, 'killpg')
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        if hasattr(os, 'killpg'):
+            with contextlib.suppress(OSError):
+                os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    with timed_command(command) as outcome:
+        try:
+            for line in process.stdout:
+                log.write(line)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if timed_out.is_set():
+            outcome['result'] = 'timeout'
+            raise ToolchainError(command, f'timed out after {timeout}s', log.tail())
+        if returncode:
+            raise ToolchainError(command, f'failed with exit code {returncode}', log.tail())
+
+def closed_log_size(path):
+    """Uncompressed length of a closed log, read from its gzip trailer"""
+    with open(path, 'rb') as f:
+        f.seek(-4, os.SEEK_END)
+        return struct.unpack('<I', f.read(4))[0]
+
+def build_log_closed(build_id, name, path):
+    """Whether the log ``name`` of a build is finished.
+
+    Decided from the shared build state rather than the in-process registry,
+    so API workers do not mistake a log the builder process is still writing
+    for a closed one. A platform log is done once its platform finished,
+    every log once the build did.
+    """
+    if BuildLog.active(path) is not None:
+        return False
+    state = build_store.get(build_id) or {}
+    if state.get('status') in TERMINAL_STATUSES:
+        return True
+    return ((state.get('platforms') or {}).get(name) or {}).get('status') in TERMINAL_STATUSES
+
+def read_build_log(path, offset=0, follow=False, poll_interval=1.0, writing=None):
+    """Yield the uncompressed log from byte ``offset``; with ``follow`` until the log is closed.
+
+    Logs written by another process are followed by polling the file for as
+    long as the ``writing`` callable returns True.
+    """
+    log = BuildLog.active(path) if follow else None
+    if log:
+        log.follow()
+    remote = follow and log is None and writing is not None
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    position = 0
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(LOG_READ_SIZE)
+                if not chunk:
+                    if remote:
+                        if writing():
+                            time.sleep(poll_interval)
+                        else:
+                            # Drain what was written before the writer finished, then stop
+                            remote = False
+                        continue
+                    if log is None:
+                        break
+                    if BuildLog.active(path) is None:
+                        # The writer closed the log, drain its remaining bytes and stop
+                        log.unfollow()
+                        log = None
+                        continue
+                    log.wait(poll_interval)
+                    continue
+
+                data = decompressor.decompress(chunk)
+                if position + len(data) <= offset:
+                    position += len(data)
+                    continue
+                if position < offset:
+                    data = data[offset - position:]
+                    position = offset
+                position += len(data)
+                if data:
+                    yield data
+    finally:
+        if log:
+            log.unfollow()
+
+# ---------------- Dependency Resolution ----------------
+
+# Dev tools added to every project's pubspec.yaml during the build
+DEV_TOOL_DEPENDENCIES = {}
+if Image is None:
+    # App icons fall back to icons_launcher when Pillow is not installed
+    DEV_TOOL_DEPENDENCIES['icons_launcher'] = '^3.0.0'
+
+# Offline mode resolves purely from a pre-seeded PUB_CACHE
+PUB_OFFLINE = os.getenv('SWAB_PUB_OFFLINE', '0') == '1'
+# Pinned lockfile copied into every project and enforced during resolution
+PUB_LOCKFILE = os.getenv('SWAB_PUB_LOCKFILE')
+
+def add_dev_tools(pubspec):
+    """Return pubspec.yaml content with every missing dev tool added to dev_dependencies"""
+    dev_tools = ''.join(
+        f'\n  {name}: {version}'
+        for name, version in DEV_TOOL_DEPENDENCIES.items()
+        if f'{name}:' not in pubspec
+    )
+    return pubspec.replace('dev_dependencies:', f'dev_dependencies:{dev_tools}', 1)
+
+# What a project was last resolved from, written next to its pubspec.yaml
+DEPENDENCY_STAMP = '.swab-deps.json'
+# The per-app pubspec fields; everything else in pubspec.yaml is the same for every build
+PUBSPEC_APP_FIELDS = re.compile(r'^(?:name|description|version):.*$', re.MULTILINE)
+
+def dependency_fingerprint(project_dir):
+    """Hash the pubspec.yaml without its app fields, and the lockfile resolution starts from"""
+    with open(os.path.join(project_dir, 'pubspec.yaml'), 'r', encoding='utf-8') as f:
+        dependencies = PUBSPEC_APP_FIELDS.sub('', f.read())
+    lockfile = PUB_LOCKFILE or os.path.join(project_dir, 'pubspec.lock')
+    return {
+        'pubspec': hashlib.sha256(dependencies.encode()).hexdigest(),
+        'lockfile': file_sha256(lockfile) if os.path.exists(lockfile) else None,
+    }
+
+def resolve_dependencies(project_dir, log=None, timeout=180):
+    """Resolve the project's final pubspec.yaml with a single `flutter pub get`.
+
+    Skipped when the dependency section and lockfile are the ones the project
+    was last resolved with, as in a checked-out pool workspace where only the
+    app fields were rendered. Returns whether `flutter pub get` ran.
+    """
+    stamp_path = os.path.join(project_dir, DEPENDENCY_STAMP)
+    package_config = os.path.join(project_dir, '.dart_tool', 'package_config.json')
+    try:
+        with open(stamp_path, 'r') as f:
+            resolved = json.load(f)
+    except (OSError, ValueError):
+        resolved = None
+    if resolved == dependency_fingerprint(project_dir) and os.path.exists(package_config):
+        # flutter build re-runs pub get for a pubspec newer than the package config
+        mtime = os.path.getmtime(package_config)
+        os.utime(os.path.join(project_dir, 'pubspec.yaml'), (mtime, mtime))
+        return False
+
+    command = ['flutter', 'pub', 'get']
+    if PUB_OFFLINE:
+        command.append('--offline')
+    if PUB_LOCKFILE:
+        shutil.copy(PUB_LOCKFILE, os.path.join(project_dir, 'pubspec.lock'))
+        command.append('--enforce-lockfile')
+
+    run_toolchain(command, project_dir, log or BuildLog(), timeout)
+    with open(stamp_path, 'w') as f:
+        json.dump(dependency_fingerprint(project_dir), f)
+    return True
+
+def setup_app_icon(project_dir, icon_path, build_id, log=None):
+    """Generate the app icons in process, or with icons_launcher when Pillow is missing"""
     if not icon_path or not os.path.exists(icon_path):
         return False
 
+    if Image is not None:
+        try:
+            hit = generate_app_icons(project_dir, icon_path)
+            metrics.inc('swab_cache_lookups_total', {'cache': 'icon', 'result': 'hit' if hit else 'miss'})
+            logger.info(f"Build {build_id}: app icons {'reused from cache' if hit else 'generated'}")
+            return True
+        except Exception as e:
+            logger.error(f"Build {build_id}: icon generation failed: {e}")
+            return False
+
     try:
         # Copy icon to project assets
         assets_dir = os.path.join(project_dir, 'assets')
@@ -235,194 +1498,435 @@ def setup_app_icon(project_dir, icon_path, build_id):
         with open(config_path, 'w') as f:
             f.write(icons_config)
 
-        # Add icons_launcher to dev_dependencies in pubspec.yaml
-        pubspec_path = os.path.join(project_dir, 'pubspec.yaml')
-        with open(pubspec_path, 'r') as f:
-            pubspec_content = f.read()
-
-        # Add icons_launcher if not present
-        if 'icons_launcher:' not in pubspec_content:
-            pubspec_content = pubspec_content.replace(
-                'dev_dependencies:',
-                'dev_dependencies:\n  icons_launcher: ^3.0.0'
-            )
-            with open(pubspec_path, 'w') as f:
-                f.write(pubspec_content)
-
-        # Run flutter pub get to get icons_launcher
-        subprocess.run(
-            ['flutter', 'pub', 'get'],
-            cwd=project_dir,
-            capture_output=True,
-            timeout=120
-        )
-
-        # Run icons_launcher
-        result = subprocess.run(
-            ['dart', 'run', 'icons_launcher:create'],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-
-        return result.returncode == 0
+        # Run icons_launcher (resolved by the dependencies stage)
+        run_toolchain(['dart', 'run', 'icons_launcher:create'], project_dir, log or BuildLog(), timeout=120)
+        return True
     except Exception as e:
         print(f"Icon setup error: {e}")
         return False
 
-def rename_app(project_dir, app_name, package_name):
-    """Rename app using the rename package"""
-    try:
-        # Add rename to dev_dependencies
-        pubspec_path = os.path.join(project_dir, 'pubspec.yaml')
-        with open(pubspec_path, 'r') as f:
-            pubspec_content = f.read()
-
-        if 'rename:' not in pubspec_content:
-            pubspec_content = pubspec_content.replace(
-                'dev_dependencies:',
-                'dev_dependencies:\n  rename: ^3.0.2'
-            )
-            with open(pubspec_path, 'w') as f:
-                f.write(pubspec_content)
-
-        # Run flutter pub get
-        subprocess.run(
-            ['flutter', 'pub', 'get'],
-            cwd=project_dir,
-            capture_output=True,
-            timeout=120
-        )
-
-        # Rename app name for all platforms
-        subprocess.run(
-            ['dart', 'run', 'rename', 'setAppName', '--value', app_name],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+# ---------------- App Icons ----------------
 
-        # Rename bundle ID/package name for all platforms
-        subprocess.run(
-            ['dart', 'run', 'rename', 'setBundleId', '--value', package_name],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+ANDROID_ICON_DENSITIES = {'mdpi': 48, 'hdpi': 72, 'xhdpi': 96, 'xxhdpi': 144, 'xxxhdpi': 192}
+WINDOWS_ICON_SIZES = [16, 24, 32, 48, 64, 128, 256]
+APPICONSETS = {
+    'ios': 'ios/Runner/Assets.xcassets/AppIcon.appiconset',
+    'macos': 'macos/Runner/Assets.xcassets/AppIcon.appiconset',
+}
+ICON_CACHE_DIR = os.path.join(app.config['BUILD_FOLDER'], '_cache', 'icons')
+ICON_CACHE_ENTRIES = int(os.getenv('SWAB_ICON_CACHE_ENTRIES', '64'))
+
+def icon_targets(template_dir):
+    """Map every launcher icon file of the template to its size and format"""
+    targets = {
+        f'android/app/src/main/res/mipmap-{density}/ic_launcher.png': {'size': size}
+        for density, size in ANDROID_ICON_DENSITIES.items()
+    }
 
-        return True
-    except Exception as e:
-        print(f"Rename error: {e}")
-        return False
+    # The asset catalogs list their own sizes; App Store icons must not have an alpha channel
+    for platform, set_dir in APPICONSETS.items():
+        contents_path = os.path.join(template_dir, set_dir, 'Contents.json')
+        if not os.path.exists(contents_path):
+            continue
+        with open(contents_path) as f:
+            images = json.load(f).get('images', [])
+        for image in images:
+            if not image.get('filename'):
+                continue
+            points = float(image['size'].split('x')[0])
+            scale = float(image.get('scale', '1x').rstrip('x'))
+            targets[f"{set_dir}/{image['filename']}"] = {'size': round(points * scale), 'opaque': platform == 'ios'}
+
+    targets['windows/runner/resources/app_icon.ico'] = {'sizes': WINDOWS_ICON_SIZES}
+    targets['snap/gui/app_icon.png'] = {'size': 256}
+    if os.path.isdir(os.path.join(template_dir, 'web')):
+        targets['web/favicon.png'] = {'size': 16}
+        for size in (192, 512):
+            targets[f'web/icons/Icon-{size}.png'] = {'size': size}
+            targets[f'web/icons/Icon-maskable-{size}.png'] = {'size': size}
+    return targets
+
+ICON_TARGETS = icon_targets(app.config['FLUTTER_TEMPLATE'])
+
+def render_icons(icon_path, output_dir):
+    """Resize ``icon_path`` into every icon target below ``output_dir``"""
+    with Image.open(icon_path) as source:
+        source = source.convert('RGBA')
+
+    # Pad non-square images instead of stretching them
+    side = max(source.size)
+    square = Image.new('RGBA', (side, side), (0, 0, 0, 0))
+    square.paste(source, ((side - source.width) // 2, (side - source.height) // 2))
+
+    resized = {}
+
+    def resize(size, opaque=False):
+        key = (size, opaque)
+        if key not in resized:
+            image = square.resize((size, size), Image.LANCZOS)
+            if opaque:
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            resized[key] = image
+        return resized[key]
+
+    for relpath, target in ICON_TARGETS.items():
+        path = os.path.join(output_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if 'sizes' in target:
+            largest = max(target['sizes'])
+            resize(largest).save(path, format='ICO', sizes=[(s, s) for s in target['sizes']])
+        else:
+            resize(target['size'], target.get('opaque', False)).save(path, format='PNG', optimize=False)
+
+def generate_app_icons(project_dir, icon_path):
+    """Write every platform's launcher icons into ``project_dir``, reusing earlier renders of the same image"""
+    key = hashlib.sha256(
+        file_sha256(icon_path).encode() + json.dumps(ICON_TARGETS, sort_keys=True).encode()
+    ).hexdigest()
+    cached_dir = os.path.join(ICON_CACHE_DIR, key)
+
+    if os.path.isdir(cached_dir):
+        os.utime(cached_dir)
+        hit = True
+    else:
+        hit = False
+        os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(dir=ICON_CACHE_DIR, prefix='.staging-')
+        try:
+            render_icons(icon_path, staging_dir)
+            os.replace(staging_dir, cached_dir)
+        except OSError:
+            # Another build rendered the same icon first
+            if not os.path.isdir(cached_dir):
+                raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        evict_icon_cache()
+
+    for relpath in ICON_TARGETS:
+        dst = os.path.join(project_dir, relpath)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.exists(dst):
+            os.remove(dst)
+        link_or_copy(os.path.join(cached_dir, relpath), dst)
+    return hit
+
+def evict_icon_cache():
+    """Drop the least recently used rendered icon sets beyond ICON_CACHE_ENTRIES"""
+    entries = [e for e in os.scandir(ICON_CACHE_DIR) if e.is_dir() and not e.name.startswith('.')]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[ICON_CACHE_ENTRIES:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+# ---------------- Project Templates ----------------
+
+# Slots of each template file, as (pattern, value name) rules. A pattern with
+# groups fills each group with the value of the same position in a tuple of
+# names; a pattern without groups is replaced as a whole. Old-style values
+# are matched too, so older templates without {{...}} placeholders still work.
+# Together they set the app label and bundle identifier of every platform, so
+# no separate rename step is needed.
+TEMPLATE_SLOTS = {
+    'lib/main.dart': [
+        (r'\{\{APP_NAME\}\}', 'app_name'),
+        (r'\{\{APP_URL\}\}', 'web_url'),
+        (r'static const bool ALLOW_ZOOM = (\w+);', 'allow_zoom'),
+        (r'static const bool ENABLE_JAVASCRIPT = (\w+);', 'enable_javascript'),
+        (r'static const bool ENABLE_DOM_STORAGE = (\w+);', 'enable_dom_storage'),
+        (r'static const bool ENABLE_GEOLOCATION = (\w+);', 'enable_geolocation'),
+        (r'static const bool ENABLE_PULL_TO_REFRESH = (\w+);', 'enable_pull_refresh'),
+        (r'static const bool SHOW_NAVIGATION_BAR = (\w+);', 'show_navigation'),
+        (r'static const bool ENABLE_FILE_ACCESS = (\w+);', 'enable_file_access'),
+        (r'static const bool ENABLE_CACHE = (\w+);', 'enable_cache'),
+        (r'static const bool ENABLE_MEDIA_AUTOPLAY = (\w+);', 'enable_media_autoplay'),
+    ],
+    'pubspec.yaml': [
+        (r'\{\{APP_PACKAGE_NAME\}\}', 'pubspec_name'),
+        (r'\{\{APP_DESCRIPTION\}\}', 'app_description'),
+        (r'\{\{APP_VERSION\}\}', 'app_version'),
+        (r'\{\{APP_BUILD_NUMBER\}\}', 'build_number'),
+        (r'^name: (webview_app)$', 'pubspec_name'),
+        (r'^description: "(A new Flutter project\.)"$', 'app_description'),
+        (r'^version: (1\.0\.0)\+(1)$', ('app_version', 'build_number')),
+    ],
+    'android/app/build.gradle.kts': [
+        (r'\{\{APP_PACKAGE_NAME\}\}', 'package_name'),
+        (r'\{\{APP_VERSION\}\}', 'app_version'),
+        (r'\{\{APP_BUILD_NUMBER\}\}', 'build_number'),
+        (r'\{\{KEYSTORE_PATH\}\}', 'keystore_path'),
+        (r'\{\{KEYSTORE_PASSWORD\}\}', 'keystore_password'),
+        (r'\{\{KEY_ALIAS\}\}', 'key_alias'),
+        (r'\{\{KEY_PASSWORD\}\}', 'key_password'),
+        (r'signingConfig\s*=\s*signingConfigs\.getByName\("(release)"\)', 'release_signing_config'),
+        # The namespace stays the Kotlin package so ".MainActivity" still resolves
+        (r'applicationId\s*=\s*"([^"]*)"', 'package_name'),
+    ],
+    'android/app/src/main/AndroidManifest.xml': [
+        (r'\{\{APP_NAME\}\}', 'app_name_xml'),
+        (r'android:label="([^"]*)"', 'app_name_xml'),
+    ],
+    'ios/Runner/Info.plist': [
+        (r'<key>CFBundleDisplayName</key>\s*<string>([^<]*)</string>', 'app_name_xml'),
+        (r'<key>CFBundleName</key>\s*<string>([^<]*)</string>', 'app_name_xml'),
+    ],
+    'ios/Runner.xcodeproj/project.pbxproj': [
+        # Test targets keep their .RunnerTests suffix
+        (r'PRODUCT_BUNDLE_IDENTIFIER\s*=\s*([^;]+?)(?:\.RunnerTests)?;', 'package_name'),
+    ],
+    'macos/Runner/Info.plist': [
+        (r'<key>CFBundleName</key>\s*<string>([^<]*)</string>', 'app_name_xml'),
+    ],
+    'macos/Runner/Configs/AppInfo.xcconfig': [
+        (r'^PRODUCT_NAME = (.*)$', 'app_name'),
+        (r'^PRODUCT_BUNDLE_IDENTIFIER = (.*)$', 'package_name'),
+    ],
+    'macos/Runner.xcodeproj/project.pbxproj': [
+        (r'PRODUCT_BUNDLE_IDENTIFIER\s*=\s*([^;]+?)(?:\.RunnerTests)?;', 'package_name'),
+    ],
+    'windows/CMakeLists.txt': [
+        (r'project\(([^)]+)\)', 'windows_project'),
+    ],
+    'windows/runner/Runner.rc': [
+        (r'VALUE "FileDescription", "((?:[^"]|"")*)"', 'app_name_rc'),
+        (r'VALUE "ProductName", "((?:[^"]|"")*)"', 'app_name_rc'),
+    ],
+    'windows/runner/main.cpp': [
+        (r'window\.Create\(L"((?:[^"\\]|\\.)*)"', 'app_name_c'),
+    ],
+    'linux/CMakeLists.txt': [
+        (r'set\(BINARY_NAME\s+"([^"]*)"\)', 'binary_name'),
+        (r'set\(APPLICATION_ID\s+"([^"]*)"\)', 'package_name'),
+    ],
+    'linux/runner/my_application.cc': [
+        (r'gtk_header_bar_set_title\(header_bar, "((?:[^"\\]|\\.)*)"\)', 'app_name_c'),
+        (r'gtk_window_set_title\(window, "((?:[^"\\]|\\.)*)"\)', 'app_name_c'),
+    ],
+}
 
-def run_build(build_id, config):
-    """Run the Flutter build in a background thread"""
-    try:
-        build_progress[build_id] = {'status': 'preparing', 'progress': 5, 'message': 'Preparing build environment...'}
+def remove_release_signing(content, values):
+    """Drop a release signingConfigs block when there is no keystore to fill it with"""
+    if values['release_signing_config'] == 'release':
+        return content
+    return re.sub(r'\n\s*signingConfigs\s*\{[^}]*create\("release"\)[^}]*\}[^}]*\}', '', content, flags=re.DOTALL)
+
+# Applied to the rendered text of a file, with the template values, before it is written
+TEMPLATE_FINALIZERS = {
+    # The final pubspec includes the dev tools so it only has to be resolved once
+    'pubspec.yaml': lambda content, values: add_dev_tools(content),
+    # Release builds without a keystore sign with the debug key and must not reference an empty storeFile
+    'android/app/build.gradle.kts': remove_release_signing,
+}
 
-        # Create a unique build directory
-        build_dir = os.path.join(app.config['BUILD_FOLDER'], build_id)
-        os.makedirs(build_dir, exist_ok=True)
+PLACEHOLDER_PATTERN = re.compile(r'\{\{[A-Z_]+\}\}')
+
+
+class CompiledTemplate:
+    """A template file split once into literal text and named slots"""
+
+    def __init__(self, relpath, text, rules):
+        self.relpath = relpath
+        spans = []
+        for pattern, names in rules:
+            names = (names,) if isinstance(names, str) else names
+            for match in re.finditer(pattern, text, re.MULTILINE):
+                if match.re.groups:
+                    spans.extend((match.start(i + 1), match.end(i + 1), name) for i, name in enumerate(names))
+                else:
+                    spans.append((match.start(), match.end(), names[0]))
+
+        # Earlier rules win where two slots overlap
+        self.segments = []
+        position = 0
+        for start, end, name in sorted(spans, key=lambda span: span[0]):
+            if start < position:
+                continue
+            self.segments.append(text[position:start])
+            self.segments.append((name,))
+            position = end
+        self.segments.append(text[position:])
+        self.fields = {segment[0] for segment in self.segments if isinstance(segment, tuple)}
+
+        leftover = PLACEHOLDER_PATTERN.findall(''.join(s for s in self.segments if isinstance(s, str)))
+        if leftover:
+            raise ValueError(f"Template {relpath} has unmapped placeholders: {', '.join(sorted(set(leftover)))}")
+
+    def render(self, values):
+        return ''.join(segment if isinstance(segment, str) else values[segment[0]] for segment in self.segments)
+
+
+class ProjectTemplates:
+    """The Flutter template's configurable files, compiled once at startup"""
+
+    def __init__(self, template_dir, slots):
+        self.templates = []
+        for relpath, rules in slots.items():
+            path = os.path.join(template_dir, relpath)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                self.templates.append(CompiledTemplate(relpath, f.read(), rules))
+        self.fields = set().union(*(t.fields for t in self.templates))
+
+    def render(self, project_dir, values):
+        """Render every template into ``project_dir`` and return the files that changed"""
+        missing = self.fields - set(values)
+        if missing:
+            raise ValueError(f"Missing template values: {', '.join(sorted(missing))}")
+
+        changed = []
+        for template in self.templates:
+            content = template.render(values)
+            finalize = TEMPLATE_FINALIZERS.get(template.relpath)
+            if finalize:
+                content = finalize(content, values)
+
+            path = os.path.join(project_dir, template.relpath)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        continue
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            changed.append(template.relpath)
+        return changed
+
+
+def template_values(config):
+    """Map a build config to the string values filled into the project templates"""
+    def bool_to_dart(value):
+        return 'true' if value else 'false'
+
+    has_keystore = bool(config.get('keystore_path')) and os.path.exists(config['keystore_path'])
+    binary_name = sanitize_package_name(config['app_name'])
+    return {
+        'app_name': config['app_name'],
+        'app_name_xml': html.escape(config['app_name'], quote=True),
+        'app_name_c': config['app_name'].replace('\\', '\\\\').replace('"', '\\"'),
+        'app_name_rc': config['app_name'].replace('\\', '\\\\').replace('"', '""'),
+        'web_url': config['web_url'],
+        'app_description': config['app_description'],
+        'app_version': config['app_version'],
+        'build_number': str(config['build_number']),
+        'package_name': config['package_name'],
+        'pubspec_name': binary_name,
+        'binary_name': binary_name,
+        'windows_project': f'{binary_name} LANGUAGES CXX',
+        'allow_zoom': bool_to_dart(config['allow_zoom']),
+        'enable_javascript': bool_to_dart(config['enable_javascript']),
+        'enable_dom_storage': bool_to_dart(config['enable_dom_storage']),
+        'enable_geolocation': bool_to_dart(config['enable_geolocation']),
+        'enable_pull_refresh': bool_to_dart(config['enable_pull_refresh']),
+        'show_navigation': bool_to_dart(config['show_navigation']),
+        'enable_file_access': bool_to_dart(config['enable_file_access']),
+        'enable_cache': bool_to_dart(config['enable_cache']),
+        'enable_media_autoplay': bool_to_dart(config['enable_media_autoplay']),
+        # Release builds fall back to debug signing when there is no keystore
+        'release_signing_config': 'release' if has_keystore else 'debug',
+        'keystore_path': (config.get('keystore_path') or '') if has_keystore else '',
+        'keystore_password': (config.get('keystore_password') or '') if has_keystore else '',
+        'key_alias': (config.get('key_alias') or '') if has_keystore else '',
+        'key_password': (config.get('key_password') or '') if has_keystore else '',
+    }
 
-        # Copy template to build directory
-        project_dir = os.path.join(build_dir, 'project')
-        shutil.copytree(app.config['FLUTTER_TEMPLATE'], project_dir)
 
-        build_progress[build_id] = {'status': 'configuring', 'progress': 10, 'message': 'Configuring app...'}
+project_templates = ProjectTemplates(app.config['FLUTTER_TEMPLATE'], TEMPLATE_SLOTS)
 
-        # Update main.dart with app details and feature options
-        main_dart_path = os.path.join(project_dir, 'lib', 'main.dart')
-        with open(main_dart_path, 'r') as f:
-            content = f.read()
+def complete_build(build_id, config, outputs, keystore_info=None, cached_platforms=None, platform_states=None, timings=None):
+    """Publish the final status of a successful build and notify the webhook"""
+    final_status = {
+        'status': 'completed',
+        'progress': 100,
+        'message': 'Build completed!',
+        'outputs': outputs,
+        'platforms': platform_states or {p: {'status': 'cached'} for p in outputs}
+    }
 
-        content = content.replace('{{APP_NAME}}', config['app_name'])
-        content = content.replace('{{APP_URL}}', config['web_url'])
+    if timings:
+        final_status['timings'] = timings
+
+    if cached_platforms:
+        final_status['cached_platforms'] = cached_platforms
+
+    # Add keystore info if we generated one
+    if keystore_info:
+        final_status['keystore_generated'] = True
+        final_status['keystore_path'] = keystore_info['path']
+        final_status['keystore_info_path'] = keystore_info.get('info_path')
+
+    build_store.set(build_id, final_status)
+    metrics.inc('swab_builds_total', {'status': 'completed'})
+    # ✅ Webhook on success
+    webhook_url = config.get('webhook_url')
+    payload = {
+        "event": "build",
+        "build_id": build_id,
+        "status": final_status.get('status'),
+        "platforms": config.get('platforms'),
+        "outputs": final_status.get('outputs')
+    }
+    send_webhook_notification(webhook_url, payload)
 
-        # Replace WebView feature options
-        def bool_to_dart(value):
-            return 'true' if value else 'false'
+# Maximum number of platform lanes of one job that build at the same time, each in its own
+# project directory; 1 builds every platform sequentially in the single project directory
+PLATFORM_CONCURRENCY = max(1, int(os.getenv('SWAB_PLATFORM_CONCURRENCY', '2')))
 
-        content = re.sub(
-            r'static const bool ALLOW_ZOOM = \w+;',
-            f'static const bool ALLOW_ZOOM = {bool_to_dart(config["allow_zoom"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_JAVASCRIPT = \w+;',
-            f'static const bool ENABLE_JAVASCRIPT = {bool_to_dart(config["enable_javascript"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_DOM_STORAGE = \w+;',
-            f'static const bool ENABLE_DOM_STORAGE = {bool_to_dart(config["enable_dom_storage"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_GEOLOCATION = \w+;',
-            f'static const bool ENABLE_GEOLOCATION = {bool_to_dart(config["enable_geolocation"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_PULL_TO_REFRESH = \w+;',
-            f'static const bool ENABLE_PULL_TO_REFRESH = {bool_to_dart(config["enable_pull_refresh"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool SHOW_NAVIGATION_BAR = \w+;',
-            f'static const bool SHOW_NAVIGATION_BAR = {bool_to_dart(config["show_navigation"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_FILE_ACCESS = \w+;',
-            f'static const bool ENABLE_FILE_ACCESS = {bool_to_dart(config["enable_file_access"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_CACHE = \w+;',
-            f'static const bool ENABLE_CACHE = {bool_to_dart(config["enable_cache"])};',
-            content
-        )
-        content = re.sub(
-            r'static const bool ENABLE_MEDIA_AUTOPLAY = \w+;',
-            f'static const bool ENABLE_MEDIA_AUTOPLAY = {bool_to_dart(config["enable_media_autoplay"])};',
-            content
-        )
+def run_build(build_id, config):
+    """Run the Flutter build in a background thread"""
+    build_log = None
+    timings = BuildTimings()
+
+    def advance(stage, progress, message):
+        timings.stage(stage)
+        build_store.set(build_id, {'status': stage, 'progress': progress, 'message': message})
+        if config.get('webhook_stages'):
+            send_webhook_notification(config.get('webhook_url'), {
+                "event": "stage",
+                "build_id": build_id,
+                "status": stage,
+                "progress": progress,
+                "message": message
+            })
 
-        with open(main_dart_path, 'w') as f:
-            f.write(content)
+    try:
+        advance('preparing', 5, 'Preparing build environment...')
 
-        # Update pubspec.yaml
-        pubspec_path = os.path.join(project_dir, 'pubspec.yaml')
-        with open(pubspec_path, 'r') as f:
-            pubspec = f.read()
+        # Create a unique build directory
+        build_dir = os.path.join(app.config['BUILD_FOLDER'], build_id)
+        os.makedirs(build_dir, exist_ok=True)
 
-        # Handle placeholders from template
-        pubspec = pubspec.replace('{{APP_PACKAGE_NAME}}', sanitize_package_name(config['app_name']))
-        pubspec = pubspec.replace('{{APP_DESCRIPTION}}', config['app_description'])
-        pubspec = pubspec.replace('{{APP_VERSION}}', config['app_version'])
-        pubspec = pubspec.replace('{{APP_BUILD_NUMBER}}', str(config['build_number']))
+        # Serve platforms whose artifacts are already cached, build only the rest
+        cache_keys = artifact_cache.keys_for(config)
+        outputs = artifact_cache.restore(cache_keys, os.path.join(build_dir, 'outputs'))
+        platforms = [p for p in config['platforms'] if p not in outputs]
+        cached_platforms = list(outputs)
+        if not platforms:
+            complete_build(build_id, config, outputs, cached_platforms=cached_platforms, timings=timings.summary())
+            return
 
-        # Also handle old-style replacements for backwards compatibility
-        pubspec = pubspec.replace('name: webview_app', f"name: {sanitize_package_name(config['app_name'])}")
-        pubspec = pubspec.replace('description: "A new Flutter project."', f"description: \"{config['app_description']}\"")
-        pubspec = pubspec.replace('version: 1.0.0+1', f"version: {config['app_version']}+{config['build_number']}")
+        # Assets of an opened project stay encrypted until a build actually needs them
+        materialize_project_assets(config, os.path.join(build_dir, 'assets'))
 
-        with open(pubspec_path, 'w') as f:
-            f.write(pubspec)
+        # Check out a pre-resolved workspace, or copy the template on a pool miss. Incremental
+        # builds keep their resolved dependencies in the persistent workspace, so they take the template.
+        project_dir = os.path.join(build_dir, 'project')
+        incremental = bool(config.get('incremental'))
+        if incremental or not workspace_pool.checkout(project_dir):
+            shutil.copytree(app.config['FLUTTER_TEMPLATE'], project_dir)
 
         # Track if we generated a keystore
         keystore_generated = False
         keystore_info = None
 
-        # Check if we need to generate a keystore for Android builds
-        is_android = 'android' in config['platforms'] or 'android_aab' in config['platforms']
+        # Generate a keystore for Android builds first, the Gradle file is rendered with it
+        is_android = 'android' in platforms or 'android_aab' in platforms
         has_keystore = config.get('keystore_path') and os.path.exists(config.get('keystore_path', ''))
 
         if is_android and not has_keystore:
-            build_progress[build_id] = {'status': 'keystore', 'progress': 12, 'message': 'Generating signing keystore...'}
+            advance('keystore', 8, 'Generating signing keystore...')
             keystore_info = generate_keystore(build_dir, config)
             if keystore_info:
                 config['keystore_path'] = keystore_info['path']
@@ -431,114 +1935,154 @@ def run_build(build_id, config):
                 config['key_password'] = keystore_info['key_password']
                 keystore_generated = True
 
-        # Use rename package to set app name and bundle ID
-        build_progress[build_id] = {'status': 'renaming', 'progress': 15, 'message': 'Setting app name and bundle ID...'}
-        rename_app(project_dir, config['app_name'], config['package_name'])
-
-        # Setup app icon if provided
-        icon_path = config.get('icon_path')
-        if icon_path and os.path.exists(icon_path):
-            build_progress[build_id] = {'status': 'icons', 'progress': 18, 'message': 'Generating app icons...'}
-            setup_app_icon(project_dir, icon_path, build_id)
-
-        # Update Android config (for keystore)
-        if 'android' in config['platforms'] or 'android_aab' in config['platforms']:
-            update_android_config(project_dir, config)
-
-        # Update iOS bundle ID
-        if 'ios' in config['platforms']:
-            update_ios_config(project_dir, config)
-
-        # Update macOS bundle ID
-        if 'macos' in config['platforms']:
-            update_macos_config(project_dir, config)
+        # Render main.dart, pubspec.yaml and the platform files in one pass
+        advance('configuring', 10, 'Configuring app...')
+        project_templates.render(project_dir, template_values(config))
 
-        # Update Windows config
-        if 'windows' in config['platforms']:
-            update_windows_config(project_dir, config)
+        # Output of the stages shared by all platforms goes to the build log
+        build_log = BuildLog(build_log_path(build_dir, 'build'))
 
-        # Update Linux config
-        if 'linux' in config['platforms']:
-            update_linux_config(project_dir, config)
-
-        build_progress[build_id] = {'status': 'dependencies', 'progress': 22, 'message': 'Getting dependencies...'}
-
-        # Run flutter pub get
-        subprocess.run(['flutter', 'pub', 'get'], cwd=project_dir, check=True, capture_output=True, timeout=180)
-
-        outputs = {}
-        platform_count = len(config['platforms'])
-        progress_per_platform = 65 / max(platform_count, 1)
-        current_progress = 28
+        # Resolve app and dev tool dependencies in a single pass, unless a warm workspace already has them.
+        # Incremental builds resolve once they are synced into their workspace, unless icons_launcher needs them now.
+        icon_path = config.get('icon_path')
+        has_icon = icon_path and os.path.exists(icon_path)
+        if not incremental or (has_icon and Image is None):
+            advance('dependencies', 14, 'Getting dependencies...')
+            if not resolve_dependencies(project_dir, build_log):
+                logger.info(f"Build {build_id}: dependencies unchanged, skipped flutter pub get")
 
-        for platform in config['platforms']:
-            build_progress[build_id] = {
+        # Setup app icon if provided
+        if has_icon:
+            advance('icons', 22, 'Generating app icons...')
+            setup_app_icon(project_dir, icon_path, build_id, build_log)
+
+        # Build independent platform lanes concurrently, each platform with its own status and log
+        platform_states = {p: {'status': 'cached'} for p in cached_platforms}
+        platform_states.update({p: {'status': 'pending'} for p in platforms})
+        state_lock = threading.Lock()
+        finished = 0
+
+        def publish_progress():
+            building = [get_platform_display_name(p) for p in platforms if platform_states[p]['status'] == 'building']
+            build_store.set(build_id, {
                 'status': 'building',
-                'progress': int(current_progress),
-                'message': f'Building {get_platform_display_name(platform)}...'
-            }
-
-            try:
-                output_path = build_platform(project_dir, build_dir, platform, config)
-                if output_path:
-                    outputs[platform] = output_path
-            except Exception as e:
-                outputs[platform] = f'Error: {str(e)}'
-
-            current_progress += progress_per_platform
-
-        # Prepare final status
-        final_status = {
-            'status': 'completed',
-            'progress': 100,
-            'message': 'Build completed!',
-            'outputs': outputs
-        }
-
-        # Add keystore info if we generated one
-        if keystore_generated and keystore_info:
-            final_status['keystore_generated'] = True
-            final_status['keystore_path'] = keystore_info['path']
-            final_status['keystore_info_path'] = keystore_info.get('info_path')
-
-        build_progress[build_id] = final_status
-        # ✅ Webhook on success
-        webhook_url = config.get('webhook_url')
-        payload = {
-            "build_id": build_id,
-            "status": final_status.get('status'),
-            "platforms": config.get('platforms'),
-            "outputs": final_status.get('outputs')
-        }
-
-        threading.Thread(
-            target=send_webhook_notification,
-            args=(webhook_url, payload),
-            daemon=True
-        ).start()
+                'progress': int(28 + 65 * finished / len(platforms)),
+                'message': f"Building {', '.join(building)}..." if building else 'Packaging outputs...',
+                'platforms': {p: dict(state) for p, state in platform_states.items()}
+            })
+
+        def build_lane(lane, lane_dir):
+            nonlocal finished
+            for platform in lane:
+                with state_lock:
+                    platform_states[platform] = {'status': 'building'}
+                    publish_progress()
+
+                try:
+                    with timings.platform(platform):
+                        output_path = build_platform(lane_dir, build_dir, platform, config)
+                except Exception as e:
+                    output_path = f'Error: {str(e)}'
+
+                if output_path and platform in cache_keys and not output_path.startswith('Error:'):
+                    try:
+                        artifact_cache.store(cache_keys[platform], output_path)
+                    except Exception as e:
+                        logger.warning(f"Failed to cache {platform} artifact of build {build_id}: {e}")
+
+                with state_lock:
+                    finished += 1
+                    state = {'log': f'/api/build/{build_id}/logs?platform={platform}'}
+                    if output_path:
+                        outputs[platform] = output_path
+                    if output_path and not output_path.startswith('Error:'):
+                        state['status'] = 'completed'
+                    else:
+                        state['status'] = 'error'
+                        state['message'] = output_path or 'Build produced no output'
+                    metrics.inc('swab_platform_builds_total', {'platform': platform, 'result': state['status']})
+                    platform_states[platform] = state
+                    publish_progress()
+
+                if config.get('webhook_stages'):
+                    send_webhook_notification(config.get('webhook_url'), {
+                        "event": "platform",
+                        "build_id": build_id,
+                        "platform": platform,
+                        "status": state['status'],
+                        "message": state.get('message')
+                    })
+
+        # Incremental builds compile in the package's (or their batch's) persistent workspace instead
+        build_lock = contextlib.nullcontext()
+        if incremental:
+            workspace_dir = incremental_workspace_dir(config.get('workspace') or config['package_name'])
+            build_lock = IncrementalWorkspaceLock(workspace_dir)
+
+        timings.stage('building')
+        with build_lock:
+            lanes = platform_lanes(platforms)
+            lane_root = f'{workspace_dir}.lanes' if incremental else os.path.join(build_dir, 'lanes')
+            lane_dirs = lane_project_dirs(project_dir, lanes, lane_root)
+
+            if incremental:
+                advance('syncing', 26, 'Updating incremental workspace...')
+                changed = sync_incremental_workspace(project_dir, workspace_dir)
+                logger.info(f"Build {build_id}: {changed} file(s) changed in incremental workspace {workspace_dir}")
+                shutil.rmtree(project_dir, ignore_errors=True)
+                lane_dirs = [workspace_dir if d == project_dir else d for d in lane_dirs]
+                project_dir = workspace_dir
+
+                # The first app of a batch workspace resolves; later apps only differ in app fields and skip it
+                advance('dependencies', 27, 'Getting dependencies...')
+                for lane_dir in dict.fromkeys(lane_dirs):
+                    if not resolve_dependencies(lane_dir, build_log):
+                        logger.info(f"Build {build_id}: dependencies of {lane_dir} unchanged, skipped flutter pub get")
+            build_log.close()
+
+            advance('building', 28, 'Building...')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(PLATFORM_CONCURRENCY, len(lanes))) as executor:
+                list(executor.map(build_lane, lanes, lane_dirs))
+
+        # Everything worth keeping now lives in outputs/, the intermediate project can go
+        if all(platform_states[p]['status'] == 'completed' for p in platforms):
+            storage_janitor.prune_project(build_dir)
+
+        complete_build(
+            build_id, config, outputs,
+            keystore_info=keystore_info if keystore_generated else None,
+            cached_platforms=cached_platforms,
+            platform_states=platform_states,
+            timings=timings.summary()
+        )
 
     except Exception as e:
+        # Close the log before the build turns terminal, readers then treat it as complete
+        if build_log:
+            build_log.close()
         error_status = {
             'status': 'error',
             'progress': 0,
-            'message': f'Build failed: {str(e)}'
+            'message': f'Build failed: {str(e)}',
+            'timings': timings.summary()
         }
-        build_progress[build_id] = error_status
+        build_store.set(build_id, error_status)
+        metrics.inc('swab_builds_total', {'status': 'error'})
 
         # ✅ Webhook on failure
         webhook_url = config.get('webhook_url')
         payload = {
+            "event": "build",
             "build_id": build_id,
             "status": "error",
             "error": str(e),
             "platforms": config.get('platforms')
         }
+        send_webhook_notification(webhook_url, payload)
 
-        threading.Thread(
-            target=send_webhook_notification,
-            args=(webhook_url, payload),
-            daemon=True
-        ).start()
+    finally:
+        if build_log:
+            build_log.close()
 
 
 def get_platform_display_name(platform):
@@ -549,263 +2093,1560 @@ def get_platform_display_name(platform):
         'ios': 'iOS',
         'macos': 'macOS',
         'windows': 'Windows',
-        'linux': 'Linux'
+        'linux': 'Linux',
+        'web': 'Web'
     }
     return names.get(platform, platform)
 
-def update_android_config(project_dir, config):
-    """Update Android configuration"""
-    build_gradle_path = os.path.join(project_dir, 'android', 'app', 'build.gradle.kts')
-    if os.path.exists(build_gradle_path):
-        with open(build_gradle_path, 'r') as f:
-            content = f.read()
+def collect_bundle(bundle_dir, output_path, persistent=False):
+    """Move a bundle directory into the build outputs; it is zipped on the fly when downloaded.
 
-        # Replace placeholders
-        content = content.replace('{{APP_PACKAGE_NAME}}', config['package_name'])
-        content = content.replace('{{APP_VERSION}}', config['app_version'])
-        content = content.replace('{{APP_BUILD_NUMBER}}', str(config['build_number']))
+    Bundles of a persistent incremental or batch workspace are copied instead,
+    so the next build there still finds its previous output to update. They
+    are not hardlinked, the toolchain may rewrite those files in place.
+    """
+    shutil.rmtree(output_path, ignore_errors=True)
+    if persistent:
+        shutil.copytree(bundle_dir, output_path, symlinks=True)
+    else:
+        shutil.move(bundle_dir, output_path)
+    return output_path
+
+def platform_lanes(platforms):
+    """Group platforms into lanes that may build concurrently.
+
+    APK and AAB builds run back to back in one lane so the App Bundle reuses
+    the warm Gradle daemon and the intermediates of the APK build.
+    """
+    android = [p for p in ('android', 'android_aab') if p in platforms]
+    lanes = [android] if android else []
+    lanes.extend([p] for p in platforms if p not in ('android', 'android_aab'))
+    return lanes
+
+def lane_project_dirs(project_dir, lanes, lane_root):
+    """Directory each lane builds in, one per lane of ``platform_lanes``.
+
+    Concurrent ``flutter build`` runs over one project share .dart_tool/ and
+    build/ and can corrupt each other's intermediates, so when lanes build in
+    parallel every lane but the first gets its own mirror of the configured
+    and resolved project below ``lane_root``. Mirrors that persist, as next
+    to an incremental workspace, keep their toolchain state between builds.
+    """
+    lane_dirs = [project_dir] * len(lanes)
+    if PLATFORM_CONCURRENCY > 1:
+        for index, lane in enumerate(lanes[1:], start=1):
+            lane_dirs[index] = os.path.join(lane_root, '-'.join(lane))
+            sync_incremental_workspace(project_dir, lane_dirs[index])
+    return lane_dirs
 
-        # Handle keystore configuration
-        keystore_path = config.get('keystore_path', '')
-        keystore_password = config.get('keystore_password', '')
-        key_alias = config.get('key_alias', '')
-        key_password = config.get('key_password', '')
+def build_platform(project_dir, build_dir, platform, config):
+    """Build for a specific platform - always uses release mode"""
+    output_dir = os.path.join(build_dir, 'outputs')
+    os.makedirs(output_dir, exist_ok=True)
+    with BuildLog(build_log_path(build_dir, platform)) as log:
+        return _build_platform(project_dir, output_dir, platform, config, log)
 
-        if keystore_path and os.path.exists(keystore_path):
-            content = content.replace('{{KEYSTORE_PATH}}', keystore_path)
-            content = content.replace('{{KEYSTORE_PASSWORD}}', keystore_password)
-            content = content.replace('{{KEY_ALIAS}}', key_alias)
-            content = content.replace('{{KEY_PASSWORD}}', key_password)
-        else:
-            # Remove signing config for release and use debug signing
-            content = re.sub(
-                r'signingConfigs\s*\{[^}]*create\("release"\)[^}]*\}[^}]*\}',
-                '',
-                content,
-                flags=re.DOTALL
-            )
-            content = re.sub(
-                r'signingConfig\s*=\s*signingConfigs\.getByName\("release"\)',
-                'signingConfig = signingConfigs.getByName("debug")',
-                content
+def _build_platform(project_dir, output_dir, platform, config, log):
+    """Run the platform's toolchain command into ``log`` and collect its output"""
+    persistent = bool(config.get('incremental'))
+    if platform == 'android':
+        run_toolchain(['flutter', 'build', 'apk', '--release'], project_dir, log, timeout=600)
+        apk_path = os.path.join(project_dir, 'build', 'app', 'outputs', 'flutter-apk', 'app-release.apk')
+        if os.path.exists(apk_path):
+            output_path = os.path.join(output_dir, f'{config["app_name"]}.apk')
+            shutil.copy(apk_path, output_path)
+            return output_path
+
+    elif platform == 'android_aab':
+        run_toolchain(['flutter', 'build', 'appbundle', '--release'], project_dir, log, timeout=600)
+        aab_path = os.path.join(project_dir, 'build', 'app', 'outputs', 'bundle', 'release', 'app-release.aab')
+        if os.path.exists(aab_path):
+            output_path = os.path.join(output_dir, f'{config["app_name"]}.aab')
+            shutil.copy(aab_path, output_path)
+            return output_path
+
+    elif platform == 'ios':
+        run_toolchain(['flutter', 'build', 'ios', '--release', '--no-codesign'], project_dir, log, timeout=600)
+        app_path = os.path.join(project_dir, 'build', 'ios', 'iphoneos')
+        if os.path.exists(os.path.join(app_path, 'Runner.app')):
+            return collect_bundle(app_path, os.path.join(output_dir, f'{config["app_name"]}_ios'), persistent)
+
+    elif platform == 'web':
+        run_toolchain(['flutter', 'build', 'web', '--release'], project_dir, log, timeout=300)
+        web_dir = os.path.join(project_dir, 'build', 'web')
+        if os.path.exists(web_dir):
+            return collect_bundle(web_dir, os.path.join(output_dir, f'{config["app_name"]}_web'), persistent)
+
+    elif platform == 'macos':
+        run_toolchain(['flutter', 'build', 'macos', '--release'], project_dir, log, timeout=600)
+        app_path = os.path.join(project_dir, 'build', 'macos', 'Build', 'Products', 'Release')
+        if os.path.exists(app_path):
+            return collect_bundle(app_path, os.path.join(output_dir, f'{config["app_name"]}_macos'), persistent)
+
+    elif platform == 'windows':
+        run_toolchain(['flutter', 'build', 'windows', '--release'], project_dir, log, timeout=600)
+        exe_dir = os.path.join(project_dir, 'build', 'windows', 'x64', 'runner', 'Release')
+        if os.path.exists(exe_dir):
+            return collect_bundle(exe_dir, os.path.join(output_dir, f'{config["app_name"]}_windows'), persistent)
+
+    elif platform == 'linux':
+        run_toolchain(['flutter', 'build', 'linux', '--release'], project_dir, log, timeout=600)
+        linux_dir = os.path.join(project_dir, 'build', 'linux', 'x64', 'release', 'bundle')
+        if os.path.exists(linux_dir):
+            return collect_bundle(linux_dir, os.path.join(output_dir, f'{config["app_name"]}_linux'), persistent)
+
+    return None
+
+# ---------------- Workspace Pool ----------------
+
+# Neutral pubspec values used for pre-resolved workspaces; run_build replaces them per app
+WORKSPACE_PUBSPEC_VALUES = {
+    'name: {{APP_PACKAGE_NAME}}': 'name: webview_app',
+    'description: {{APP_DESCRIPTION}}': 'description: "A new Flutter project."',
+    'version: {{APP_VERSION}}+{{APP_BUILD_NUMBER}}': 'version: 1.0.0+1',
+}
+
+
+class WorkspacePool:
+    """Keeps ready-to-use Flutter project directories for upcoming builds.
+
+    Each workspace is a copy of the template whose dependencies, including
+    the dev tools, have already been resolved with ``flutter pub get``. A
+    build checks one out with a single directory rename and only renders the
+    app fields into pubspec.yaml, so ``resolve_dependencies`` finds the
+    dependency section unchanged and skips resolution; when the pool is
+    empty the caller falls back to copying the template itself.
+    """
+
+    FAILURE_BACKOFF = 60
+    # Names of the directories the pool creates below its root
+    WORKSPACE_NAME = re.compile(r'(?:preparing|ready)-[0-9a-f]{32}')
+
+    def __init__(self, root, template_dir, size, refill_interval):
+        self.root = root
+        self.template_dir = template_dir
+        self.size = max(0, size)
+        self.refill_interval = max(0.0, refill_interval)
+
+        self._cond = threading.Condition()
+        self._ready = collections.deque()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def start(self):
+        """Start the background refill thread (idempotent)"""
+        with self._cond:
+            if self._thread or not self.size:
+                return
+            # Workspaces left over from a previous run may predate template changes
+            os.makedirs(self.root, exist_ok=True)
+            for name in os.listdir(self.root):
+                if self.WORKSPACE_NAME.fullmatch(name):
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            self._thread = threading.Thread(target=self._refill, name='workspace-pool', daemon=True)
+            self._thread.start()
+        logger.info(f"Workspace pool started with size {self.size}")
+
+    def checkout(self, project_dir):
+        """Move a warm workspace to ``project_dir``, returning False on a pool miss"""
+        with self._cond:
+            workspace = self._ready.popleft() if self._ready else None
+            if workspace is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            metrics.inc('swab_cache_lookups_total', {'cache': 'workspace', 'result': 'miss' if workspace is None else 'hit'})
+            self._cond.notify_all()
+
+        if workspace is None:
+            return False
+        try:
+            os.replace(workspace, project_dir)
+        except OSError as e:
+            logger.warning(f"Failed to check out workspace {workspace}: {e}")
+            shutil.rmtree(workspace, ignore_errors=True)
+            return False
+        return True
+
+    def stats(self):
+        with self._cond:
+            lookups = self.hits + self.misses
+            return {
+                'size': self.size,
+                'ready': len(self._ready),
+                'refill_interval_seconds': self.refill_interval,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'failures': self.failures,
+            }
+
+    def _refill(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._ready) < self.size)
+
+            workspace = self._prepare()
+            with self._cond:
+                if workspace:
+                    self._ready.append(workspace)
+                else:
+                    self.failures += 1
+            time.sleep(self.refill_interval if workspace else self.FAILURE_BACKOFF)
+
+    def _prepare(self):
+        """Copy the template and resolve its dependencies, returning the ready path"""
+        workspace_id = uuid.uuid4().hex
+        staging_dir = os.path.join(self.root, f'preparing-{workspace_id}')
+        try:
+            shutil.copytree(self.template_dir, staging_dir)
+
+            pubspec_path = os.path.join(staging_dir, 'pubspec.yaml')
+            with open(pubspec_path, 'r') as f:
+                pubspec = f.read()
+            for placeholder, value in WORKSPACE_PUBSPEC_VALUES.items():
+                pubspec = pubspec.replace(placeholder, value)
+            with open(pubspec_path, 'w') as f:
+                f.write(add_dev_tools(pubspec))
+
+            resolve_dependencies(staging_dir)
+
+            ready_dir = os.path.join(self.root, f'ready-{workspace_id}')
+            os.replace(staging_dir, ready_dir)
+            return ready_dir
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Failed to prepare workspace: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None
+
+
+workspace_pool = WorkspacePool(
+    root=os.path.join(app.config['BUILD_FOLDER'], '_workspaces'),
+    template_dir=app.config['FLUTTER_TEMPLATE'],
+    size=int(os.getenv('SWAB_WORKSPACE_POOL_SIZE', '2')),
+    refill_interval=float(os.getenv('SWAB_WORKSPACE_REFILL_INTERVAL', '5')),
+)
+
+# ---------------- Artifact Cache ----------------
+
+# Config keys that never influence the built artifact. Uploaded files are
+# keyed by their content hash instead of their path.
+CACHE_EXCLUDED_KEYS = {
+    'keystore_password', 'key_password', 'webhook_url', 'webhook_stages',
+    'keystore_path', 'icon_path', 'platforms', 'incremental', 'workspace', 'batch_id',
+}
+
+# iOS produces an unsigned .app directory inside the project, so it is never cached
+CACHEABLE_PLATFORMS = {'android', 'android_aab', 'web', 'macos', 'windows', 'linux'}
+
+_template_hash = None
+_toolchain_version = None
+_fingerprint_lock = threading.Lock()
+
+def template_hash():
+    """Hash of every file in the Flutter template, computed once per process"""
+    global _template_hash
+    with _fingerprint_lock:
+        if _template_hash is None:
+            _template_hash = tree_sha256(app.config['FLUTTER_TEMPLATE'])
+        return _template_hash
+
+def toolchain_version():
+    """Flutter framework revision and Dart SDK version, queried once per process"""
+    global _toolchain_version
+    with _fingerprint_lock:
+        if _toolchain_version is None:
+            try:
+                with timed_command(['flutter', '--version', '--machine']):
+                    result = subprocess.run(
+                        ['flutter', '--version', '--machine'],
+                        capture_output=True,
+                        text=True,
+                        timeout=60
+                    )
+                info = json.loads(result.stdout)
+                _toolchain_version = f"{info.get('frameworkRevision')}/{info.get('dartSdkVersion')}"
+            except (OSError, subprocess.SubprocessError, ValueError):
+                _toolchain_version = 'unknown'
+        return _toolchain_version
+
+
+class ArtifactCache:
+    """Content-addressed store of build outputs with an LRU size cap.
+
+    Artifacts are stored once per SHA-256 digest under ``objects/`` and
+    referenced from an SQLite index by cache key, so identical outputs of
+    different configs share disk space. When the store grows beyond
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            cache_key TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries (digest);
+        CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _db(self):
+        # Opened on first use in each process, never shared across fork
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.join(self.root, 'objects'), exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, 'index.db'), timeout=30, check_same_thread=False)
+            self._conn_pid = os.getpid()
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def keys_for(self, config):
+        """Map every cacheable platform of a build to its cache key"""
+        if not self.enabled:
+            return {}
+
+        # Project asset references hash from the container index without decrypting the asset
+        icon = asset_info(config.get('icon_path'))
+        keystore = asset_info(config.get('keystore_path'))
+        has_keystore = keystore is not None
+
+        normalized = {k: v for k, v in config.items() if k not in CACHE_EXCLUDED_KEYS}
+        normalized['icon_sha256'] = icon[1] if icon else None
+        normalized['keystore_sha256'] = keystore[1] if keystore else None
+        normalized['template_sha256'] = template_hash()
+        normalized['toolchain'] = toolchain_version()
+        normalized['lockfile_sha256'] = file_sha256(PUB_LOCKFILE) if PUB_LOCKFILE else None
+
+        keys = {}
+        for platform in config['platforms']:
+            if platform not in CACHEABLE_PLATFORMS:
+                continue
+            # Without a supplied keystore every build signs with a freshly generated key
+            if platform in ('android', 'android_aab') and not has_keystore:
+                continue
+            payload = json.dumps(dict(normalized, platform=platform), sort_keys=True, default=str)
+            keys[platform] = hashlib.sha256(payload.encode()).hexdigest()
+        return keys
+
+    def restore(self, cache_keys, output_dir):
+        """Place every cached artifact in ``output_dir`` and return their paths by platform.
+
+        Artifacts are linked while the lock is held, so this process cannot
+        evict them halfway. One that is evicted by another process meanwhile
+        fails to link and counts as a miss, the platform is then built again.
+        """
+        outputs = {}
+        for platform, cache_key in cache_keys.items():
+            with self._lock:
+                conn = self._db()
+                row = conn.execute(
+                    'SELECT digest, filename FROM entries WHERE cache_key = ?', (cache_key,)
+                ).fetchone()
+                output_path = None
+                if row is not None:
+                    digest, filename = row
+                    output_path = os.path.join(output_dir, filename)
+                    try:
+                        os.makedirs(output_dir, exist_ok=True)
+                        object_path = self._object_path(digest)
+                        if os.path.isdir(object_path):
+                            shutil.copytree(object_path, output_path, copy_function=link_or_copy, dirs_exist_ok=True)
+                        else:
+                            link_or_copy(object_path, output_path)
+                    except OSError as e:
+                        logger.warning(f"Failed to restore cached {platform} artifact: {e}")
+                        if os.path.isdir(output_path):
+                            shutil.rmtree(output_path, ignore_errors=True)
+                        elif os.path.exists(output_path):
+                            os.remove(output_path)
+                        output_path = None
+
+                if output_path is None:
+                    self.misses += 1
+                    metrics.inc('swab_cache_lookups_total', {'cache': 'artifact', 'result': 'miss'})
+                    continue
+                self.hits += 1
+                metrics.inc('swab_cache_lookups_total', {'cache': 'artifact', 'result': 'hit'})
+                with conn:
+                    conn.execute('UPDATE entries SET last_used = ? WHERE cache_key = ?', (time.time(), cache_key))
+            outputs[platform] = output_path
+        return outputs
+
+    def store(self, cache_key, path):
+        """Add a built artifact, a file or a bundle directory, to the cache"""
+        if not self.enabled or not os.path.exists(path):
+            return
+
+        is_dir = os.path.isdir(path)
+        digest = tree_sha256(path) if is_dir else file_sha256(path)
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f'{object_path}.{uuid.uuid4().hex}.tmp'
+            if is_dir:
+                shutil.copytree(path, tmp_path, copy_function=link_or_copy)
+            else:
+                shutil.copy(path, tmp_path)
+            os.replace(tmp_path, object_path)
+
+        if is_dir:
+            size = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, dirs, files in os.walk(object_path) for name in files
             )
+        else:
+            size = os.path.getsize(object_path)
+
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (cache_key, digest, filename, size, created_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (cache_key, digest, os.path.basename(path), size, now, now)
+                )
+            self._evict(conn)
+
+    def _total_bytes(self, conn):
+        row = conn.execute('SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM entries)').fetchone()
+        return row[0] or 0
+
+    def _evict(self, conn):
+        total = self._total_bytes(conn)
+        while total > self.max_bytes:
+            row = conn.execute(
+                'SELECT cache_key, digest, size FROM entries ORDER BY last_used LIMIT 1'
+            ).fetchone()
+            if row is None:
+                break
+            cache_key, digest, size = row
+            with conn:
+                conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+            self.evictions += 1
+            still_referenced = conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone()
+            if not still_referenced:
+                object_path = self._object_path(digest)
+                if os.path.isdir(object_path):
+                    # Moved away first, so a restore never sees a half deleted bundle
+                    evicted_path = f'{object_path}.{uuid.uuid4().hex}.evicted'
+                    try:
+                        os.replace(object_path, evicted_path)
+                    except OSError:
+                        evicted_path = object_path
+                    shutil.rmtree(evicted_path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(object_path)
+                    except OSError:
+                        pass
+                total -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'enabled': self.enabled,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+            }
+            if self.enabled:
+                conn = self._db()
+                stats['entries'] = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+                stats['objects'] = conn.execute('SELECT COUNT(DISTINCT digest) FROM entries').fetchone()[0]
+                stats['bytes'] = self._total_bytes(conn)
+            return stats
 
-        # Also handle old-style replacements for backwards compatibility
-        content = re.sub(
-            r'namespace\s*=\s*"[^"]*"',
-            f'namespace = "{config["package_name"]}"',
-            content
-        )
-        content = re.sub(
-            r'applicationId\s*=\s*"[^"]*"',
-            f'applicationId = "{config["package_name"]}"',
-            content
-        )
 
-        with open(build_gradle_path, 'w') as f:
-            f.write(content)
+artifact_cache = ArtifactCache(
+    root=os.path.join(app.config['BUILD_FOLDER'], '_cache'),
+    max_bytes=int(os.getenv('SWAB_ARTIFACT_CACHE_MAX_BYTES', str(10 * 1024 ** 3))),
+)
 
-    # Update AndroidManifest.xml label
-    manifest_path = os.path.join(project_dir, 'android', 'app', 'src', 'main', 'AndroidManifest.xml')
-    if os.path.exists(manifest_path):
+# ---------------- Incremental Workspaces ----------------
+
+# Toolchain-owned directories that hold incremental build state; never synced
+INCREMENTAL_EXCLUDED_DIRS = {'build', '.gradle', '.cxx', '.kotlin', 'ephemeral', 'Pods', '.symlinks'}
+INCREMENTAL_MANIFEST = '.swab-sync.json'
+
+_incremental_locks = {}
+_incremental_locks_guard = threading.Lock()
+
+def incremental_workspace_dir(package_name):
+    """Persistent project directory shared by every incremental build of a package"""
+    name = sanitize_package_name(package_name) or 'default'
+    return os.path.join(app.config['BUILD_FOLDER'], '_incremental', name)
+
+
+class IncrementalWorkspaceLock:
+    """Exclusive lock on an incremental workspace, across threads and processes"""
+
+    def __init__(self, workspace_dir):
+        self.workspace_dir = workspace_dir
+        with _incremental_locks_guard:
+            self._thread_lock = _incremental_locks.setdefault(workspace_dir, threading.Lock())
+        self._lock_file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.workspace_dir), exist_ok=True)
+            self._lock_file = open(f'{self.workspace_dir}.lock', 'w')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self._thread_lock.release()
+
+
+def remove_incremental_workspace(name):
+    """Delete an incremental workspace once no build will use it again"""
+    workspace_dir = incremental_workspace_dir(name)
+    with IncrementalWorkspaceLock(workspace_dir):
+        shutil.rmtree(workspace_dir, ignore_errors=True)
+        shutil.rmtree(f'{workspace_dir}.lanes', ignore_errors=True)
+    with _incremental_locks_guard:
+        _incremental_locks.pop(workspace_dir, None)
+    try:
+        os.remove(f'{workspace_dir}.lock')
+    except OSError:
+        pass
+
+
+def sync_incremental_workspace(source_dir, workspace_dir):
+    """Mirror a freshly configured project into the persistent workspace.
+
+    Only files whose content changed since the previous sync are rewritten,
+    so unchanged sources keep their timestamps and Gradle, CMake and the Dart
+    compiler only redo the work affected by the new configuration. Files the
+    toolchain generated itself are left alone. Returns the number of files
+    written or removed.
+    """
+    os.makedirs(workspace_dir, exist_ok=True)
+    manifest_path = os.path.join(workspace_dir, INCREMENTAL_MANIFEST)
+    try:
         with open(manifest_path, 'r') as f:
-            content = f.read()
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    current = {}
+    changed = 0
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [d for d in dirs if d not in INCREMENTAL_EXCLUDED_DIRS]
+        for name in files:
+            source_path = os.path.join(root, name)
+            relpath = os.path.relpath(source_path, source_dir)
+            digest = file_sha256(source_path)
+            current[relpath] = digest
+
+            target_path = os.path.join(workspace_dir, relpath)
+            if previous.get(relpath) == digest and os.path.exists(target_path):
+                continue
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.copy2(source_path, target_path)
+            changed += 1
+
+    for relpath in set(previous) - set(current):
+        try:
+            os.remove(os.path.join(workspace_dir, relpath))
+            changed += 1
+        except OSError:
+            pass
+
+    with open(manifest_path, 'w') as f:
+        json.dump(current, f)
+    return changed
+
+# ---------------- Project Library ----------------
+
+SAVED_PROJECTS_FOLDER = os.path.join(app.config['BUILD_FOLDER'], 'saved_projects')
+
+def read_project_settings(path):
+    """Return the project.json settings of a saved .swab file"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(SWAB_V3_MAGIC))
+    if magic == SWAB_V3_MAGIC:
+        with SwabContainer(path) as container:
+            return container.project
+
+    # Older files only carry their settings inside the encrypted zip
+    with tempfile.TemporaryFile() as buffer:
+        with open(path, 'rb') as src:
+            decrypt_stream(src, buffer)
+        buffer.seek(0)
+        with zipfile.ZipFile(buffer) as zipf:
+            return json.loads(zipf.read('project.json'))
+
+
+class ProjectLibrary:
+    """SQLite catalogue of the projects in SAVED_PROJECTS_FOLDER.
+
+    Rows are written when a project is saved, so listing and searching never
+    touch the .swab files. ``sync`` indexes files that were saved before the
+    catalogue existed or copied in by hand, and drops rows of deleted files.
+    """
 
-        content = content.replace('{{APP_NAME}}', config['app_name'])
-        content = re.sub(
-            r'android:label="[^"]*"',
-            f'android:label="{config["app_name"]}"',
-            content
-        )
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            filename TEXT PRIMARY KEY,
+            app_name TEXT NOT NULL,
+            package_name TEXT NOT NULL,
+            app_version TEXT NOT NULL,
+            build_number TEXT NOT NULL,
+            web_url TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_projects_app_name ON projects (app_name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_projects_package_name ON projects (package_name);
+        CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects (updated_at);
+    """
 
-        with open(manifest_path, 'w') as f:
-            f.write(content)
-
-def update_ios_config(project_dir, config):
-    """Update iOS configuration"""
-    info_plist_path = os.path.join(project_dir, 'ios', 'Runner', 'Info.plist')
-    if os.path.exists(info_plist_path):
-        with open(info_plist_path, 'r') as f:
-            content = f.read()
-
-        # Update bundle display name
-        content = re.sub(
-            r'(<key>CFBundleDisplayName</key>\s*<string>)[^<]*(</string>)',
-            f'\\g<1>{config["app_name"]}\\g<2>',
-            content
-        )
-        content = re.sub(
-            r'(<key>CFBundleName</key>\s*<string>)[^<]*(</string>)',
-            f'\\g<1>{config["app_name"]}\\g<2>',
-            content
+    SORT_COLUMNS = {
+        'app_name': 'app_name COLLATE NOCASE',
+        'package_name': 'package_name',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    MAX_PER_PAGE = 100
+
+    def __init__(self, root, path):
+        self.root = root
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(root, exist_ok=True)
+        # The schema is created over a short-lived connection, so none is open at import time
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use in each process"""
+        conn = getattr(self._local, 'conn', None)
+        # Never reuse a connection inherited through fork, e.g. by preloaded gunicorn workers
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def start(self):
+        """Reconcile the catalogue with the saved projects folder in the background"""
+        threading.Thread(target=self.sync, daemon=True).start()
+
+    def record(self, filename, project_data, now=None):
+        """Insert or refresh the row of a saved project file"""
+        now = now or time.time()
+        stat = os.stat(os.path.join(self.root, filename))
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO projects (filename, app_name, package_name, app_version, build_number, '
+                'web_url, size, mtime, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(filename) DO UPDATE SET '
+                'app_name = excluded.app_name, package_name = excluded.package_name, '
+                'app_version = excluded.app_version, build_number = excluded.build_number, '
+                'web_url = excluded.web_url, size = excluded.size, mtime = excluded.mtime, '
+                'updated_at = excluded.updated_at',
+                (
+                    filename,
+                    str(project_data.get('app_name', '')),
+                    str(project_data.get('package_name', '')),
+                    str(project_data.get('app_version', '')),
+                    str(project_data.get('build_number', '')),
+                    str(project_data.get('web_url', '')),
+                    stat.st_size, stat.st_mtime, now, now,
+                )
+            )
+
+    def sync(self):
+        """Index new or changed .swab files and forget deleted ones"""
+        conn = self._connect()
+        known = dict(conn.execute('SELECT filename, mtime FROM projects'))
+        present = set()
+        added = 0
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith('.swab') or not entry.is_file():
+                continue
+            present.add(entry.name)
+            mtime = entry.stat().st_mtime
+            if known.get(entry.name) == mtime:
+                continue
+            try:
+                project_data = read_project_settings(entry.path)
+            except Exception as e:
+                logger.warning(f"Could not index saved project {entry.name}: {e}")
+                continue
+            self.record(entry.name, project_data, now=mtime)
+            added += 1
+
+        removed = [(name,) for name in set(known) - present]
+        with conn:
+            conn.executemany('DELETE FROM projects WHERE filename = ?', removed)
+        if added or removed:
+            logger.info(f"Project library synced: {added} indexed, {len(removed)} removed")
+        return added, len(removed)
+
+    def query(self, filters=None, search=None, sort='updated_at', order='desc', page=1, per_page=20):
+        """Return one page of projects matching ``filters`` and the free-text ``search``"""
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            if column == 'app_name':
+                clauses.append("app_name LIKE ? ESCAPE '\\'")
+                params.append(self._like(value, prefix=True))
+            elif column in ('package_name', 'app_version', 'build_number'):
+                clauses.append(f'{column} = ?')
+                params.append(value)
+            elif column == 'web_url':
+                clauses.append("web_url LIKE ? ESCAPE '\\'")
+                params.append(self._like(value))
+            elif column == 'saved_after':
+                clauses.append('updated_at >= ?')
+                params.append(value)
+            elif column == 'saved_before':
+                clauses.append('updated_at < ?')
+                params.append(value)
+        if search:
+            for term in search.split():
+                clauses.append(
+                    "(app_name LIKE ? ESCAPE '\\' OR package_name LIKE ? ESCAPE '\\' OR web_url LIKE ? ESCAPE '\\')"
+                )
+                params.extend([self._like(term)] * 3)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        order_by = f"{self.SORT_COLUMNS[sort]} {'ASC' if order == 'asc' else 'DESC'}, filename"
+        per_page = max(1, min(per_page, self.MAX_PER_PAGE))
+        page = max(1, page)
+
+        conn = self._connect()
+        total = conn.execute(f'SELECT COUNT(*) FROM projects {where}', params).fetchone()[0]
+        rows = conn.execute(
+            'SELECT filename, app_name, package_name, app_version, build_number, web_url, size, '
+            f'created_at, updated_at FROM projects {where} ORDER BY {order_by} LIMIT ? OFFSET ?',
+            (*params, per_page, (page - 1) * per_page)
+        ).fetchall()
+        columns = ('filename', 'app_name', 'package_name', 'app_version', 'build_number',
+                   'web_url', 'size', 'created_at', 'updated_at')
+        return {
+            'projects': [dict(zip(columns, row)) for row in rows],
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': math.ceil(total / per_page),
+        }
+
+    @staticmethod
+    def _like(value, prefix=False):
+        escaped = re.sub(r'([\\%_])', r'\\\1', str(value))
+        return f'{escaped}%' if prefix else f'%{escaped}%'
+
+
+project_library = ProjectLibrary(
+    SAVED_PROJECTS_FOLDER,
+    os.getenv('SWAB_LIBRARY_DB', os.path.join(SAVED_PROJECTS_FOLDER, 'library.db'))
+)
+
+# ---------------- Build Queue ----------------
+
+# Relative resource cost of one job per target platform. Gradle and Xcode builds
+# are memory hungry, so they count more against the pool capacity than web builds.
+PLATFORM_WEIGHTS = {
+    'android': 2,
+    'android_aab': 2,
+    'ios': 2,
+    'macos': 2,
+    'windows': 2,
+    'linux': 1,
+    'web': 1,
+}
+
+
+class QueueFullError(Exception):
+    """Raised when the build queue cannot accept another job"""
+
+    def __init__(self, retry_after):
+        super().__init__('Build queue is full')
+        self.retry_after = retry_after
+
+
+class BuildQueue:
+    """Fixed-size worker pool fed by a FIFO queue of weighted build jobs.
+
+    A job only starts when a worker is free and its weight fits into the
+    remaining capacity. The head of the queue is never skipped, so large jobs
+    cannot be starved by a stream of small ones. ``max_pending`` caps waiting
+    submissions; all apps of one batch take a single slot. Pending and running
+    jobs are persisted to ``state_path`` and re-queued when the process
+    restarts.
+    """
+
+    def __init__(self, workers, capacity, max_pending, state_path, default_duration=300.0):
+        self.workers = max(1, workers)
+        self.capacity = max(1, capacity)
+        self.max_pending = max(1, max_pending)
+        self.state_path = state_path
+        self.avg_duration = float(default_duration)
+
+        self._cond = threading.Condition()
+        self._pending = collections.deque()
+        self._running = {}
+        self._used = 0
+        self._threads = []
+        # Queue positions are written to build_store outside self._cond, newest snapshot wins
+        self._snapshot = 0
+        self._published = 0
+        self._publish_lock = threading.Lock()
+        self._announced = set()
+
+    def job_weight(self, config):
+        """Resource weight of a job: its heaviest lanes that may build at the same time"""
+        lane_weights = sorted(
+            (max(PLATFORM_WEIGHTS.get(p, 1) for p in lane) for lane in platform_lanes(config.get('platforms', []))),
+            reverse=True
         )
+        weight = sum(lane_weights[:PLATFORM_CONCURRENCY]) or 1
+        return min(weight, self.capacity)
+
+    def start(self):
+        """Restore persisted jobs and start the worker threads (idempotent)"""
+        with self._cond:
+            if self._threads:
+                return
+            self._restore()
+            snapshot = self._positions()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'build-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._publish(*snapshot)
+        logger.info(f"Build queue started with {self.workers} workers, capacity {self.capacity}")
+
+    def submit(self, build_id, config):
+        """Enqueue a job and return its queue position and start estimate"""
+        return self.submit_many([(build_id, config)])[0]
+
+    def submit_many(self, builds):
+        """Enqueue ``(build_id, config)`` jobs all at once, or none if they do not fit"""
+        with self._cond:
+            slots = self._slots(builds) | self._slots((job['build_id'], job['config']) for job in self._pending)
+            if len(slots) > self.max_pending:
+                raise QueueFullError(self._retry_after())
+
+            for build_id, config in builds:
+                self._pending.append({
+                    'build_id': build_id,
+                    'config': config,
+                    'weight': self.job_weight(config),
+                    'submitted_at': time.time(),
+                })
+            self._persist()
+            snapshot = self._positions()
+            self._cond.notify_all()
+
+        self._publish(*snapshot)
+        statuses = dict(snapshot[1])
+        now = time.time()
+        queued = []
+        for build_id, _ in builds:
+            # Jobs a worker already picked up are reported at the head of the queue
+            status = statuses.get(build_id) or self._queued_status(1, now)
+            queued.append({
+                'queue_position': status['queue_position'],
+                'estimated_start': status['estimated_start'],
+                'estimated_wait_seconds': max(0, int(status['estimated_start'] - now)),
+            })
+        return queued
+
+    def active_build_ids(self):
+        """Ids of queued and running builds"""
+        with self._cond:
+            return set(self._running) | {job['build_id'] for job in self._pending}
+
+    def persisted_jobs(self):
+        """Queued and running jobs as last written to ``state_path``, as any process sees them"""
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'capacity_used': self._used,
+                'running': len(self._running),
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'avg_duration_seconds': round(self.avg_duration, 1),
+            }
+
+    def _queued_status(self, position, estimated_start):
+        return {
+            'status': 'queued',
+            'progress': 0,
+            'message': f'Waiting in build queue (position {position})...',
+            'queue_position': position,
+            'estimated_start': estimated_start,
+        }
+
+    def _can_start(self, job):
+        return len(self._running) < self.workers and self._used + job['weight'] <= self.capacity
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not (self._pending and self._can_start(self._pending[0])):
+                    self._cond.wait()
+                job = self._pending.popleft()
+                self._used += job['weight']
+                self._running[job['build_id']] = dict(job, started_at=time.time())
+                self._persist()
+                snapshot = self._positions()
+
+            # Published before run_build so no older snapshot can mark this job queued again
+            self._publish(*snapshot, started=job['build_id'])
+            started = time.time()
+            metrics.observe('swab_queue_wait_seconds', max(0.0, started - job['submitted_at']))
+            try:
+                # run_build fills in generated paths; the persisted config must keep the originals
+                run_build(job['build_id'], dict(job['config']))
+            except Exception:
+                logger.exception(f"Build worker crashed on {job['build_id']}")
+            finally:
+                metrics.observe('swab_build_duration_seconds', time.time() - started)
+                with self._cond:
+                    self._used -= job['weight']
+                    self._running.pop(job['build_id'], None)
+                    # Exponential moving average keeps estimates close to recent load
+                    self.avg_duration = 0.8 * self.avg_duration + 0.2 * (time.time() - started)
+                    self._persist()
+                    snapshot = self._positions()
+                    self._cond.notify_all()
+                    workspace = job['config'].get('workspace')
+                    workspace_done = workspace and not any(
+                        other['config'].get('workspace') == workspace
+                        for other in itertools.chain(self._pending, self._running.values())
+                    )
+                self._publish(*snapshot)
+                if job['config'].get('batch_id'):
+                    finish_batch_app(job['config']['batch_id'])
+                # A batch workspace is only useful to the apps of its batch
+                if workspace_done:
+                    remove_incremental_workspace(workspace)
+
+    @staticmethod
+    def _slots(builds):
+        """Queue slots taken by ``(build_id, config)`` pairs, one per build or batch"""
+        return {config.get('batch_id') or build_id for build_id, config in builds}
+
+    def _positions(self):
+        """Snapshot the queued status of every pending job; call with self._cond held"""
+        self._snapshot += 1
+        return self._snapshot, [
+            (job['build_id'], self._queued_status(index + 1, start))
+            for index, (job, start) in enumerate(zip(self._pending, self._estimate_starts()))
+        ]
 
-        with open(info_plist_path, 'w') as f:
-            f.write(content)
+    def _publish(self, snapshot, statuses, started=None):
+        """Write a ``_positions`` snapshot to build_store unless a newer one was written already.
+
+        Runs outside self._cond so hundreds of store writes never hold up the
+        queue. A job's first status is recorded in its history, later position
+        updates only replace the current state.
+        """
+        with self._publish_lock:
+            self._announced.discard(started)
+            if snapshot < self._published:
+                return
+            self._published = snapshot
+            for build_id, status in statuses:
+                build_store.set(build_id, status, record=build_id not in self._announced)
+                self._announced.add(build_id)
+
+    def _estimate_starts(self):
+        """Simulate the schedule to estimate when each pending job starts"""
+        now = time.time()
+        finishing = [
+            (max(job['started_at'] + self.avg_duration, now), job['weight'])
+            for job in self._running.values()
+        ]
+        heapq.heapify(finishing)
+        used = self._used
+        busy = len(self._running)
+        clock = now
+
+        starts = []
+        for job in self._pending:
+            while finishing and (busy >= self.workers or used + job['weight'] > self.capacity):
+                finished_at, weight = heapq.heappop(finishing)
+                clock = max(clock, finished_at)
+                used -= weight
+                busy -= 1
+            starts.append(clock)
+            heapq.heappush(finishing, (clock + self.avg_duration, job['weight']))
+            used += job['weight']
+            busy += 1
+
+        return starts
+
+    def _retry_after(self):
+        """Seconds until the next running job is expected to free a slot"""
+        now = time.time()
+        finish_times = [job['started_at'] + self.avg_duration for job in self._running.values()]
+        wait = min(finish_times) - now if finish_times else self.avg_duration
+        return max(1, int(math.ceil(wait)))
+
+    def _persist(self):
+        jobs = list(self._running.values()) + list(self._pending)
+        state = [
+            {key: job[key] for key in ('build_id', 'config', 'submitted_at')}
+            for job in jobs
+        ]
+        tmp_path = f'{self.state_path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist build queue: {e}")
+
+    def _restore(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable build queue state: {e}")
+            return
+
+        known = {job['build_id'] for job in self._pending}
+        state = [job for job in state if job['build_id'] not in known]
+        for job in state:
+            # Jobs that were running when the process died restart from scratch
+            shutil.rmtree(os.path.join(app.config['BUILD_FOLDER'], job['build_id']), ignore_errors=True)
+            job['weight'] = self.job_weight(job['config'])
+            self._pending.append(job)
+        if state:
+            logger.info(f"Restored {len(state)} queued build(s)")
+
+
+build_queue = BuildQueue(
+    workers=int(os.getenv('SWAB_BUILD_WORKERS', '2')),
+    capacity=int(os.getenv('SWAB_BUILD_CAPACITY', '3')),
+    max_pending=int(os.getenv('SWAB_BUILD_QUEUE_SIZE', '50')),
+    state_path=os.path.join(app.config['BUILD_FOLDER'], 'queue.json'),
+)
 
-    # Update project.pbxproj for bundle ID
-    pbxproj_path = os.path.join(project_dir, 'ios', 'Runner.xcodeproj', 'project.pbxproj')
-    if os.path.exists(pbxproj_path):
-        with open(pbxproj_path, 'r') as f:
-            content = f.read()
+# ---------------- Batch Builds ----------------
+
+# Incremental workspaces shared by the apps of one batch, one per build worker by default
+BATCH_WORKSPACES = int(os.getenv('SWAB_BATCH_WORKSPACES', '0')) or build_queue.workers
+
+
+def batch_requests(data):
+    """Expand a batch request into one build request per app, or return an error.
+
+    A batch is either a list of complete build requests (``builds``) or one
+    ``base`` request plus per-app ``apps`` overrides.
+    """
+    if isinstance(data, list):
+        data = {'builds': data}
+    if not isinstance(data, dict):
+        return None, 'Invalid JSON payload'
+
+    if 'builds' in data:
+        app_requests = data['builds']
+    else:
+        base = data.get('base') or {}
+        if not isinstance(base, dict) or not isinstance(data.get('apps'), list):
+            return None, 'A batch needs a builds list, or a base object and an apps list'
+        app_requests = [dict(base, **app_overrides) if isinstance(app_overrides, dict) else app_overrides
+                     for app_overrides in data['apps']]
+
+    if not isinstance(app_requests, list) or not app_requests:
+        return None, 'A batch needs at least one app'
+    if not all(isinstance(item, dict) for item in app_requests):
+        return None, 'Every app of a batch must be an object'
+    return app_requests, None
+
+def submit_batch(app_requests):
+    """Validate and queue every app of a batch; returns ``(batch, error)``.
+
+    The apps are spread over ``BATCH_WORKSPACES`` incremental workspaces that
+    live as long as the batch, so apps that only differ in name, URL, icon or
+    bundle id recompile just the files their configuration touched.
+    """
+    batch_id = str(uuid.uuid4())
+    builds = []
+    for index, data in enumerate(app_requests):
+        config, error = build_config(data)
+        if error:
+            return None, f'App {index}: {error}'
+        config['incremental'] = True
+        config['batch_id'] = batch_id
+        config['workspace'] = f'batch_{batch_id.replace("-", "")}_{index % BATCH_WORKSPACES}'
+        builds.append((str(uuid.uuid4()), config))
+
+    queued = build_queue.submit_many(builds)
+    apps = [
+        {'build_id': build_id, 'app_name': config['app_name'], 'package_name': config['package_name']}
+        for build_id, config in builds
+    ]
+    build_store.set(batch_id, {
+        'status': 'queued',
+        'progress': 0,
+        'message': f'Batch of {len(apps)} apps queued',
+        'apps': apps,
+    })
+    logger.info(f"Batch {batch_id} queued {len(apps)} apps in {min(BATCH_WORKSPACES, len(apps))} workspace(s)")
+    return {
+        'batch_id': batch_id,
+        'apps': [dict(app_info, **info) for app_info, info in zip(apps, queued)],
+    }, None
+
+def summarize_batch(batch):
+    """Aggregate the states of the apps of a stored batch"""
+    apps = []
+    counts = collections.Counter()
+    for app_info in batch['apps']:
+        state = build_store.get(app_info['build_id']) or {
+            'status': 'error', 'progress': 0, 'message': 'Build state expired'
+        }
+        counts[state['status']] += 1
+        apps.append(dict(
+            app_info,
+            status=state['status'],
+            progress=state.get('progress', 0),
+            message=state.get('message'),
+            outputs=state.get('outputs'),
+        ))
+
+    total = len(apps)
+    finished = counts['completed'] + counts['error']
+    summary = {
+        'status': 'queued' if counts['queued'] == total else 'building',
+        'progress': int(sum(100 if a['status'] in TERMINAL_STATUSES else a['progress'] for a in apps) / total),
+        'message': f'{finished} of {total} apps finished, {counts["error"]} failed',
+        'counts': dict(counts),
+        'apps': apps,
+    }
+    if finished == total:
+        summary['status'] = 'error' if counts['error'] == total else 'completed'
+    return summary
+
+def finish_batch_app(batch_id):
+    """Freeze the final summary of a batch once its last app has finished.
+
+    Called by the build worker after each app of the batch, so the summary is
+    written once by the builder instead of by whichever status request comes
+    first, and it outlives the state of the individual builds.
+    """
+    batch = build_store.get(batch_id)
+    if batch is None or 'apps' not in batch or batch['status'] in TERMINAL_STATUSES:
+        return
+    summary = summarize_batch(batch)
+    if summary['status'] in TERMINAL_STATUSES:
+        build_store.set(batch_id, summary)
+
+def batch_status(batch_id):
+    """Aggregate and per-app progress of a batch, None if there is no such batch"""
+    batch = build_store.get(batch_id)
+    if batch is None or 'apps' not in batch:
+        return None
+    if batch['status'] in TERMINAL_STATUSES:
+        return dict(batch, batch_id=batch_id)
+    return dict(summarize_batch(batch), batch_id=batch_id)
+
+# ---------------- Upload Store ----------------
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadStore:
+    """Content-addressed store for uploaded icons, keystores and opened projects.
+
+    Files are named by the SHA-256 of their content, hashed while the upload
+    is written, so the same file is stored once and always gets the same
+    path. The storage janitor only deletes files that no queued or running
+    build refers to. Those references are read from the persisted build
+    queue, so they hold across processes and restarts.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.deduplicated = 0
+        self.deduplicated_bytes = 0
+
+    def put(self, stream, ext, folder=None):
+        """Store the contents of ``stream`` and return (sha256, path)"""
+        folder = folder or self.root
+        os.makedirs(folder, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            path = os.path.join(folder, f'{digest.hexdigest()}{ext}')
+            with self._lock:
+                if os.path.exists(path):
+                    # Re-uploads refresh the file's age for the storage janitor
+                    os.utime(path)
+                    self.deduplicated += 1
+                    self.deduplicated_bytes += size
+                else:
+                    os.replace(tmp_path, path)
+                    tmp_path = None
+                    self.stored += 1
+        finally:
+            if tmp_path:
+                os.remove(tmp_path)
+        return digest.hexdigest(), path
+
+    def put_file(self, source_path, ext, folder=None):
+        with open(source_path, 'rb') as f:
+            return self.put(f, ext, folder)
+
+    @staticmethod
+    def paths_for(config):
+        """Upload files a build config refers to"""
+        paths = []
+        for key in ('icon_path', 'keystore_path'):
+            path = config.get(key)
+            ref = parse_asset_ref(path)
+            if ref:
+                paths.append(os.path.abspath(ref[0]))
+            elif path:
+                paths.append(os.path.abspath(path))
+        return paths
+
+    def referenced(self, jobs=None):
+        """Upload files used by the queued and running builds of ``build_queue.persisted_jobs``"""
+        jobs = build_queue.persisted_jobs() if jobs is None else jobs
+        return {path for job in jobs for path in self.paths_for(job['config'])}
+
+    def stats(self):
+        referenced = self.referenced()
+        with self._lock:
+            return {
+                'stored': self.stored,
+                'deduplicated': self.deduplicated,
+                'deduplicated_bytes': self.deduplicated_bytes,
+                'referenced_files': len(referenced),
+            }
 
-        content = re.sub(
-            r'PRODUCT_BUNDLE_IDENTIFIER\s*=\s*[^;]+;',
-            f'PRODUCT_BUNDLE_IDENTIFIER = {config["package_name"]};',
-            content
-        )
 
-        with open(pbxproj_path, 'w') as f:
-            f.write(content)
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
 
-def update_macos_config(project_dir, config):
-    """Update macOS configuration"""
-    info_plist_path = os.path.join(project_dir, 'macos', 'Runner', 'Info.plist')
-    if os.path.exists(info_plist_path):
-        with open(info_plist_path, 'r') as f:
-            content = f.read()
+# ---------------- Storage Janitor ----------------
 
-        content = re.sub(
-            r'(<key>CFBundleName</key>\s*<string>)[^<]*(</string>)',
-            f'\\g<1>{config["app_name"]}\\g<2>',
-            content
-        )
+def disk_usage(path):
+    """Total size in bytes of the files below ``path``"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
 
-        with open(info_plist_path, 'w') as f:
-            f.write(content)
 
-def update_windows_config(project_dir, config):
-    """Update Windows configuration"""
-    cmake_path = os.path.join(project_dir, 'windows', 'CMakeLists.txt')
-    if os.path.exists(cmake_path):
-        with open(cmake_path, 'r') as f:
-            content = f.read()
+class StorageJanitor:
+    """Reclaims disk space under builds/ and uploads/ in the background.
 
-        content = re.sub(
-            r'project\([^)]+\)',
-            f'project({sanitize_package_name(config["app_name"])} LANGUAGES CXX)',
-            content
-        )
+    Build directories are last-used ordered by their mtime, which downloads
+    refresh. A directory is deleted once it is older than ``output_retention``
+    seconds, and the least recently used ones go first while the build
+    directories together exceed ``max_bytes``. Uploads older than
+    ``upload_retention`` are deleted unless a queued or running build still
+    references them. Builds that are not finished are never touched.
+    """
 
-        with open(cmake_path, 'w') as f:
-            f.write(content)
+    # Shared state kept next to the build directories, managed by its own owner
+    PROTECTED = {'_workspaces', '_cache', '_incremental', '_webhooks', 'saved_projects', 'queue.json', 'state.db'}
+
+    def __init__(self, builds_root, uploads_root, output_retention, upload_retention, max_bytes, interval,
+                 prune_projects=True):
+        self.builds_root = builds_root
+        self.uploads_root = uploads_root
+        self.output_retention = output_retention
+        self.upload_retention = upload_retention
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.prune_projects = prune_projects
+        self._lock = threading.Lock()
+        self._thread = None
+        self.runs = 0
+        self.last_run = None
+        self.reclaimed = collections.Counter()
+        self.deleted = collections.Counter()
+
+    def start(self):
+        """Start the periodic collection thread once"""
+        with self._lock:
+            if self._thread is not None or self.interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._loop, name='storage-janitor', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.collect()
+            except Exception:
+                logger.exception('Storage janitor run failed')
+            time.sleep(self.interval)
 
-def update_linux_config(project_dir, config):
-    """Update Linux configuration"""
-    cmake_path = os.path.join(project_dir, 'linux', 'CMakeLists.txt')
-    if os.path.exists(cmake_path):
-        with open(cmake_path, 'r') as f:
-            content = f.read()
+    def touch(self, build_id):
+        """Mark a build directory as recently used"""
+        try:
+            os.utime(os.path.join(self.builds_root, build_id))
+        except OSError:
+            pass
+
+    def prune_project(self, build_dir):
+        """Delete the intermediate Flutter projects and decrypted assets of a packaged build"""
+        if not self.prune_projects:
+            return 0
+        size = 0
+        for name in ('project', 'lanes', 'assets'):
+            path = os.path.join(build_dir, name)
+            if os.path.isdir(path):
+                size += disk_usage(path)
+                shutil.rmtree(path, ignore_errors=True)
+        if size:
+            self._record('projects', size)
+        return size
+
+    def collect(self, now=None):
+        """Apply every policy once and return the bytes reclaimed by each"""
+        now = now or time.time()
+        # The persisted queue also covers builds submitted to another process
+        jobs = build_queue.persisted_jobs()
+        active_ids = build_queue.active_build_ids() | {job['build_id'] for job in jobs}
+        before = dict(self.reclaimed)
+
+        builds = []
+        for entry in os.scandir(self.builds_root):
+            if entry.name in self.PROTECTED or entry.name.startswith(('_', '.')) or not entry.is_dir():
+                continue
+            if entry.name in active_ids:
+                continue
+            state = build_store.get(entry.name)
+            if state and state.get('status') not in TERMINAL_STATUSES:
+                continue
+            builds.append((entry.stat().st_mtime, entry.path))
+
+        # Retention first, then the least recently used builds while over the cap
+        kept = []
+        for mtime, path in sorted(builds):
+            if self.output_retention and now - mtime > self.output_retention:
+                self._delete(path, 'expired')
+            else:
+                kept.append((path, disk_usage(path)))
+        if self.max_bytes:
+            total = sum(size for _, size in kept)
+            for path, size in kept:
+                if total <= self.max_bytes:
+                    break
+                self._delete(path, 'quota', size)
+                total -= size
+
+        if self.upload_retention:
+            referenced = upload_store.referenced()
+            for folder in (self.uploads_root, os.path.join(self.uploads_root, 'projects')):
+                if not os.path.isdir(folder):
+                    continue
+                for entry in os.scandir(folder):
+                    if not entry.is_file() or os.path.abspath(entry.path) in referenced:
+                        continue
+                    if now - entry.stat().st_mtime > self.upload_retention:
+                        self._delete(entry.path, 'uploads')
+
+        with self._lock:
+            self.runs += 1
+            self.last_run = now
+        reclaimed = {k: v - before.get(k, 0) for k, v in self.reclaimed.items() if v != before.get(k, 0)}
+        if reclaimed:
+            logger.info(f"Storage janitor reclaimed {sum(reclaimed.values())} bytes: {reclaimed}")
+        return reclaimed
+
+    def _delete(self, path, reason, size=None):
+        size = disk_usage(path) if size is None else size
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                return
+        self._record(reason, size)
+
+    def _record(self, reason, size):
+        with self._lock:
+            self.reclaimed[reason] += size
+            self.deleted[reason] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'output_retention_seconds': self.output_retention,
+                'upload_retention_seconds': self.upload_retention,
+                'max_bytes': self.max_bytes,
+                'interval_seconds': self.interval,
+                'runs': self.runs,
+                'last_run': self.last_run,
+                'reclaimed_bytes': sum(self.reclaimed.values()),
+                'reclaimed_bytes_by_reason': dict(self.reclaimed),
+                'deleted_by_reason': dict(self.deleted),
+            }
 
-        content = re.sub(
-            r'set\(BINARY_NAME\s+"[^"]*"\)',
-            f'set(BINARY_NAME "{sanitize_package_name(config["app_name"])}")',
-            content
-        )
 
-        with open(cmake_path, 'w') as f:
-            f.write(content)
+storage_janitor = StorageJanitor(
+    builds_root=app.config['BUILD_FOLDER'],
+    uploads_root=app.config['UPLOAD_FOLDER'],
+    output_retention=float(os.getenv('SWAB_OUTPUT_RETENTION_DAYS', '7')) * 86400,
+    upload_retention=float(os.getenv('SWAB_UPLOAD_RETENTION_DAYS', '7')) * 86400,
+    max_bytes=int(os.getenv('SWAB_BUILDS_MAX_BYTES', '0')),
+    interval=float(os.getenv('SWAB_JANITOR_INTERVAL', '900')),
+    prune_projects=os.getenv('SWAB_PRUNE_PROJECTS', '1') == '1',
+)
 
-def build_platform(project_dir, build_dir, platform, config):
-    """Build for a specific platform - always uses release mode"""
-    output_dir = os.path.join(build_dir, 'outputs')
-    os.makedirs(output_dir, exist_ok=True)
+_services_started = False
+_services_lock = threading.Lock()
 
-    if platform == 'android':
-        subprocess.run(
-            ['flutter', 'build', 'apk', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
-        )
-        apk_path = os.path.join(project_dir, 'build', 'app', 'outputs', 'flutter-apk', 'app-release.apk')
-        if os.path.exists(apk_path):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}.apk')
-            shutil.copy(apk_path, output_path)
-            return output_path
+def start_background_services():
+    """Start the build workers and background helpers once per process"""
+    global _services_started
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
 
-    elif platform == 'android_aab':
-        subprocess.run(
-            ['flutter', 'build', 'appbundle', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
-        )
-        aab_path = os.path.join(project_dir, 'build', 'app', 'outputs', 'bundle', 'release', 'app-release.aab')
-        if os.path.exists(aab_path):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}.aab')
-            shutil.copy(aab_path, output_path)
-            return output_path
+    # API workers leave builds, and everything that maintains builds/, to the builder process
+    if SERVER_ROLE == 'api':
+        return
 
-    elif platform == 'ios':
-        subprocess.run(
-            ['flutter', 'build', 'ios', '--release', '--no-codesign'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
-        )
-        return os.path.join(project_dir, 'build', 'ios', 'iphoneos', 'Runner.app')
+    build_queue.start()
+    workspace_pool.start()
+    project_library.start()
+    storage_janitor.start()
+    if os.getenv('SWAB_PREWARM_KEYS', '1') == '1':
+        threading.Thread(target=prewarm_machine_keys, daemon=True).start()
+
+# ---------------- Serving ----------------
+
+# `all` serves and builds in one process; `api` workers forward builds to the `builder` process
+SERVER_ROLES = ('all', 'api', 'builder')
+SERVER_ROLE = os.getenv('SWAB_ROLE', 'all')
+BUILDER_URL = (os.getenv('SWAB_BUILDER_URL') or '').rstrip('/')
+
+# Endpoints answered by the process that owns the build queue and its helpers
+BUILDER_ENDPOINTS = {
+    'start_build', 'start_batch', 'workspace_stats', 'cache_stats', 'storage_stats', 'webhook_stats',
+    # Every build, queue, cache and webhook metric is recorded by the builder
+    'prometheus_metrics',
+}
+# Hop-by-hop and length headers that must not be copied from a forwarded response
+FORWARD_EXCLUDED_HEADERS = {'connection', 'content-encoding', 'content-length', 'keep-alive', 'transfer-encoding'}
 
-    elif platform == 'web':
-        subprocess.run(
-            ['flutter', 'build', 'web', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=300
-        )
-        web_dir = os.path.join(project_dir, 'build', 'web')
-        if os.path.exists(web_dir):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}_web.zip')
-            shutil.make_archive(output_path.replace('.zip', ''), 'zip', web_dir)
-            return output_path
+builder_session = requests.Session()
+builder_session.mount('http://', HTTPAdapter(pool_maxsize=32))
 
-    elif platform == 'macos':
-        subprocess.run(
-            ['flutter', 'build', 'macos', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
-        )
-        app_path = os.path.join(project_dir, 'build', 'macos', 'Build', 'Products', 'Release')
-        if os.path.exists(app_path):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}_macos.zip')
-            shutil.make_archive(output_path.replace('.zip', ''), 'zip', app_path)
-            return output_path
 
-    elif platform == 'windows':
-        subprocess.run(
-            ['flutter', 'build', 'windows', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
-        )
-        exe_dir = os.path.join(project_dir, 'build', 'windows', 'x64', 'runner', 'Release')
-        if os.path.exists(exe_dir):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}_windows.zip')
-            shutil.make_archive(output_path.replace('.zip', ''), 'zip', exe_dir)
-            return output_path
+def create_app(role=None):
+    """Return the WSGI application configured for ``role`` (default: ``SWAB_ROLE``).
 
-    elif platform == 'linux':
-        subprocess.run(
-            ['flutter', 'build', 'linux', '--release'],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            timeout=600
+    Separate API and builder processes share build state through the SQLite
+    state store and the builds/ and uploads/ folders. API workers derive the
+    project keys before they are forked and never start background threads;
+    the builder starts the queue, workspace pool, janitor and webhooks.
+    """
+    global SERVER_ROLE
+    SERVER_ROLE = role or SERVER_ROLE
+    if SERVER_ROLE not in SERVER_ROLES:
+        raise ValueError(f"Unknown server role {SERVER_ROLE!r}, expected one of: {', '.join(SERVER_ROLES)}")
+
+    if SERVER_ROLE != 'all' and not isinstance(build_store, SQLiteBuildStore):
+        raise RuntimeError('Separate API and builder processes need SWAB_STATE_BACKEND=sqlite')
+    if SERVER_ROLE == 'api':
+        if not BUILDER_URL:
+            raise RuntimeError('API workers need SWAB_BUILDER_URL to reach the builder process')
+        if os.getenv('SWAB_PREWARM_KEYS', '1') == '1':
+            prewarm_machine_keys()
+    elif SERVER_ROLE == 'builder':
+        start_background_services()
+    return app
+
+@app.before_request
+def forward_to_builder():
+    """Hand requests that need the build queue from an API worker to the builder process"""
+    if SERVER_ROLE != 'api' or request.endpoint not in BUILDER_ENDPOINTS:
+        return None
+
+    url = f'{BUILDER_URL}{request.path}'
+    if request.query_string:
+        url += f'?{request.query_string.decode()}'
+    headers = {'Content-Type': request.content_type} if request.content_type else {}
+    try:
+        response = builder_session.request(
+            request.method, url, data=request.get_data(), headers=headers, timeout=60
         )
-        linux_dir = os.path.join(project_dir, 'build', 'linux', 'x64', 'release', 'bundle')
-        if os.path.exists(linux_dir):
-            output_path = os.path.join(output_dir, f'{config["app_name"]}_linux.zip')
-            shutil.make_archive(output_path.replace('.zip', ''), 'zip', linux_dir)
-            return output_path
-
-    return None
+    except requests.RequestException as e:
+        logger.error(f"Builder process unreachable at {BUILDER_URL}: {e}")
+        return jsonify({'error': 'Build service unavailable, try again later'}), 503
+
+    return Response(
+        response.content,
+        status=response.status_code,
+        headers=[(k, v) for k, v in response.headers.items() if k.lower() not in FORWARD_EXCLUDED_HEADERS]
+    )
 
 @app.route('/')
 def index():
@@ -816,6 +3657,102 @@ def serve_upload(filename):
     """Serve uploaded files (icons, etc.)"""
     return send_file(os.path.join(app.config['UPLOAD_FOLDER'], filename))
 
+def build_config(data):
+    """Validate the fields of a build request and return ``(config, error)``"""
+    # Validate required fields
+    required_fields = [
+        'app_name', 'app_description', 'app_version',
+        'build_number', 'package_name', 'web_url', 'platforms'
+    ]
+    for field in required_fields:
+        if field not in data or not data[field]:
+            logger.warning(f"Missing required field: {field}")
+            return None, f'Missing required field: {field}'
+
+    if not data['platforms']:
+        logger.warning("No platforms selected")
+        return None, 'At least one platform must be selected'
+
+    if 'download_directory' in data and not isinstance(data['download_directory'], str):
+        return None, 'download_directory must be a string'
+    # Camera & Gallery config validation
+    if 'enable_camera_access' in data and not isinstance(data['enable_camera_access'], bool):
+        return None, 'enable_camera_access must be a boolean'
+
+    if 'enable_gallery_access' in data and not isinstance(data['enable_gallery_access'], bool):
+        return None, 'enable_gallery_access must be a boolean'
+
+    if 'camera_permission_prompt' in data and not isinstance(data['camera_permission_prompt'], bool):
+        return None, 'camera_permission_prompt must be a boolean'
+
+    # QR / Barcode scanner config validation
+    if 'enable_qr_scanner' in data and not isinstance(data['enable_qr_scanner'], bool):
+        return None, 'enable_qr_scanner must be a boolean'
+
+    if 'enable_barcode_scanner' in data and not isinstance(data['enable_barcode_scanner'], bool):
+        return None, 'enable_barcode_scanner must be a boolean'
+
+    if 'scanner_formats' in data and not isinstance(data['scanner_formats'], (list, str)):
+        return None, 'scanner_formats must be a list or string'
+
+    if 'incremental' in data and not isinstance(data['incremental'], bool):
+        return None, 'incremental must be a boolean'
+
+    if 'webhook_stages' in data and not isinstance(data['webhook_stages'], bool):
+        return None, 'webhook_stages must be a boolean'
+
+    config = {
+        'app_name': data['app_name'],
+        'app_description': data['app_description'],
+        'app_version': data['app_version'],
+        'build_number': data['build_number'],
+        'package_name': data['package_name'],
+        'web_url': data['web_url'],
+        'platforms': data['platforms'],
+        # WebView feature options
+        'allow_zoom': data.get('allow_zoom', True),
+        'enable_javascript': data.get('enable_javascript', True),
+        'enable_dom_storage': data.get('enable_dom_storage', True),
+        'enable_geolocation': data.get('enable_geolocation', True),
+        'enable_pull_refresh': data.get('enable_pull_refresh', True),
+        'show_navigation': data.get('show_navigation', True),
+        'enable_file_access': data.get('enable_file_access', True),
+        'enable_cache': data.get('enable_cache', True),
+        'enable_media_autoplay': data.get('enable_media_autoplay', False),
+
+        # Camera & Gallery access config
+        'enable_camera_access': data.get('enable_camera_access', True),
+        'enable_gallery_access': data.get('enable_gallery_access', True),
+        'camera_permission_prompt': data.get('camera_permission_prompt', True),
+
+        # QR / Barcode scanner config
+        'enable_qr_scanner': data.get('enable_qr_scanner', True),
+        'enable_barcode_scanner': data.get('enable_barcode_scanner', True),
+        'scanner_formats': data.get('scanner_formats', []),
+
+
+
+        # Download manager config (backend support)
+        'enable_download_manager': data.get('enable_download_manager', True),
+        'download_directory': data.get('download_directory', 'Downloads'),
+        'allow_large_downloads': data.get('allow_large_downloads', True),
+
+
+        # Keystore config (optional)
+        'keystore_path': data.get('keystore_path'),
+        'keystore_password': data.get('keystore_password'),
+        'key_alias': data.get('key_alias'),
+        'key_password': data.get('key_password'),
+        # Icon config (optional)
+        'icon_path': data.get('icon_path'),
+        # Web Hooks
+        'webhook_url': data.get('webhook_url'),
+        'webhook_stages': data.get('webhook_stages', False),
+        # Reuse the package's persistent workspace between builds
+        'incremental': data.get('incremental', False)
+    }
+    return config, None
+
 @app.route('/api/build', methods=['POST'])
 def start_build():
 
@@ -855,9 +3792,11 @@ def start_build():
                 type: string
     responses:
       200:
-        description: Build started successfully
+        description: Build queued successfully
       400:
         description: Invalid input
+      429:
+        description: Build queue is full, retry after the Retry-After header
       500:
         description: Internal server error
     """
@@ -871,114 +3810,334 @@ def start_build():
             logger.warning("No JSON payload received")
             return jsonify({'error': 'Invalid JSON payload'}), 400
 
-        # Validate required fields
-        required_fields = [
-            'app_name', 'app_description', 'app_version',
-            'build_number', 'package_name', 'web_url', 'platforms'
-        ]
-        for field in required_fields:
-            if field not in data or not data[field]:
-                logger.warning(f"Missing required field: {field}")
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-
-        if not data['platforms']:
-            logger.warning("No platforms selected")
-            return jsonify({'error': 'At least one platform must be selected'}), 400
+        config, error = build_config(data)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Generate build ID
         build_id = str(uuid.uuid4())
         logger.info(f"Starting build with ID: {build_id}")
-        
-        if 'download_directory' in data and not isinstance(data['download_directory'], str):
-            return jsonify({'error': 'download_directory must be a string'}), 400
-        # Camera & Gallery config validation
-        if 'enable_camera_access' in data and not isinstance(data['enable_camera_access'], bool):
-            return jsonify({'error': 'enable_camera_access must be a boolean'}), 400
-
-        if 'enable_gallery_access' in data and not isinstance(data['enable_gallery_access'], bool):
-            return jsonify({'error': 'enable_gallery_access must be a boolean'}), 400
-
-        if 'camera_permission_prompt' in data and not isinstance(data['camera_permission_prompt'], bool):
-            return jsonify({'error': 'camera_permission_prompt must be a boolean'}), 400
-        
-        # QR / Barcode scanner config validation
-        if 'enable_qr_scanner' in data and not isinstance(data['enable_qr_scanner'], bool):
-            return jsonify({'error': 'enable_qr_scanner must be a boolean'}), 400
-
-        if 'enable_barcode_scanner' in data and not isinstance(data['enable_barcode_scanner'], bool):
-            return jsonify({'error': 'enable_barcode_scanner must be a boolean'}), 400
-
-        if 'scanner_formats' in data and not isinstance(data['scanner_formats'], (list, str)):
-            return jsonify({'error': 'scanner_formats must be a list or string'}), 400
-
-
-        # Start build in background thread
-        config = {
-            'app_name': data['app_name'],
-            'app_description': data['app_description'],
-            'app_version': data['app_version'],
-            'build_number': data['build_number'],
-            'package_name': data['package_name'],
-            'web_url': data['web_url'],
-            'platforms': data['platforms'],
-            # WebView feature options
-            'allow_zoom': data.get('allow_zoom', True),
-            'enable_javascript': data.get('enable_javascript', True),
-            'enable_dom_storage': data.get('enable_dom_storage', True),
-            'enable_geolocation': data.get('enable_geolocation', True),
-            'enable_pull_refresh': data.get('enable_pull_refresh', True),
-            'show_navigation': data.get('show_navigation', True),
-            'enable_file_access': data.get('enable_file_access', True),
-            'enable_cache': data.get('enable_cache', True),
-            'enable_media_autoplay': data.get('enable_media_autoplay', False),
 
-            # Camera & Gallery access config
-            'enable_camera_access': data.get('enable_camera_access', True),
-            'enable_gallery_access': data.get('enable_gallery_access', True),
-            'camera_permission_prompt': data.get('camera_permission_prompt', True),
+        start_background_services()
+        try:
+            queue_info = build_queue.submit(build_id, config)
+        except QueueFullError as e:
+            logger.warning(f"Build queue full, rejecting build {build_id}")
+            response = jsonify({
+                'error': 'Build queue is full, try again later',
+                'retry_after': e.retry_after
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+
+        logger.info(f"Build {build_id} queued at position {queue_info['queue_position']}")
+        return jsonify({'build_id': build_id, **queue_info})
+
+    except Exception:
+        logger.exception("Failed to start build process")
+        return jsonify({
+            'error': 'Failed to start build'
+        }), 500
+
+@app.route('/api/batch', methods=['POST'])
+def start_batch():
+    """
+    Queue a batch of apps that share build workspaces
+    ---
+    tags:
+      - Build
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            builds:
+              type: array
+              description: Complete build requests, as accepted by /api/build
+              items:
+                type: object
+            base:
+              type: object
+              description: Build request fields shared by every app
+            apps:
+              type: array
+              description: Per-app fields merged over base, e.g. app_name, web_url, package_name and icon_path
+              items:
+                type: object
+    responses:
+      200:
+        description: Batch queued; the build id and queue position of every app
+      400:
+        description: Invalid input
+      429:
+        description: The whole batch does not fit into the build queue, retry after the Retry-After header
+    """
+    app_requests, error = batch_requests(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+
+    start_background_services()
+    try:
+        batch, error = submit_batch(app_requests)
+    except QueueFullError as e:
+        logger.warning(f"Build queue full, rejecting batch of {len(app_requests)} apps")
+        response = jsonify({
+            'error': 'Build queue is full, try again later',
+            'retry_after': e.retry_after
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(batch)
+
+@app.route('/api/batch/<batch_id>')
+def get_batch(batch_id):
+    """
+    Get the aggregate and per-app progress of a batch
+    ---
+    tags:
+      - Build
+    parameters:
+      - in: path
+        name: batch_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: Batch status, app counts per status and the status of every app
+      404:
+        description: Batch not found
+    """
+    status = batch_status(batch_id)
+    if status is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(status)
+
+# Interval at which event streams re-read state written by other processes
+SSE_POLL_INTERVAL = 1.0
+SSE_HEARTBEAT_INTERVAL = 15.0
+
+
+def stream_build_events(build_id):
+    """Yield Server-Sent Events for every state change of a build until it finishes"""
+    last_state = None
+    last_sent = time.time()
+
+    while True:
+        version = build_store.version
+        state = build_store.get(build_id)
+        if state is None:
+            yield f"event: error\ndata: {json.dumps({'error': 'Build not found'})}\n\n"
+            return
+
+        if state != last_state:
+            last_state = state
+            last_sent = time.time()
+            yield f"event: progress\ndata: {json.dumps(state)}\n\n"
+            if state.get('status') in TERMINAL_STATUSES:
+                return
+        elif time.time() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+            # Comment lines keep proxies from closing idle connections
+            last_sent = time.time()
+            yield ": keep-alive\n\n"
+
+        build_store.wait_for_update(version, SSE_POLL_INTERVAL)
+
+@app.route('/api/build/<build_id>/status')
+def build_status(build_id):
+    """
+    Get the current status of a build
+    ---
+    tags:
+      - Build
+    parameters:
+      - in: path
+        name: build_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: Current build state
+      404:
+        description: Build not found
+    """
+    progress = build_store.get(build_id)
+    if progress is None:
+        return jsonify({'error': 'Build not found'}), 404
+    return jsonify(progress)
+
+@app.route('/api/build/<build_id>/events')
+def build_events(build_id):
+    """
+    Stream build progress as Server-Sent Events
+    ---
+    tags:
+      - Build
+    produces:
+      - text/event-stream
+    parameters:
+      - in: path
+        name: build_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: A `progress` event per stage transition; the stream ends when the build finishes
+      404:
+        description: Build not found
+    """
+    if build_store.get(build_id) is None:
+        return jsonify({'error': 'Build not found'}), 404
 
-            # QR / Barcode scanner config
-            'enable_qr_scanner': data.get('enable_qr_scanner', True),
-            'enable_barcode_scanner': data.get('enable_barcode_scanner', True),
-            'scanner_formats': data.get('scanner_formats', []),
+    return Response(
+        stream_with_context(stream_build_events(build_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
+@app.route('/api/build/<build_id>/logs')
+def build_logs(build_id):
+    """
+    Read or follow the toolchain output of a build
+    ---
+    tags:
+      - Build
+    produces:
+      - text/plain
+    parameters:
+      - in: path
+        name: build_id
+        type: string
+        required: true
+      - in: query
+        name: platform
+        type: string
+        description: Platform whose log to read; `build` (default) holds the shared dependency and icon stages
+      - in: query
+        name: offset
+        type: integer
+        description: Uncompressed byte offset to resume from, also accepted as a `Range: bytes=<offset>-` header
+      - in: query
+        name: follow
+        type: boolean
+        description: Keep streaming new output until the log is closed
+    responses:
+      200:
+        description: The log from the requested offset
+      206:
+        description: The rest of a finished log from the offset of the Range header
+      416:
+        description: Range starts past the end of a finished log
+      404:
+        description: Build or log not found
+    """
+    if build_store.get(build_id) is None:
+        return jsonify({'error': 'Build not found'}), 404
 
+    name = request.args.get('platform', 'build')
+    if not LOG_NAME_PATTERN.match(name):
+        return jsonify({'error': 'Invalid platform'}), 400
+    log_path = build_log_path(os.path.join(app.config['BUILD_FOLDER'], build_id), name)
+    if not os.path.exists(log_path):
+        return jsonify({'error': 'Log not found'}), 404
+
+    offset = max(0, request.args.get('offset', 0, type=int))
+    byte_range = re.match(r'^bytes=(\d+)-$', request.headers.get('Range', ''))
+    if byte_range:
+        offset = int(byte_range.group(1))
+    follow = request.args.get('follow', '').lower() in ('1', 'true')
+
+    status = 200
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'X-Log-Offset': str(offset)}
+    # A closed log has a known length, so a Range request gets a proper partial response
+    if byte_range and not follow and build_log_closed(build_id, name, log_path):
+        size = closed_log_size(log_path)
+        if offset >= size:
+            return Response(status=416, headers={'Content-Range': f'bytes */{size}'})
+        status = 206
+        headers['Content-Range'] = f'bytes {offset}-{size - 1}/{size}'
+
+    return Response(
+        stream_with_context(read_build_log(
+            log_path, offset, follow,
+            # Logs are written by the builder process, API workers poll them until the build ends
+            writing=(lambda: (build_store.get(build_id) or {}).get('status') not in TERMINAL_STATUSES)
+            if SERVER_ROLE == 'api' else None
+        )),
+        status=status,
+        mimetype='text/plain',
+        headers=headers
+    )
 
-            # Download manager config (backend support)
-            'enable_download_manager': data.get('enable_download_manager', True),
-            'download_directory': data.get('download_directory', 'Downloads'),
-            'allow_large_downloads': data.get('allow_large_downloads', True),
+# ---------------- Streaming Archives ----------------
 
+# Formats that are already compressed; deflating them again only costs CPU
+STORED_EXTENSIONS = {
+    '.so', '.dll', '.dylib', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico',
+    '.apk', '.aab', '.jar', '.zip', '.gz', '.br', '.xz', '.7z',
+    '.woff', '.woff2', '.mp3', '.mp4', '.wasm',
+}
+ZIP_CHUNK_SIZE = 1024 * 1024
 
-            # Keystore config (optional)
-            'keystore_path': data.get('keystore_path'),
-            'keystore_password': data.get('keystore_password'),
-            'key_alias': data.get('key_alias'),
-            'key_password': data.get('key_password'),
-            # Icon config (optional)
-            'icon_path': data.get('icon_path'),
-            # Web Hooks
-            'webhook_url': data.get('webhook_url')
-        }
 
-        thread = threading.Thread(target=run_build, args=(build_id, config))
-        thread.start()
+class _ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink that collects the bytes zipfile writes until they are drained"""
 
-        logger.info(f"Build thread started for build ID: {build_id}")
-        return jsonify({'build_id': build_id})
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
 
-    except Exception:
-        logger.exception("Failed to start build process")
-        return jsonify({
-            'error': 'Failed to start build'
-        }), 500
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(source_dir):
+    """Yield a ZIP64 archive of ``source_dir`` chunk by chunk without touching the disk"""
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', allowZip64=True) as zipf:
+        for root, dirs, files in os.walk(source_dir):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                zinfo = zipfile.ZipInfo.from_file(file_path, os.path.relpath(file_path, source_dir))
+                if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+                    zinfo.compress_type = zipfile.ZIP_STORED
+                else:
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+                with open(file_path, 'rb') as src, zipf.open(zinfo, 'w', force_zip64=True) as dest:
+                    for chunk in iter(lambda: src.read(ZIP_CHUNK_SIZE), b''):
+                        dest.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+                data = buffer.drain()
+                if data:
+                    yield data
+
+    # Closing the archive writes the central directory
+    yield buffer.drain()
 
 @app.route('/api/build/<build_id>/download/<platform>')
 def download_build(build_id, platform):
-    if build_id not in build_progress:
+    progress = build_store.get(build_id)
+    if progress is None:
         return jsonify({'error': 'Build not found'}), 404
 
-    progress = build_progress[build_id]
     if progress['status'] != 'completed':
         return jsonify({'error': 'Build not completed'}), 400
 
@@ -995,7 +4154,12 @@ def download_build(build_id, platform):
             keystore_dir = os.path.join(build_dir, 'keystore')
             zip_path = os.path.join(build_dir, 'outputs', 'keystore-bundle.zip')
 
-            shutil.make_archive(zip_path.replace('.zip', ''), 'zip', keystore_dir)
+            # The keystore never changes after the build, so the bundle is only zipped once
+            if not os.path.exists(zip_path):
+                os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+                tmp_base = os.path.join(os.path.dirname(zip_path), f'.keystore-bundle-{uuid.uuid4().hex}')
+                shutil.make_archive(tmp_base, 'zip', keystore_dir)
+                os.replace(f'{tmp_base}.zip', zip_path)
 
             if os.path.exists(zip_path):
                 return send_file(zip_path, as_attachment=True, download_name='keystore-bundle.zip')
@@ -1009,11 +4173,94 @@ def download_build(build_id, platform):
     if output_path.startswith('Error:'):
         return jsonify({'error': output_path}), 400
 
+    if not os.path.exists(output_path):
+        return jsonify({'error': 'Build output has expired'}), 410
+    storage_janitor.touch(build_id)
+
+    if os.path.isdir(output_path):
+        # Bundles are zipped while they are sent instead of being archived on disk
+        download_name = f'{os.path.basename(output_path)}.zip'
+        return Response(
+            stream_with_context(stream_zip(output_path)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+        )
+
     if os.path.exists(output_path):
         return send_file(output_path, as_attachment=True)
 
     return jsonify({'error': 'Output file not found'}), 404
 
+@app.route('/api/workspaces/stats')
+def workspace_stats():
+    """
+    Get workspace pool statistics
+    ---
+    tags:
+      - Build
+    responses:
+      200:
+        description: Pool size, ready workspaces and hit/miss counters
+    """
+    return jsonify(workspace_pool.stats())
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """
+    Get build artifact cache statistics
+    ---
+    tags:
+      - Build
+    responses:
+      200:
+        description: Cache size, entry count and hit/miss counters
+    """
+    return jsonify(artifact_cache.stats())
+
+@app.route('/api/storage/stats')
+def storage_stats():
+    """
+    Get storage janitor statistics
+    ---
+    tags:
+      - Build
+    responses:
+      200:
+        description: Retention policies and bytes reclaimed per reason since startup
+    """
+    return jsonify(dict(storage_janitor.stats(), uploads=upload_store.stats()))
+
+@app.route('/api/webhooks/stats')
+def webhook_stats():
+    """
+    Get webhook dispatcher statistics and the latest undelivered notifications
+    ---
+    tags:
+      - Build
+    parameters:
+      - {name: limit, in: query, type: integer, description: Dead letters to return, newest first (default 20)}
+    responses:
+      200:
+        description: Queue depth, delivery counters and recent dead letters
+    """
+    limit = max(0, min(request.args.get('limit', 20, type=int), 1000))
+    return jsonify(dict(webhook_dispatcher.stats(), dead_letters=webhook_dispatcher.dead_letters(limit) if limit else []))
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """
+    Export build, queue, cache and webhook metrics for Prometheus
+    ---
+    tags:
+      - Build
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text exposition format
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/upload/keystore', methods=['POST'])
 def upload_keystore():
     if 'keystore' not in request.files:
@@ -1024,10 +4271,9 @@ def upload_keystore():
         return jsonify({'error': 'No file selected'}), 400
 
     if file:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        return jsonify({'success': True, 'filename': filename, 'path': filepath})
+        ext = os.path.splitext(secure_filename(file.filename))[1].lower() or '.jks'
+        digest, filepath = upload_store.put(file.stream, ext)
+        return jsonify({'success': True, 'filename': os.path.basename(filepath), 'path': filepath, 'sha256': digest})
 
     return jsonify({'error': 'Upload failed'}), 500
 
@@ -1046,10 +4292,8 @@ def upload_icon():
         if ext not in ['.png', '.jpg', '.jpeg']:
             return jsonify({'error': 'Invalid file type. Use PNG or JPG'}), 400
 
-        filename = f"{uuid.uuid4()}{ext}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        return jsonify({'success': True, 'filename': filename, 'path': filepath})
+        digest, filepath = upload_store.put(file.stream, ext)
+        return jsonify({'success': True, 'filename': os.path.basename(filepath), 'path': filepath, 'sha256': digest})
 
     return jsonify({'error': 'Upload failed'}), 500
 
@@ -1096,53 +4340,30 @@ def save_project():
             'key_password': data.get('key_password', ''),
         }
 
-        # Save project.json
-        project_json_path = os.path.join(temp_dir, 'project.json')
-        with open(project_json_path, 'w') as f:
-            json.dump(project_data, f, indent=2)
-
-        # Create assets directory
-        assets_dir = os.path.join(temp_dir, 'assets')
-        os.makedirs(assets_dir, exist_ok=True)
-
-        # Copy icon if provided
+        # Icon and keystore, either uploaded files or assets of an opened project
+        assets = []
         icon_path = data.get('icon_path')
-        if icon_path and os.path.exists(icon_path):
+        if asset_info(icon_path):
             ext = os.path.splitext(icon_path)[1]
-            shutil.copy(icon_path, os.path.join(assets_dir, f'icon{ext}'))
+            assets.append((f'icon{ext}', icon_path))
 
-        # Copy keystore if provided
         keystore_path = data.get('keystore_path')
-        if keystore_path and os.path.exists(keystore_path):
-            shutil.copy(keystore_path, os.path.join(assets_dir, 'keystore.jks'))
-
-        # Create the zip file
-        zip_path = os.path.join(temp_dir, 'project.zip')
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    if file != 'project.zip':
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, temp_dir)
-                        zipf.write(file_path, arcname)
-
-        # Read and encrypt the zip
-        with open(zip_path, 'rb') as f:
-            zip_data = f.read()
-
-        encrypted_data = encrypt_data(zip_data)
+        if asset_info(keystore_path):
+            assets.append(('keystore.jks', keystore_path))
 
         # Generate filename
         safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', app_name)
         filename = f"{safe_name}_v{app_version}_{build_number}.swab"
 
         # Save to outputs folder
-        output_dir = os.path.join(app.config['BUILD_FOLDER'], 'saved_projects')
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, filename)
+        output_path = os.path.join(SAVED_PROJECTS_FOLDER, filename)
 
-        with open(output_path, 'wb') as f:
-            f.write(encrypted_data)
+        # Settings go into the encrypted index, assets are encrypted chunk by chunk behind it
+        tmp_output_path = os.path.join(temp_dir, 'project.swab')
+        with open(tmp_output_path, 'wb') as dst:
+            write_project_container(dst, project_data, assets)
+        shutil.move(tmp_output_path, output_path)
+        project_library.record(filename, project_data)
 
         return send_file(
             output_path,
@@ -1171,22 +4392,47 @@ def open_project():
     if not file.filename.endswith('.swab'):
         return jsonify({'error': 'Invalid file type. Please select a .swab file'}), 400
 
-    temp_dir = tempfile.mkdtemp()
+    magic = file.stream.read(len(SWAB_V3_MAGIC))
+    file.stream.seek(0)
+    if magic != SWAB_V3_MAGIC:
+        return open_legacy_project(file)
+
+    # Keep the container encrypted and only read its index; assets are decrypted
+    # when a build or the icon preview asks for them. Opening the same file
+    # again reuses the stored container and its asset references.
+    project_id, container_path = upload_store.put(file.stream, '.swab', PROJECT_CONTAINER_FOLDER)
 
     try:
-        # Read encrypted data
-        encrypted_data = file.read()
+        with SwabContainer(container_path) as container:
+            response_data = dict(container.project)
+            asset_names = list(container.assets)
+    except (InvalidTag, SwabFormatError, ValueError, KeyError):
+        os.remove(container_path)
+        return jsonify({'error': 'Cannot open this project file. It was created on a different machine or has been corrupted.'}), 403
+    except Exception as e:
+        return jsonify({'error': f'Failed to open project: {str(e)}'}), 500
 
-        # Decrypt data
-        try:
-            decrypted_data = decrypt_data(encrypted_data)
-        except Exception:
-            return jsonify({'error': 'Cannot open this project file. It was created on a different machine or has been corrupted.'}), 403
+    for name in asset_names:
+        if name.startswith('icon.'):
+            response_data['icon_path'] = f'{PROJECT_ASSET_SCHEME}{project_id}/{name}'
+            response_data['icon_url'] = f'/api/project/{project_id}/assets/{name}'
+        elif name == 'keystore.jks':
+            response_data['keystore_path'] = f'{PROJECT_ASSET_SCHEME}{project_id}/{name}'
+
+    return jsonify({'success': True, 'project': response_data})
+
+def open_legacy_project(file):
+    """Open a v1/v2 .swab file, which has to be decrypted and extracted in full"""
+    temp_dir = tempfile.mkdtemp()
 
-        # Write decrypted zip to temp file
+    try:
+        # Decrypt straight from the upload stream into a temp zip
         zip_path = os.path.join(temp_dir, 'project.zip')
-        with open(zip_path, 'wb') as f:
-            f.write(decrypted_data)
+        try:
+            with open(zip_path, 'wb') as f:
+                decrypt_stream(file.stream, f)
+        except (InvalidToken, InvalidTag, SwabFormatError):
+            return jsonify({'error': 'Cannot open this project file. It was created on a different machine or has been corrupted.'}), 403
 
         # Extract zip
         extract_dir = os.path.join(temp_dir, 'extracted')
@@ -1207,23 +4453,17 @@ def open_project():
         assets_dir = os.path.join(extract_dir, 'assets')
         response_data = dict(project_data)
 
-        # Copy icon to uploads if exists
+        # Store icon in uploads if exists
         for ext in ['.png', '.jpg', '.jpeg']:
             icon_path = os.path.join(assets_dir, f'icon{ext}')
             if os.path.exists(icon_path):
-                new_icon_name = f"{uuid.uuid4()}{ext}"
-                new_icon_path = os.path.join(app.config['UPLOAD_FOLDER'], new_icon_name)
-                shutil.copy(icon_path, new_icon_path)
-                response_data['icon_path'] = new_icon_path
+                response_data['icon_path'] = upload_store.put_file(icon_path, ext)[1]
                 break
 
-        # Copy keystore to uploads if exists
+        # Store keystore in uploads if exists
         keystore_path = os.path.join(assets_dir, 'keystore.jks')
         if os.path.exists(keystore_path):
-            new_keystore_name = f"{uuid.uuid4()}.jks"
-            new_keystore_path = os.path.join(app.config['UPLOAD_FOLDER'], new_keystore_name)
-            shutil.copy(keystore_path, new_keystore_path)
-            response_data['keystore_path'] = new_keystore_path
+            response_data['keystore_path'] = upload_store.put_file(keystore_path, '.jks')[1]
 
         return jsonify({'success': True, 'project': response_data})
 
@@ -1234,5 +4474,115 @@ def open_project():
         # Cleanup temp directory
         shutil.rmtree(temp_dir, ignore_errors=True)
 
+@app.route('/api/project/<project_id>/assets/<name>')
+def project_asset(project_id, name):
+    """
+    Get the icon of an opened project for preview
+    ---
+    tags:
+      - Project
+    parameters:
+      - name: project_id
+        in: path
+        type: string
+        required: true
+      - name: name
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: Icon image
+      403:
+        description: Project file is corrupted or was tampered with
+      404:
+        description: Unknown project or asset
+    """
+    ref = parse_asset_ref(f'{PROJECT_ASSET_SCHEME}{project_id}/{name}')
+    if ref is None or not name.startswith('icon.') or not os.path.exists(ref[0]):
+        return jsonify({'error': 'Asset not found'}), 404
+
+    buffer = io.BytesIO()
+    try:
+        with SwabContainer(ref[0]) as container:
+            container.extract(name, buffer)
+    except KeyError:
+        return jsonify({'error': 'Asset not found'}), 404
+    except (InvalidTag, SwabFormatError, OSError):
+        return jsonify({'error': 'Project file is corrupted or was tampered with'}), 403
+    buffer.seek(0)
+    return send_file(buffer, download_name=name)
+
+def library_query(search=None):
+    """Run a project library query from the request's filter, sort and paging arguments"""
+    args = request.args
+    sort = args.get('sort', 'updated_at')
+    if sort not in ProjectLibrary.SORT_COLUMNS:
+        return jsonify({'error': f"sort must be one of: {', '.join(ProjectLibrary.SORT_COLUMNS)}"}), 400
+    order = args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'order must be asc or desc'}), 400
+    try:
+        page = int(args.get('page', 1))
+        per_page = int(args.get('per_page', 20))
+        filters = {key: args[key] for key in ('app_name', 'package_name', 'app_version', 'build_number', 'web_url') if args.get(key)}
+        for key in ('saved_after', 'saved_before'):
+            if args.get(key):
+                filters[key] = float(args[key])
+    except ValueError:
+        return jsonify({'error': 'page, per_page, saved_after and saved_before must be numbers'}), 400
+
+    return jsonify(project_library.query(filters, search, sort, order, page, per_page))
+
+@app.route('/api/projects')
+def list_projects():
+    """
+    List saved projects
+    ---
+    tags:
+      - Project
+    parameters:
+      - {name: app_name, in: query, type: string, description: Case-insensitive name prefix}
+      - {name: package_name, in: query, type: string}
+      - {name: app_version, in: query, type: string}
+      - {name: build_number, in: query, type: string}
+      - {name: web_url, in: query, type: string, description: Substring of the web URL}
+      - {name: saved_after, in: query, type: number, description: Unix timestamp}
+      - {name: saved_before, in: query, type: number, description: Unix timestamp}
+      - {name: sort, in: query, type: string, enum: [app_name, package_name, created_at, updated_at]}
+      - {name: order, in: query, type: string, enum: [asc, desc]}
+      - {name: page, in: query, type: integer}
+      - {name: per_page, in: query, type: integer, description: At most 100}
+    responses:
+      200:
+        description: One page of saved projects with the total match count
+    """
+    return library_query()
+
+@app.route('/api/projects/search')
+def search_projects():
+    """
+    Search saved projects by app name, package name or web URL
+    ---
+    tags:
+      - Project
+    parameters:
+      - {name: q, in: query, type: string, required: true, description: Every word must match one of the fields}
+    responses:
+      200:
+        description: One page of matching projects, accepts the same filters as the listing
+      400:
+        description: Missing query
+    """
+    search = request.args.get('q', '').strip()
+    if not search:
+        return jsonify({'error': 'Missing search query: q'}), 400
+    return library_query(search)
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # Development server; use serve.py for production
+    debug = os.getenv('FLASK_DEBUG') == '1'
+    # The debug reloader imports this module twice; only the serving child runs builds
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
+    app.run(debug=debug, port=5000)
@@ -0,0 +1,90 @@
+"""Micro-benchmark for the cached .swab project encryption key.
+
+Measures /api/project/save and /api/project/open latency through the Flask
+test client, once with the key cache cleared before every request (the old
+behaviour of deriving the key per call) and once with a warm cache. Saved
+projects are written to a temporary data directory, not the repository.
+
+Usage:
+    python benchmarks/key_cache.py [--requests 10]
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app's data folders at a scratch directory before importing it
+DATA_DIR = tempfile.mkdtemp(prefix='swab-bench-')
+os.environ['SWAB_BUILD_FOLDER'] = os.path.join(DATA_DIR, 'builds')
+os.environ['SWAB_UPLOAD_FOLDER'] = os.path.join(DATA_DIR, 'uploads')
+
+import app as swab  # noqa: E402
+
+PROJECT = {
+    'app_name': 'Benchmark App',
+    'app_description': 'Key cache benchmark',
+    'app_version': '1.0.0',
+    'build_number': '1',
+    'package_name': 'com.example.benchmark',
+    'web_url': 'https://example.com',
+}
+
+
+def measure(client, requests, cold):
+    """Return per-request save and open latencies in milliseconds"""
+    save_times, open_times = [], []
+    for _ in range(requests):
+        if cold:
+            swab._machine_keys.clear()
+        started = time.perf_counter()
+        response = client.post('/api/project/save', json=PROJECT)
+        save_times.append((time.perf_counter() - started) * 1000)
+        project_file = response.get_data()
+
+        if cold:
+            swab._machine_keys.clear()
+        started = time.perf_counter()
+        client.post(
+            '/api/project/open',
+            data={'project': (io.BytesIO(project_file), 'benchmark.swab')},
+            content_type='multipart/form-data'
+        )
+        open_times.append((time.perf_counter() - started) * 1000)
+    return save_times, open_times
+
+
+def report(label, times):
+    print(f"  {label:<6} mean {statistics.mean(times):8.1f} ms   "
+          f"median {statistics.median(times):8.1f} ms   max {max(times):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=10, help='Requests per endpoint and mode')
+    args = parser.parse_args()
+
+    client = swab.app.test_client()
+
+    try:
+        print(f"Uncached key derivation ({args.requests} requests):")
+        save_times, open_times = measure(client, args.requests, cold=True)
+        report('save', save_times)
+        report('open', open_times)
+
+        swab.prewarm_machine_keys()
+        print(f"Cached key ({args.requests} requests):")
+        save_times, open_times = measure(client, args.requests, cold=False)
+        report('save', save_times)
+        report('open', open_times)
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
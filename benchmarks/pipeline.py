@@ -0,0 +1,373 @@
+"""Offline benchmark of the build pipeline's own overhead.
+
+Puts stub ``flutter``, ``dart`` and ``keytool`` executables with a configurable
+latency and output size on PATH, so template copies, pubspec patching, icon
+rendering, packaging, state updates and request handling are all that is left
+to measure. Builds and project save/open round trips are driven through the
+Flask test client at a configurable concurrency, against a temporary data
+directory. The results (p50/p95/p99 latency, builds per minute, peak RSS and
+bytes written per build) are printed and saved as JSON; pass an earlier
+result file as --baseline to compare two commits.
+
+The workspace pool and the storage janitor are disabled so runs are
+repeatable; set SWAB_WORKSPACE_POOL_SIZE or SWAB_JANITOR_INTERVAL to include
+them. Needs a POSIX system for the stub executables.
+
+Usage:
+    python benchmarks/pipeline.py [--builds 20] [--concurrency 4] [--platforms web,android]
+                                  [--latency 0.2] [--output-bytes 1048576] [--log-lines 200]
+                                  [--requests 50] [--output results.json] [--baseline old.json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+swab = None  # imported in main() once the environment points at the stubs
+
+# One script serves as flutter, dart and keytool, telling them apart by the name it was run as
+STUB = '''#!{python}
+import os, sys, time
+
+tool = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+output_bytes = int(os.environ['SWAB_BENCH_OUTPUT_BYTES'])
+
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+
+
+if tool == 'flutter' and args[:1] == ['--version']:
+    print('{{"frameworkVersion": "0.0.0-bench", "frameworkRevision": "bench", "dartSdkVersion": "0.0.0"}}')
+    sys.exit(0)
+
+time.sleep(float(os.environ['SWAB_BENCH_LATENCY']))
+for i in range(int(os.environ['SWAB_BENCH_LOG_LINES'])):
+    print(f'[{{tool}}] step {{i}}: compiling lib/src/module_{{i}}.dart')
+
+if tool == 'keytool':
+    write(args[args.index('-keystore') + 1], 2048)
+elif tool == 'flutter' and args[:2] == ['pub', 'get']:
+    os.makedirs('.dart_tool', exist_ok=True)
+    with open(os.path.join('.dart_tool', 'package_config.json'), 'w') as f:
+        f.write('{{"configVersion": 2, "packages": []}}')
+elif tool == 'flutter' and args[:1] == ['build']:
+    outputs = {{
+        'apk': 'build/app/outputs/flutter-apk/app-release.apk',
+        'appbundle': 'build/app/outputs/bundle/release/app-release.aab',
+        'ios': 'build/ios/iphoneos/Runner.app/Runner',
+        'web': 'build/web/main.dart.js',
+        'macos': 'build/macos/Build/Products/Release/Runner.app/Contents/MacOS/Runner',
+        'windows': 'build/windows/x64/runner/Release/app.exe',
+        'linux': 'build/linux/x64/release/bundle/lib/libapp.so',
+    }}
+    write(outputs[args[1]], output_bytes)
+'''
+
+BUILD = {
+    'app_name': 'Benchmark App',
+    'app_description': 'Pipeline benchmark',
+    'app_version': '1.0.0',
+    'package_name': 'com.example.benchmark',
+    'web_url': 'https://example.com',
+}
+
+PROJECT = {
+    'app_name': 'Benchmark App',
+    'app_description': 'Pipeline benchmark',
+    'app_version': '1.0.0',
+    'build_number': '1',
+    'package_name': 'com.example.benchmark',
+    'web_url': 'https://example.com',
+}
+
+
+def install_stubs(bin_dir):
+    """Write the stub toolchain into ``bin_dir``"""
+    os.makedirs(bin_dir, exist_ok=True)
+    for tool in ('flutter', 'dart', 'keytool'):
+        path = os.path.join(bin_dir, tool)
+        with open(path, 'w') as f:
+            f.write(STUB.format(python=sys.executable))
+        os.chmod(path, 0o755)
+
+
+def write_icon(path):
+    """Write a 1024x1024 PNG so builds exercise icon rendering"""
+    from PIL import Image
+    Image.new('RGBA', (1024, 1024), (33, 150, 243, 255)).save(path)
+
+
+def bytes_written():
+    """Bytes this process has passed to write calls so far, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def tree_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def percentiles(times):
+    """p50/p95/p99, mean and max of ``times`` in milliseconds"""
+    if not times:
+        return None
+    cuts = statistics.quantiles(times, n=100, method='inclusive') if len(times) > 1 else times * 99
+    return {
+        'p50': round(cuts[49], 2),
+        'p95': round(cuts[94], 2),
+        'p99': round(cuts[98], 2),
+        'mean': round(statistics.mean(times), 2),
+        'max': round(max(times), 2),
+    }
+
+
+def run_build(client, index, platforms, icon_path, poll_interval):
+    """Submit one build and wait for it; returns (latency in ms, status, build id)"""
+    payload = dict(BUILD, build_number=str(index + 1), platforms=platforms)
+    if icon_path:
+        payload['icon_path'] = icon_path
+
+    started = time.perf_counter()
+    while True:
+        response = client.post('/api/build', json=payload)
+        if response.status_code != 429:
+            break
+        time.sleep(poll_interval)
+    data = response.get_json()
+    if 'build_id' not in data:
+        return (time.perf_counter() - started) * 1000, 'rejected', None
+
+    build_id = data['build_id']
+    while True:
+        status = client.get(f'/api/build/{build_id}/status').get_json()
+        if status.get('status') in ('completed', 'error'):
+            return (time.perf_counter() - started) * 1000, status['status'], build_id
+        time.sleep(poll_interval)
+
+
+def bench_builds(client, args, platforms, icon_path):
+    # Every build gets its own build number so none of them is served from the artifact cache
+    written = bytes_written()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: run_build(client, i, platforms, icon_path, args.poll_interval),
+            range(args.builds)
+        ))
+    elapsed = time.perf_counter() - started
+    written = bytes_written() - written if written is not None else None
+
+    completed = [r for r in results if r[1] == 'completed']
+    build_dirs = [os.path.join(swab.app.config['BUILD_FOLDER'], r[2]) for r in results if r[2]]
+    return {
+        'count': len(results),
+        'completed': len(completed),
+        'failed': len(results) - len(completed),
+        'latency_ms': percentiles([r[0] for r in completed]),
+        'builds_per_minute': round(len(completed) / elapsed * 60, 2),
+        'wall_seconds': round(elapsed, 2),
+        'bytes_written_per_build': written // len(results) if written is not None and results else None,
+        'disk_bytes_per_build': sum(map(tree_size, build_dirs)) // len(build_dirs) if build_dirs else None,
+    }
+
+
+def bench_projects(client, args):
+    lock = threading.Lock()
+    save_times, open_times = [], []
+
+    def round_trip(_):
+        started = time.perf_counter()
+        response = client.post('/api/project/save', json=PROJECT)
+        saved = time.perf_counter()
+        client.post(
+            '/api/project/open',
+            data={'project': (io.BytesIO(response.get_data()), 'benchmark.swab')},
+            content_type='multipart/form-data'
+        )
+        opened = time.perf_counter()
+        with lock:
+            save_times.append((saved - started) * 1000)
+            open_times.append((opened - saved) * 1000)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(round_trip, range(args.requests)))
+    return {'save_latency_ms': percentiles(save_times), 'open_latency_ms': percentiles(open_times)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(label, latency):
+    if latency:
+        print(f"  {label:<6} p50 {latency['p50']:8.1f} ms   p95 {latency['p95']:8.1f} ms   "
+              f"p99 {latency['p99']:8.1f} ms   max {latency['max']:8.1f} ms")
+
+
+def compare(results, baseline):
+    """Print the change of the headline numbers against an earlier result file"""
+    print(f"Compared to {baseline.get('commit') or 'baseline'}:")
+    rows = [
+        ('build p50', ('builds', 'latency_ms', 'p50')),
+        ('build p95', ('builds', 'latency_ms', 'p95')),
+        ('builds/min', ('builds', 'builds_per_minute')),
+        ('save p50', ('projects', 'save_latency_ms', 'p50')),
+        ('open p50', ('projects', 'open_latency_ms', 'p50')),
+        ('peak RSS', ('peak_rss_bytes',)),
+    ]
+    for label, keys in rows:
+        new, old = results, baseline
+        for key in keys:
+            new = (new or {}).get(key)
+            old = (old or {}).get(key)
+        if new is None or not old:
+            continue
+        print(f"  {label:<10} {old:>14,} -> {new:>14,}   ({(new - old) / old * 100:+.1f}%)")
+
+
+def main():
+    global swab
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--builds', type=int, default=20, help='Builds to run')
+    parser.add_argument('--concurrency', type=int, default=4, help='Builds and project requests in flight at once')
+    parser.add_argument('--platforms', default='web,android', help='Comma separated platforms per build')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds every stub toolchain command takes')
+    parser.add_argument('--output-bytes', type=int, default=1024 * 1024, help='Size of each stub build output')
+    parser.add_argument('--log-lines', type=int, default=200, help='Lines of output per stub toolchain command')
+    parser.add_argument('--no-icon', action='store_true', help='Build without an app icon')
+    parser.add_argument('--requests', type=int, default=50, help='Project save/open round trips')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='Seconds between build status polls')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/pipeline-<commit>.json)')
+    parser.add_argument('--baseline', help='Earlier result file to compare against')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary data directory')
+    args = parser.parse_args()
+    platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+
+    data_dir = tempfile.mkdtemp(prefix='swab-bench-')
+    install_stubs(os.path.join(data_dir, 'bin'))
+    os.environ.update({
+        'PATH': os.path.join(data_dir, 'bin') + os.pathsep + os.environ.get('PATH', ''),
+        'SWAB_BENCH_LATENCY': str(args.latency),
+        'SWAB_BENCH_OUTPUT_BYTES': str(args.output_bytes),
+        'SWAB_BENCH_LOG_LINES': str(args.log_lines),
+        'SWAB_BUILD_FOLDER': os.path.join(data_dir, 'builds'),
+        'SWAB_UPLOAD_FOLDER': os.path.join(data_dir, 'uploads'),
+    })
+    # Let the queue run as many builds as the benchmark keeps in flight
+    os.environ.setdefault('SWAB_BUILD_WORKERS', str(args.concurrency))
+    os.environ.setdefault('SWAB_BUILD_CAPACITY', str(4 * args.concurrency))
+    os.environ.setdefault('SWAB_BUILD_QUEUE_SIZE', str(max(50, args.builds)))
+    os.environ.setdefault('SWAB_WORKSPACE_POOL_SIZE', '0')
+    os.environ.setdefault('SWAB_JANITOR_INTERVAL', '0')
+    os.environ.setdefault('SWAB_STATE_BACKEND', 'memory')
+
+    import app
+    swab = app
+    swab.start_background_services()
+    swab.prewarm_machine_keys()
+    client = swab.app.test_client()
+
+    icon_path = None
+    if not args.no_icon:
+        icon_path = os.path.join(swab.app.config['UPLOAD_FOLDER'], 'benchmark_icon.png')
+        write_icon(icon_path)
+
+    try:
+        print(f"Builds ({args.builds} x {','.join(platforms)}, concurrency {args.concurrency}, "
+              f"stub latency {args.latency}s, output {args.output_bytes} bytes):")
+        builds = bench_builds(client, args, platforms, icon_path)
+        report('build', builds['latency_ms'])
+        print(f"  {builds['completed']}/{builds['count']} completed, {builds['builds_per_minute']} builds/min, "
+              f"{builds['bytes_written_per_build']} bytes written and "
+              f"{builds['disk_bytes_per_build']} bytes kept per build")
+
+        print(f"Projects ({args.requests} save/open round trips, concurrency {args.concurrency}):")
+        projects = bench_projects(client, args)
+        report('save', projects['save_latency_ms'])
+        report('open', projects['open_latency_ms'])
+    finally:
+        if not args.keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'builds': args.builds,
+            'concurrency': args.concurrency,
+            'platforms': platforms,
+            'latency': args.latency,
+            'output_bytes': args.output_bytes,
+            'log_lines': args.log_lines,
+            'icon': icon_path is not None,
+            'requests': args.requests,
+        },
+        'builds': builds,
+        'projects': projects,
+        'peak_rss_bytes': peak_rss(),
+    }
+    print(f"Peak RSS: {results['peak_rss_bytes']} bytes")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"pipeline-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Production server for SWAB.
+
+API requests are served by preforked, threaded gunicorn workers, and builds
+run in a single builder process, so status, download and log requests are
+never stuck behind a running build.
+
+    python serve.py                  # API workers plus a builder process
+    python serve.py --role api       # API workers only, builder at SWAB_BUILDER_URL
+    python serve.py --role builder   # builder only, e.g. on a separate host
+"""
+import argparse
+import atexit
+import os
+import signal
+import subprocess
+import sys
+import time
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn does not run on Windows; use `python app.py` there
+    BaseApplication = None
+
+# Separate processes only see each other's builds through the SQLite state store
+os.environ.setdefault('SWAB_STATE_BACKEND', 'sqlite')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SWAB production server")
+    parser.add_argument(
+        "--role",
+        choices=("all", "api", "builder"),
+        default=os.getenv("SWAB_SERVE_ROLE", "all"),
+        help="all: API workers plus a builder process (default); api or builder: only that part"
+    )
+    parser.add_argument(
+        "--bind",
+        default=os.getenv("SWAB_BIND"),
+        help="Address to listen on (default: 0.0.0.0:5000, or 127.0.0.1:5001 for --role builder)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("SWAB_WEB_WORKERS", str(min(8, 2 * (os.cpu_count() or 1))))),
+        help="API worker processes (default: $SWAB_WEB_WORKERS or twice the CPU count, at most 8)"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.getenv("SWAB_WEB_THREADS", "16")),
+        help="Threads per API worker; event and log streams hold one each (default: 16)"
+    )
+    parser.add_argument(
+        "--builder-bind",
+        default=os.getenv("SWAB_BUILDER_BIND", "127.0.0.1:5001"),
+        help="Address of the builder process started by --role all (default: 127.0.0.1:5001)"
+    )
+    parser.add_argument(
+        "--builder-threads",
+        type=int,
+        default=int(os.getenv("SWAB_BUILDER_THREADS", "8")),
+        help="Request threads of the builder process (default: 8)"
+    )
+    return parser.parse_args()
+
+
+def serve(role, bind, workers, threads):
+    """Run gunicorn in this process until it is stopped"""
+
+    class SwabApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", [bind])
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            # Long builds and downloads run in request threads; the timeout only covers a hung worker
+            self.cfg.set("timeout", 120)
+            self.cfg.set("graceful_timeout", 30)
+            self.cfg.set("keepalive", 5)
+            self.cfg.set("accesslog", "-")
+            # API workers are forked from a master that already imported the app and derived its keys
+            self.cfg.set("preload_app", role == "api")
+
+        def load(self):
+            import app as swab
+            return swab.create_app(role)
+
+    SwabApplication().run()
+
+
+def start_builder(args):
+    """Start the builder process for --role all and stop it when this process exits"""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--role", "builder",
+        "--bind", args.builder_bind, "--threads", str(args.builder_threads),
+    ]
+    builder = subprocess.Popen(command)
+    owner = os.getpid()
+
+    def stop_builder():
+        # Forked API workers inherit this hook, only the master may stop the builder
+        if os.getpid() == owner and builder.poll() is None:
+            builder.send_signal(signal.SIGTERM)
+            try:
+                builder.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                builder.kill()
+
+    atexit.register(stop_builder)
+    # Give the builder a moment so the first forwarded request finds it listening
+    time.sleep(1)
+    if builder.poll() is not None:
+        sys.exit(f"Builder process exited with code {builder.returncode}")
+    return f"http://{args.builder_bind}"
+
+
+def main():
+    args = parse_args()
+    if BaseApplication is None:
+        sys.exit("serve.py needs gunicorn (pip install gunicorn); on Windows run `python app.py` instead")
+
+    if args.role == "builder":
+        # The builder owns the in-process build queue, so it must stay a single process
+        serve("builder", args.bind or "127.0.0.1:5001", 1, args.builder_threads)
+        return
+
+    if args.role == "all":
+        os.environ["SWAB_BUILDER_URL"] = start_builder(args)
+    serve("api", args.bind or "0.0.0.0:5000", args.workers, args.threads)
+
+
+if __name__ == "__main__":
+    main()
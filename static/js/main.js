@@ -317,8 +317,8 @@ document.addEventListener('DOMContentLoaded', function() {
             const result = await response.json();
             const buildId = result.build_id;
 
-            // Poll for status
-            pollBuildStatus(buildId);
+            // Follow build progress
+            watchBuildStatus(buildId);
 
         } catch (error) {
             console.error('Build error:', error);
@@ -335,6 +335,25 @@ document.addEventListener('DOMContentLoaded', function() {
         centerProgressFill.style.width = '0%';
     }
 
+    function watchBuildStatus(buildId) {
+        if (!window.EventSource) {
+            pollBuildStatus(buildId);
+            return;
+        }
+
+        // Stream stage transitions from the server, fall back to polling if the stream breaks
+        const source = new EventSource(`/api/build/${buildId}/events`);
+        source.addEventListener('progress', (event) => {
+            if (renderBuildStatus(buildId, JSON.parse(event.data))) {
+                source.close();
+            }
+        });
+        source.onerror = () => {
+            source.close();
+            pollBuildStatus(buildId);
+        };
+    }
+
     async function pollBuildStatus(buildId) {
         try {
             const response = await fetch(`/api/build/${buildId}/status`);
@@ -345,89 +364,98 @@ document.addEventListener('DOMContentLoaded', function() {
 
             const status = await response.json();
 
-            // Update progress UI (both sidebar and center)
-            progressFill.style.width = status.progress + '%';
-            progressPercent.textContent = status.progress + '%';
-            progressMessage.textContent = status.message;
-
-            // Update center progress bar
-            centerProgressFill.style.width = status.progress + '%';
-            centerProgressText.textContent = status.message;
-
-            if (status.status === 'completed') {
-                // Show completion
-                buildProgress.style.display = 'none';
-                buildComplete.style.display = 'block';
-                buildButton.disabled = false;
-
-                // Hide center progress and show dropdown
-                centerProgress.style.display = 'none';
-                platformDropdownWrapper.style.display = 'flex';
-                centerProgressFill.style.width = '0%';
-
-                // Generate download links
-                downloadLinks.innerHTML = '';
-                if (status.outputs) {
-                    for (const [platform, path] of Object.entries(status.outputs)) {
-                        if (path.startsWith('Error:')) {
-                            const errorBtn = document.createElement('span');
-                            errorBtn.className = 'download-btn error';
-                            errorBtn.innerHTML = `
-                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                                    <circle cx="12" cy="12" r="10"/>
-                                    <line x1="15" y1="9" x2="9" y2="15"/>
-                                    <line x1="9" y1="9" x2="15" y2="15"/>
-                                </svg>
-                                ${getPlatformDisplayName(platform)} failed
-                            `;
-                            errorBtn.title = path;
-                            downloadLinks.appendChild(errorBtn);
-                        } else {
-                            const link = document.createElement('a');
-                            link.href = `/api/build/${buildId}/download/${platform}`;
-                            link.className = 'download-btn';
-                            link.innerHTML = `
-                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                                    <path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4"/>
-                                    <polyline points="7 10 12 15 17 10"/>
-                                    <line x1="12" y1="15" x2="12" y2="3"/>
-                                </svg>
-                                Download ${getPlatformDisplayName(platform)}
-                            `;
-                            downloadLinks.appendChild(link);
-                        }
-                    }
+            if (!renderBuildStatus(buildId, status)) {
+                // Continue polling
+                setTimeout(() => pollBuildStatus(buildId), 1000);
+            }
+        } catch (error) {
+            console.error('Status poll error:', error);
+            showToast('Error checking build status: ' + error.message, 'error');
+            resetBuildUI();
+        }
+    }
+
+    // Update the progress UI, returns true once the build has finished
+    function renderBuildStatus(buildId, status) {
+        // Update progress UI (both sidebar and center)
+        progressFill.style.width = status.progress + '%';
+        progressPercent.textContent = status.progress + '%';
+        progressMessage.textContent = status.message;
+
+        // Update center progress bar
+        centerProgressFill.style.width = status.progress + '%';
+        centerProgressText.textContent = status.message;
 
-                    // Add keystore download link if generated
-                    if (status.keystore_generated) {
-                        const keystoreLink = document.createElement('a');
-                        keystoreLink.href = `/api/build/${buildId}/download/keystore`;
-                        keystoreLink.className = 'download-btn';
-                        keystoreLink.innerHTML = `
+        if (status.status === 'completed') {
+            // Show completion
+            buildProgress.style.display = 'none';
+            buildComplete.style.display = 'block';
+            buildButton.disabled = false;
+
+            // Hide center progress and show dropdown
+            centerProgress.style.display = 'none';
+            platformDropdownWrapper.style.display = 'flex';
+            centerProgressFill.style.width = '0%';
+
+            // Generate download links
+            downloadLinks.innerHTML = '';
+            if (status.outputs) {
+                for (const [platform, path] of Object.entries(status.outputs)) {
+                    if (path.startsWith('Error:')) {
+                        const errorBtn = document.createElement('span');
+                        errorBtn.className = 'download-btn error';
+                        errorBtn.innerHTML = `
+                            <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                                <circle cx="12" cy="12" r="10"/>
+                                <line x1="15" y1="9" x2="9" y2="15"/>
+                                <line x1="9" y1="9" x2="15" y2="15"/>
+                            </svg>
+                            ${getPlatformDisplayName(platform)} failed
+                        `;
+                        errorBtn.title = path;
+                        downloadLinks.appendChild(errorBtn);
+                    } else {
+                        const link = document.createElement('a');
+                        link.href = `/api/build/${buildId}/download/${platform}`;
+                        link.className = 'download-btn';
+                        link.innerHTML = `
                             <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                                <rect x="3" y="11" width="18" height="11" rx="2" ry="2"/>
-                                <path d="M7 11V7a5 5 0 0110 0v4"/>
+                                <path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4"/>
+                                <polyline points="7 10 12 15 17 10"/>
+                                <line x1="12" y1="15" x2="12" y2="3"/>
                             </svg>
-                            Download Keystore
+                            Download ${getPlatformDisplayName(platform)}
                         `;
-                        keystoreLink.title = 'Save this keystore for future app updates';
-                        downloadLinks.appendChild(keystoreLink);
+                        downloadLinks.appendChild(link);
                     }
                 }
 
-                showToast('Build completed successfully!', 'success');
-            } else if (status.status === 'error') {
-                showToast('Build failed: ' + status.message, 'error');
-                resetBuildUI();
-            } else {
-                // Continue polling
-                setTimeout(() => pollBuildStatus(buildId), 1000);
+                // Add keystore download link if generated
+                if (status.keystore_generated) {
+                    const keystoreLink = document.createElement('a');
+                    keystoreLink.href = `/api/build/${buildId}/download/keystore`;
+                    keystoreLink.className = 'download-btn';
+                    keystoreLink.innerHTML = `
+                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                            <rect x="3" y="11" width="18" height="11" rx="2" ry="2"/>
+                            <path d="M7 11V7a5 5 0 0110 0v4"/>
+                        </svg>
+                        Download Keystore
+                    `;
+                    keystoreLink.title = 'Save this keystore for future app updates';
+                    downloadLinks.appendChild(keystoreLink);
+                }
             }
-        } catch (error) {
-            console.error('Status poll error:', error);
-            showToast('Error checking build status: ' + error.message, 'error');
+
+            showToast('Build completed successfully!', 'success');
+            return true;
+        } else if (status.status === 'error') {
+            showToast('Build failed: ' + status.message, 'error');
             resetBuildUI();
+            return true;
         }
+
+        return false;
     }
 
     function getPlatformDisplayName(platform) {
@@ -789,8 +817,9 @@ document.addEventListener('DOMContentLoaded', function() {
             // Handle icon
             if (project.icon_path) {
                 currentIconPath = project.icon_path;
-                // Show icon preview by loading from uploads
-                iconPreview.innerHTML = `<img src="/uploads/${project.icon_path.split('/').pop()}" alt="App Icon" onerror="this.parentElement.innerHTML='<svg width=\\'48\\' height=\\'48\\' viewBox=\\'0 0 24 24\\' fill=\\'none\\' stroke=\\'currentColor\\' stroke-width=\\'1.5\\'><rect x=\\'3\\' y=\\'3\\' width=\\'18\\' height=\\'18\\' rx=\\'4\\' ry=\\'4\\'/><circle cx=\\'8.5\\' cy=\\'8.5\\' r=\\'1.5\\'/><polyline points=\\'21 15 16 10 5 21\\'/></svg>'">`;
+                // Show icon preview from the opened project, or from uploads for older files
+                const iconUrl = project.icon_url || `/uploads/${project.icon_path.split('/').pop()}`;
+                iconPreview.innerHTML = `<img src="${iconUrl}" alt="App Icon" onerror="this.parentElement.innerHTML='<svg width=\\'48\\' height=\\'48\\' viewBox=\\'0 0 24 24\\' fill=\\'none\\' stroke=\\'currentColor\\' stroke-width=\\'1.5\\'><rect x=\\'3\\' y=\\'3\\' width=\\'18\\' height=\\'18\\' rx=\\'4\\' ry=\\'4\\'/><circle cx=\\'8.5\\' cy=\\'8.5\\' r=\\'1.5\\'/><polyline points=\\'21 15 16 10 5 21\\'/></svg>'">`;
                 iconPreview.classList.add('has-icon');
                 iconUploadLabel.innerHTML = `
                     <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
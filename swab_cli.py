@@ -1,9 +1,43 @@
 import argparse
+import concurrent.futures
+import json
+import os
+import re
 import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import unquote
+
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import yaml
+except ImportError:  # Without PyYAML manifests have to be written as JSON
+    yaml = None
+
+API_URL = os.environ.get("SWAB_API_URL", "http://127.0.0.1:5000")
+ALLOWED_PLATFORMS = {"android", "android_aab", "ios", "macos", "windows", "linux", "web"}
+TERMINAL_STATUSES = {"completed", "error"}
+
+# Submissions rejected with 429 or lost to a connection error are retried this often
+SUBMIT_ATTEMPTS = 5
+# Status polling backs off from the first to the last interval, in seconds
+POLL_INTERVALS = (1.0, 15.0)
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_print_lock = threading.Lock()
+
+
+class CliError(Exception):
+    pass
+
 
-API_URL = "http://127.0.0.1:5000/api/build"
-ALLOWED_PLATFORMS = {"android", "ios", "windows", "mac", "linux"}
+def log(name, message):
+    with _print_lock:
+        print(f"[{name}] {message}" if name else message, flush=True)
 
 
 def parse_args():
@@ -11,58 +45,344 @@ def parse_args():
         description="SWAB CLI - Trigger headless builds"
     )
 
-    parser.add_argument("--app-name", required=True)
-    parser.add_argument("--app-description", required=True)
-    parser.add_argument("--app-version", required=True)
-    parser.add_argument("--build-number", required=True)
-    parser.add_argument("--package-name", required=True)
-    parser.add_argument("--web-url", required=True)
+    parser.add_argument("--app-name")
+    parser.add_argument("--app-description")
+    parser.add_argument("--app-version")
+    parser.add_argument("--build-number")
+    parser.add_argument("--package-name")
+    parser.add_argument("--web-url")
 
     parser.add_argument(
         "--platforms",
         nargs="+",
-        required=True,
-        help="Target platforms (android ios windows mac linux)"
+        help=f"Target platforms ({' '.join(sorted(ALLOWED_PLATFORMS))})"
+    )
+
+    parser.add_argument(
+        "--manifest",
+        help="YAML or JSON file with many builds, submitted concurrently instead of the single build above"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Builds of a manifest submitted and tracked at the same time (default: 4)"
+    )
+    parser.add_argument(
+        "--api-url",
+        default=API_URL,
+        help="Base URL of the SWAB server (default: $SWAB_API_URL or http://127.0.0.1:5000)"
     )
+    parser.add_argument("--wait", action="store_true", help="Wait until the builds finish")
+    parser.add_argument("--poll", action="store_true", help="Poll the status instead of following the event stream")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds to wait for a build (default: 3600)")
+    parser.add_argument("--download", metavar="DIR", help="Download every output into DIR, implies --wait")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.download:
+        args.wait = True
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not args.manifest:
+        missing = [
+            f"--{name.replace('_', '-')}"
+            for name in ("app_name", "app_description", "app_version", "build_number", "package_name", "web_url", "platforms")
+            if not getattr(args, name)
+        ]
+        if missing:
+            parser.error(f"the following arguments are required without --manifest: {', '.join(missing)}")
+    return args
 
 
-def validate_platforms(platforms):
+def validate_platforms(platforms, name=None):
     invalid = [p for p in platforms if p not in ALLOWED_PLATFORMS]
     if invalid:
-        print(f"Error: Unsupported platform(s): {', '.join(invalid)}")
-        sys.exit(1)
+        raise CliError(f"{f'{name}: ' if name else ''}Unsupported platform(s): {', '.join(invalid)}")
+
+
+def load_manifest(path):
+    """Read the builds of a manifest: a list of builds, or ``defaults`` plus ``builds``"""
+    with open(path, "r") as f:
+        text = f.read()
+
+    if yaml is not None:
+        manifest = yaml.safe_load(text)
+    else:
+        try:
+            manifest = json.loads(text)
+        except ValueError:
+            raise CliError("Reading a YAML manifest requires PyYAML (pip install pyyaml)")
+
+    if isinstance(manifest, list):
+        manifest = {"builds": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("builds"), list):
+        raise CliError("The manifest needs a list of builds")
+
+    defaults = manifest.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise CliError("The manifest's defaults must be a mapping of build settings")
+    for index, build in enumerate(manifest["builds"]):
+        if not isinstance(build, dict):
+            raise CliError(f"Build {index} of the manifest must be a mapping of build settings, got {build!r}")
+    payloads = [dict(defaults, **build) for build in manifest["builds"]]
+    for index, payload in enumerate(payloads):
+        validate_platforms(payload.get("platforms") or [], payload.get("app_name") or f"build {index}")
+    return payloads
+
+
+def create_session(connections):
+    """HTTP session that keeps up to ``connections`` connections to the server alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def retry_after(response, default):
+    """Seconds to wait according to a Retry-After header, ``default`` if it is missing or malformed"""
+    value = response.headers.get("Retry-After", "").strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # The header may also carry an HTTP date
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return default
+
+
+def submit_build(session, api_url, payload):
+    """Queue a build and return its id, retrying while the queue is full"""
+    name = payload.get("app_name")
+    for attempt in range(SUBMIT_ATTEMPTS):
+        delay = 2 ** attempt
+        try:
+            response = session.post(f"{api_url}/api/build", json=payload, timeout=30)
+        except requests.RequestException as e:
+            if attempt == SUBMIT_ATTEMPTS - 1:
+                raise CliError(f"Failed to connect to backend: {e}")
+            time.sleep(delay)
+            continue
+
+        if response.status_code == 429 and attempt < SUBMIT_ATTEMPTS - 1:
+            delay = retry_after(response, delay)
+            log(name, f"Build queue is full, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            continue
+        if response.status_code != 200:
+            raise CliError(f"Build request failed: {response.text.strip()}")
+
+        data = response.json()
+        log(name, "Build started successfully")
+        log(name, f"Build ID: {data.get('build_id')}")
+        return data["build_id"]
+
+
+def follow_events(session, api_url, build_id, deadline, report):
+    """Follow the build's event stream until it finishes; None if the stream breaks off"""
+    remaining = deadline - time.monotonic()
+    with session.get(
+        f"{api_url}/api/build/{build_id}/events", stream=True, timeout=(10, min(60, max(1, remaining)))
+    ) as response:
+        response.raise_for_status()
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "progress":
+                state = json.loads(line[5:])
+                report(state)
+                if state.get("status") in TERMINAL_STATUSES:
+                    return state
+            if time.monotonic() > deadline:
+                return None
+    return None
+
+
+def poll_status(session, api_url, build_id, deadline, report):
+    """Poll the build status with exponential backoff until it finishes or the deadline passes"""
+    interval = POLL_INTERVALS[0]
+    while time.monotonic() < deadline:
+        try:
+            response = session.get(f"{api_url}/api/build/{build_id}/status", timeout=30)
+            response.raise_for_status()
+            state = response.json()
+            report(state)
+            if state.get("status") in TERMINAL_STATUSES:
+                return state
+        except requests.RequestException:
+            pass
+        time.sleep(min(interval, max(0, deadline - time.monotonic())))
+        interval = min(interval * 2, POLL_INTERVALS[1])
+    return None
+
+
+def wait_for_build(session, api_url, build_id, name, timeout, use_events=True):
+    """Return the final state of a build, preferring the event stream over polling"""
+    deadline = time.monotonic() + timeout
+    last = {}
+
+    def report(state):
+        line = f"{state.get('status')} {state.get('progress', 0)}% {state.get('message', '')}".strip()
+        if line != last.get("line"):
+            last["line"] = line
+            log(name, line)
+
+    if use_events:
+        try:
+            state = follow_events(session, api_url, build_id, deadline, report)
+            if state is not None:
+                return state
+        except (requests.RequestException, ValueError):
+            pass
+    state = poll_status(session, api_url, build_id, deadline, report)
+    if state is None:
+        raise CliError(f"Build {build_id} did not finish within {timeout:.0f}s")
+    return state
+
+
+def attachment_name(response, fallback):
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=UTF-8''([^;]+)", disposition)
+    if match:
+        return os.path.basename(unquote(match.group(1)))
+    match = re.search(r'filename="?([^";]+)"?', disposition)
+    return os.path.basename(match.group(1)) if match else fallback
+
+
+def download_file(session, url, directory, part_name, fallback_name):
+    """Download ``url`` into ``directory``, resuming a partial download with a Range request"""
+    part_path = os.path.join(directory, part_name)
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=(10, 120)) as response:
+                if response.status_code == 416:
+                    # The partial file is stale, start over
+                    os.remove(part_path)
+                    continue
+                response.raise_for_status()
+                # Bundles are zipped on the fly and cannot resume; the server then sends them whole
+                mode = "ab" if response.status_code == 206 else "wb"
+                expected = response.headers.get("Content-Length")
+                written = 0
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        written += len(chunk)
+                if expected is not None and written < int(expected):
+                    raise requests.ConnectionError(f"received {written} of {expected} bytes")
+
+                path = os.path.join(directory, attachment_name(response, fallback_name))
+                os.replace(part_path, path)
+                return path
+        except requests.RequestException as e:
+            if attempt == DOWNLOAD_ATTEMPTS - 1:
+                raise CliError(f"Download of {url} failed: {e}")
+            time.sleep(2 ** attempt)
+    raise CliError(f"Download of {url} failed")
+
+
+def download_outputs(session, api_url, build_id, state, directory, name):
+    """Fetch every successful output of a finished build in parallel"""
+    platforms = [
+        platform for platform, platform_state in (state.get("platforms") or {}).items()
+        if platform_state.get("status") in ("completed", "cached") and platform in (state.get("outputs") or {})
+    ]
+    if state.get("keystore_generated"):
+        platforms.append("keystore")
+    os.makedirs(directory, exist_ok=True)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(platforms))) as executor:
+        futures = {
+            executor.submit(
+                download_file, session, f"{api_url}/api/build/{build_id}/download/{platform}",
+                directory, f".{build_id}-{platform}.part", f"{build_id}-{platform}"
+            ): platform
+            for platform in platforms
+        }
+        for future in concurrent.futures.as_completed(futures):
+            log(name, f"Downloaded {futures[future]}: {future.result()}")
+
+
+def failed_platforms(state):
+    if state.get("status") != "completed":
+        return ["build"]
+    return [
+        platform for platform, platform_state in (state.get("platforms") or {}).items()
+        if platform_state.get("status") == "error"
+    ]
+
+
+def run_build(session, args, payload, directory):
+    """Submit one build and optionally wait for and download it; returns True on success"""
+    name = payload.get("app_name")
+    try:
+        build_id = submit_build(session, args.api_url, payload)
+        if not args.wait:
+            return True
+
+        state = wait_for_build(session, args.api_url, build_id, name, args.timeout, use_events=not args.poll)
+        failed = failed_platforms(state)
+        for platform in failed:
+            message = (state.get("platforms") or {}).get(platform, {}).get("message") or state.get("message")
+            log(name, f"{platform} failed: {message}")
+
+        if args.download and state.get("status") == "completed":
+            download_outputs(session, args.api_url, build_id, state, directory, name)
+        return not failed
+    except (CliError, requests.RequestException, OSError, ValueError) as e:
+        log(name, f"Error: {e}")
+        return False
 
 
 def main():
     args = parse_args()
-    validate_platforms(args.platforms)
-
-    payload = {
-        "app_name": args.app_name,
-        "app_description": args.app_description,
-        "app_version": args.app_version,
-        "build_number": args.build_number,
-        "package_name": args.package_name,
-        "web_url": args.web_url,
-        "platforms": args.platforms,
-    }
+    args.api_url = args.api_url.rstrip("/")
 
     try:
-        response = requests.post(API_URL, json=payload, timeout=10)
-    except requests.RequestException as e:
-        print(f"Failed to connect to backend: {e}")
+        if args.manifest:
+            payloads = load_manifest(args.manifest)
+        else:
+            validate_platforms(args.platforms)
+            payloads = [{
+                "app_name": args.app_name,
+                "app_description": args.app_description,
+                "app_version": args.app_version,
+                "build_number": args.build_number,
+                "package_name": args.package_name,
+                "web_url": args.web_url,
+                "platforms": args.platforms,
+            }]
+    except (CliError, OSError, ValueError) as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-    if response.status_code != 200:
-        print("Build request failed:")
-        print(response.text)
-        sys.exit(1)
+    # Every build may download all its platforms at once over the shared session
+    session = create_session(args.concurrency * (len(ALLOWED_PLATFORMS) + 1))
+    concurrency = min(args.concurrency, len(payloads))
 
-    data = response.json()
-    print("Build started successfully")
-    print(f"Build ID: {data.get('build_id')}")
+    def directory_for(payload):
+        if not args.download:
+            return None
+        if args.manifest:
+            # Outputs are named after the app, keep same-named apps apart
+            return os.path.join(args.download, payload.get("package_name") or payload.get("app_name") or "build")
+        return args.download
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda payload: run_build(session, args, payload, directory_for(payload)), payloads
+        ))
+
+    failures = results.count(False)
+    if len(payloads) > 1:
+        print(f"{len(payloads) - failures} of {len(payloads)} builds succeeded")
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
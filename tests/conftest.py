@@ -0,0 +1,10 @@
+"""Shared test setup: keep app.py's data folders out of the repository."""
+import os
+import sys
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix='swab-tests-')
+os.environ.setdefault('SWAB_BUILD_FOLDER', os.path.join(DATA_DIR, 'builds'))
+os.environ.setdefault('SWAB_UPLOAD_FOLDER', os.path.join(DATA_DIR, 'uploads'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,76 @@
+"""ArtifactCache restores racing with eviction count as misses, never as partial outputs."""
+import os
+
+import pytest
+
+import app as swab
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return swab.ArtifactCache(str(tmp_path / 'cache'), max_bytes=10 * 1024 * 1024)
+
+
+def make_bundle(path, files=3):
+    os.makedirs(path)
+    for i in range(files):
+        with open(os.path.join(path, f'part{i}.js'), 'w') as f:
+            f.write(f'part {i}\n' * 100)
+    return str(path)
+
+
+def test_restores_file_and_bundle(cache, tmp_path):
+    apk = tmp_path / 'app.apk'
+    apk.write_bytes(b'apk' * 1000)
+    cache.store('key-apk', str(apk))
+    cache.store('key-web', make_bundle(tmp_path / 'App_web'))
+
+    outputs = cache.restore({'android': 'key-apk', 'web': 'key-web'}, str(tmp_path / 'outputs'))
+
+    assert sorted(outputs) == ['android', 'web']
+    assert open(outputs['android'], 'rb').read() == b'apk' * 1000
+    assert sorted(os.listdir(outputs['web'])) == ['part0.js', 'part1.js', 'part2.js']
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_object_evicted_by_another_process_is_a_miss(cache, tmp_path):
+    apk = tmp_path / 'app.apk'
+    apk.write_bytes(b'apk')
+    cache.store('key-apk', str(apk))
+    os.remove(cache._object_path(swab.file_sha256(str(apk))))
+
+    assert cache.restore({'android': 'key-apk'}, str(tmp_path / 'outputs')) == {}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_bundle_evicted_while_restoring_leaves_no_partial_output(cache, tmp_path, monkeypatch):
+    bundle = make_bundle(tmp_path / 'App_web')
+    cache.store('key-web', bundle)
+    object_path = cache._object_path(swab.tree_sha256(bundle))
+    link_or_copy = swab.link_or_copy
+
+    def evicted_after_first_file(src, dst):
+        link_or_copy(src, dst)
+        if os.path.exists(object_path):
+            # What _evict in another process does to a bundle
+            os.replace(object_path, f'{object_path}.evicted')
+
+    monkeypatch.setattr(swab, 'link_or_copy', evicted_after_first_file)
+    outputs = cache.restore({'web': 'key-web'}, str(tmp_path / 'outputs'))
+
+    assert outputs == {}
+    assert not os.path.exists(tmp_path / 'outputs' / 'App_web')
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_eviction_moves_bundles_away_before_deleting(cache, tmp_path, monkeypatch):
+    cache.max_bytes = 1
+    removed = []
+    monkeypatch.setattr(swab.shutil, 'rmtree', lambda path, ignore_errors=False: removed.append(path))
+
+    bundle = make_bundle(tmp_path / 'App_web')
+    cache.store('key-web', bundle)
+
+    object_path = cache._object_path(swab.tree_sha256(bundle))
+    assert not os.path.exists(object_path)
+    assert len(removed) == 1 and removed[0].startswith(f'{object_path}.') and removed[0].endswith('.evicted')
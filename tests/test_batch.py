@@ -0,0 +1,105 @@
+"""Batch builds: dependencies resolved once per workspace, summary frozen by the builder."""
+import os
+import time
+import uuid
+
+import pytest
+
+import app as swab
+
+BASE = {
+    'app_name': 'Batch App',
+    'app_description': 'Batch test app',
+    'app_version': '1.0.0',
+    'build_number': '1',
+    'package_name': 'com.example.batch',
+    'web_url': 'https://example.com',
+    'platforms': ['web'],
+}
+
+
+@pytest.fixture
+def toolchain(monkeypatch):
+    """Stand-in for flutter that records every command and produces a web bundle"""
+    commands = []
+
+    def run_toolchain(command, cwd, log, timeout):
+        commands.append((command[1:3], cwd))
+        if command[1:3] == ['pub', 'get']:
+            os.makedirs(os.path.join(cwd, '.dart_tool'), exist_ok=True)
+            with open(os.path.join(cwd, '.dart_tool', 'package_config.json'), 'w') as f:
+                f.write('{}')
+        elif command[1:3] == ['build', 'web']:
+            os.makedirs(os.path.join(cwd, 'build', 'web'), exist_ok=True)
+            with open(os.path.join(cwd, 'build', 'web', 'index.html'), 'w') as f:
+                f.write('<html></html>')
+
+    monkeypatch.setattr(swab, 'run_toolchain', run_toolchain)
+    return commands
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = swab.BuildQueue(workers=1, capacity=1, max_pending=10, state_path=str(tmp_path / 'queue.json'))
+    monkeypatch.setattr(swab, 'build_queue', queue)
+    monkeypatch.setattr(swab, 'start_background_services', lambda: None)
+    monkeypatch.setattr(swab.artifact_cache, 'enabled', False)
+    monkeypatch.setattr(swab, 'BATCH_WORKSPACES', 2)
+    return queue
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.02)
+
+
+def test_batch_resolves_once_per_workspace(toolchain, queue):
+    client = swab.app.test_client()
+    apps = [{'app_name': f'App {i}', 'package_name': f'com.example.app{i}'} for i in range(6)]
+    batch_id = client.post('/api/batch', json={'base': BASE, 'apps': apps}).get_json()['batch_id']
+    queue.start()
+
+    # Nobody asks for the batch status; the builder freezes the summary itself
+    wait_until(lambda: swab.build_store.get(batch_id)['status'] in swab.TERMINAL_STATUSES)
+    batch = swab.build_store.get(batch_id)
+    assert batch['status'] == 'completed'
+    assert batch['counts'] == {'completed': 6}
+
+    resolved = [cwd for command, cwd in toolchain if command == ['pub', 'get']]
+    assert len(resolved) == 2
+    assert all(os.sep + '_incremental' + os.sep in cwd for cwd in resolved)
+    assert len([command for command, _ in toolchain if command == ['build', 'web']]) == 6
+
+    status = client.get(f'/api/batch/{batch_id}').get_json()
+    assert status['batch_id'] == batch_id
+    assert [a['status'] for a in status['apps']] == ['completed'] * 6
+
+
+def test_reading_the_status_does_not_finish_the_batch():
+    batch_id, build_id = str(uuid.uuid4()), str(uuid.uuid4())
+    swab.build_store.set(batch_id, {'status': 'queued', 'progress': 0, 'apps': [{'build_id': build_id}]})
+    swab.build_store.set(build_id, {'status': 'completed', 'progress': 100})
+
+    assert swab.batch_status(batch_id)['status'] == 'completed'
+    assert swab.build_store.get(batch_id)['status'] == 'queued'
+
+    swab.finish_batch_app(batch_id)
+    assert swab.build_store.get(batch_id)['status'] == 'completed'
+    assert swab.build_store.get(batch_id)['message'] == '1 of 1 apps finished, 0 failed'
+
+
+@pytest.mark.parametrize('persistent', [False, True])
+def test_bundles_stay_in_persistent_workspaces(tmp_path, persistent):
+    bundle_dir = tmp_path / 'workspace' / 'build' / 'web'
+    os.makedirs(bundle_dir / 'assets')
+    (bundle_dir / 'index.html').write_text('<html></html>')
+    (bundle_dir / 'assets' / 'app.js').write_text('main()')
+
+    output_path = swab.collect_bundle(str(bundle_dir), str(tmp_path / 'outputs' / 'App_web'), persistent)
+
+    assert sorted(os.listdir(output_path)) == ['assets', 'index.html']
+    assert os.path.exists(bundle_dir / 'assets' / 'app.js') == persistent
+    if persistent:
+        assert not os.path.samefile(bundle_dir / 'index.html', os.path.join(output_path, 'index.html'))
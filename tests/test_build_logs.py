@@ -0,0 +1,65 @@
+"""Range requests against build logs written by this or another process."""
+import gzip
+import os
+import uuid
+
+import pytest
+
+import app as swab
+
+LINES = b''.join(b'line %d of the toolchain output\n' % i for i in range(30))
+
+
+@pytest.fixture
+def client():
+    return swab.app.test_client()
+
+
+def start_log(build_id, state):
+    """A log being written by another process: sync-flushed, without gzip trailer, not in this registry"""
+    swab.build_store.set(build_id, state)
+    path = swab.build_log_path(os.path.join(swab.app.config['BUILD_FOLDER'], build_id), 'web')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    log = gzip.open(path, 'wb')
+    log.write(LINES)
+    log.flush()
+    return log
+
+
+def test_range_on_live_log_has_no_trailer_size(client):
+    build_id = str(uuid.uuid4())
+    log = start_log(build_id, {'status': 'building', 'platforms': {'web': {'status': 'building'}}})
+    try:
+        response = client.get(f'/api/build/{build_id}/logs?platform=web', headers={'Range': 'bytes=10-'})
+        assert response.status_code == 200
+        assert 'Content-Range' not in response.headers
+        assert response.get_data() == LINES[10:]
+    finally:
+        log.close()
+
+
+def test_range_on_log_of_finished_platform(client):
+    build_id = str(uuid.uuid4())
+    start_log(build_id, {'status': 'building', 'platforms': {'web': {'status': 'completed'}}}).close()
+
+    response = client.get(f'/api/build/{build_id}/logs?platform=web', headers={'Range': 'bytes=10-'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 10-{len(LINES) - 1}/{len(LINES)}'
+    assert response.get_data() == LINES[10:]
+
+    response = client.get(f'/api/build/{build_id}/logs?platform=web', headers={'Range': f'bytes={len(LINES)}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(LINES)}'
+
+
+def test_log_open_in_this_process_is_live(client):
+    build_id = str(uuid.uuid4())
+    swab.build_store.set(build_id, {'status': 'completed'})
+    log = swab.BuildLog(swab.build_log_path(os.path.join(swab.app.config['BUILD_FOLDER'], build_id), 'build'))
+    try:
+        log.follow()  # followed logs are flushed on every line
+        log.write(b'still running')
+        response = client.get(f'/api/build/{build_id}/logs', headers={'Range': 'bytes=0-'})
+        assert response.status_code == 200
+    finally:
+        log.close()
@@ -0,0 +1,187 @@
+"""BuildQueue admission by weight, back-pressure and restart recovery."""
+import json
+import threading
+import time
+
+import pytest
+
+import app as swab
+
+CONFIG = {
+    'app_name': 'Queued App',
+    'app_description': 'Build queue test app',
+    'app_version': '1.0.0',
+    'build_number': '1',
+    'package_name': 'com.example.queued',
+    'web_url': 'https://example.com',
+}
+
+
+def config(*platforms):
+    return dict(CONFIG, platforms=list(platforms))
+
+
+class Builds:
+    """Stand-in for run_build that holds every build until the test releases it"""
+
+    def __init__(self):
+        self.started = []
+        self._cond = threading.Condition()
+        self._released = set()
+
+    def __call__(self, build_id, config):
+        with self._cond:
+            self.started.append(build_id)
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: build_id in self._released, timeout=10)
+
+    def release(self, build_id):
+        with self._cond:
+            self._released.add(build_id)
+            self._cond.notify_all()
+
+    def release_all(self):
+        with self._cond:
+            self._released.update(self.started)
+            self._released.add(None)
+            self._cond.notify_all()
+
+    def wait_started(self, count, timeout=5):
+        with self._cond:
+            assert self._cond.wait_for(lambda: len(self.started) >= count, timeout), self.started
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    builds = Builds()
+    monkeypatch.setattr(swab, 'run_build', builds)
+    yield builds
+    builds.release_all()
+
+
+@pytest.fixture
+def make_queue(tmp_path, builds):
+    queues = []
+
+    def make(**options):
+        options = dict({'workers': 3, 'capacity': 3, 'max_pending': 10, 'default_duration': 60}, **options)
+        queues.append(swab.BuildQueue(state_path=str(tmp_path / 'queue.json'), **options))
+        return queues[-1]
+
+    yield make
+    # Workers outlive the test; leave them nothing to pick up once the held builds are released
+    for queue in queues:
+        with queue._cond:
+            queue._pending.clear()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.01)
+
+
+def test_job_weight_follows_concurrent_lanes(make_queue, monkeypatch):
+    monkeypatch.setattr(swab, 'PLATFORM_CONCURRENCY', 2)
+    queue = make_queue(capacity=4)
+    assert queue.job_weight(config('web')) == 1
+    assert queue.job_weight(config('android', 'android_aab')) == 2  # one lane
+    assert queue.job_weight(config('android', 'ios', 'web')) == 4
+    assert make_queue(capacity=3).job_weight(config('android', 'ios')) == 3  # capped so it can ever start
+
+
+def test_jobs_start_only_when_their_weight_fits(make_queue, builds):
+    queue = make_queue()
+    queue.start()
+
+    queue.submit('heavy-1', config('android'))
+    queue.submit('light-1', config('web'))
+    queue.submit('heavy-2', config('ios'))
+    queue.submit('light-2', config('web'))
+    builds.wait_started(2)
+    time.sleep(0.05)
+
+    # light-2 would fit but never overtakes heavy-2 at the head of the queue
+    assert builds.started == ['heavy-1', 'light-1']
+    stats = queue.stats()
+    assert (stats['running'], stats['pending'], stats['capacity_used']) == (2, 2, 3)
+    assert swab.build_store.get('heavy-2')['queue_position'] == 1
+    assert swab.build_store.get('light-2')['queue_position'] == 2
+
+    builds.release('light-1')
+    time.sleep(0.05)
+    assert builds.started == ['heavy-1', 'light-1']  # one free unit is not enough for heavy-2
+
+    builds.release('heavy-1')
+    builds.wait_started(4)
+    assert builds.started[2:] == ['heavy-2', 'light-2']
+    assert queue.stats()['capacity_used'] == 3
+
+
+def test_full_queue_answers_429_with_retry_after(make_queue, builds, monkeypatch):
+    queue = make_queue(workers=1, capacity=1, max_pending=1)
+    monkeypatch.setattr(swab, 'build_queue', queue)
+    monkeypatch.setattr(swab, 'start_background_services', lambda: None)
+    client = swab.app.test_client()
+
+    first = client.post('/api/build', json=config('web'))
+    assert first.status_code == 200
+    assert first.get_json()['queue_position'] == 1
+
+    response = client.post('/api/build', json=config('web'))
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '60'  # nothing is running, so one average build
+    assert response.get_json()['retry_after'] == 60
+
+    # A running job frees its slot in the queue; the estimate now counts down from its start
+    queue.start()
+    builds.wait_started(1)
+    assert client.post('/api/build', json=config('web')).status_code == 200
+    response = client.post('/api/build', json=config('web'))
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 60
+
+
+def test_batch_takes_one_slot_and_fits_as_a_whole(make_queue):
+    queue = make_queue(max_pending=2)
+    queue.submit('single', config('web'))
+
+    batch = [(f'app-{i}', dict(config('web'), batch_id='batch-1')) for i in range(5)]
+    assert len(queue.submit_many(batch)) == 5
+    with pytest.raises(swab.QueueFullError):
+        queue.submit_many([('app-x', dict(config('web'), batch_id='batch-2'))])
+    assert queue.stats()['pending'] == 6
+
+
+def test_restores_pending_and_running_jobs_from_queue_json(make_queue, builds, tmp_path, monkeypatch):
+    queue = make_queue(workers=1, capacity=1)
+    queue.start()
+    queue.submit('was-running', config('web'))
+    builds.wait_started(1)
+    queue.submit('was-pending', config('android'))
+
+    with open(tmp_path / 'queue.json') as f:
+        persisted = json.load(f)
+    assert [job['build_id'] for job in persisted] == ['was-running', 'was-pending']
+    assert persisted[1]['config'] == config('android')
+
+    # A new process picks the jobs up again, the interrupted one first
+    restarted = Builds()
+    monkeypatch.setattr(swab, 'run_build', restarted)
+    try:
+        queue = make_queue(workers=1, capacity=2)
+        queue.start()
+        restarted.wait_started(1)
+        assert restarted.started == ['was-running']
+        assert queue.stats()['pending'] == 1
+        restarted.release('was-running')
+        restarted.wait_started(2)
+        assert restarted.started == ['was-running', 'was-pending']
+        restarted.release('was-pending')
+        wait_until(lambda: queue.stats()['running'] == 0)
+    finally:
+        restarted.release_all()
+
+    with open(tmp_path / 'queue.json') as f:
+        assert json.load(f) == []
@@ -0,0 +1,263 @@
+"""swab_cli against a local HTTP stand-in for the SWAB API: event/poll fallback, resumed downloads, manifests."""
+import http.server
+import json
+import threading
+import types
+
+import pytest
+
+import swab_cli
+
+BUILD_ID = 'build-1'
+STATE = {'status': 'building', 'progress': 50, 'message': 'Building web'}
+DONE = {
+    'status': 'completed',
+    'progress': 100,
+    'message': 'Build completed!',
+    'platforms': {'web': {'status': 'completed'}, 'android': {'status': 'completed'}},
+    'outputs': {'web': 'App_web', 'android': 'app.apk'},
+}
+
+
+class Api(http.server.ThreadingHTTPServer):
+    """Serves a scripted build: its event stream, its status and its downloads"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ApiHandler)
+        self.events = [STATE, DONE]  # progress states sent before the stream closes, or an error status
+        self.statuses = [DONE]  # states answered to polls, the last one repeats
+        self.files = {}
+        self.ranges = True  # whether downloads honour Range requests
+        self.cut_after = None  # bytes sent before the first download breaks off
+        self.requests = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def paths(self, suffix):
+        return [path for path, _ in self.requests if path.endswith(suffix)]
+
+
+class ApiHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, payload))
+        self.send_json({'build_id': BUILD_ID, 'status': 'queued'})
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get('Range')))
+        if self.path.endswith('/events'):
+            if isinstance(server.events, int):
+                self.send_error(server.events)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for state in server.events:
+                self.wfile.write(f'event: progress\ndata: {json.dumps(state)}\n\n'.encode())
+        elif self.path.endswith('/status'):
+            state = server.statuses.pop(0) if len(server.statuses) > 1 else server.statuses[0]
+            self.send_json(state)
+        elif '/download/' in self.path:
+            self.send_file(self.path.rsplit('/', 1)[1])
+        else:
+            self.send_error(404)
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, platform):
+        server = self.server
+        content = server.files[platform]
+        offset = 0
+        requested = self.headers.get('Range')
+        if requested and server.ranges:
+            offset = int(requested[len('bytes='):-1])
+            if offset >= len(content):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {offset}-{len(content) - 1}/{len(content)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(content) - offset))
+        self.send_header('Content-Disposition', f'attachment; filename="{platform}.bin"')
+        self.end_headers()
+        if server.cut_after is not None:
+            self.wfile.write(content[offset:offset + server.cut_after])
+            server.cut_after = None
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(content[offset:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(swab_cli, 'POLL_INTERVALS', (0.01, 0.02))
+    monkeypatch.setattr(swab_cli, 'DOWNLOAD_CHUNK_SIZE', 1024)
+    server = Api()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    with swab_cli.create_session(4) as session:
+        yield session
+
+
+def wait(api, session, **options):
+    return swab_cli.wait_for_build(session, api.url, BUILD_ID, 'App', timeout=5, **options)
+
+
+def test_follows_the_event_stream(api, session):
+    assert wait(api, session) == DONE
+    assert api.paths('/status') == []
+
+
+def test_polls_when_the_stream_breaks_off(api, session):
+    api.events = [STATE]
+    api.statuses = [STATE, STATE, DONE]
+
+    assert wait(api, session) == DONE
+    assert len(api.paths('/events')) == 1
+    assert len(api.paths('/status')) == 3
+
+
+@pytest.mark.parametrize('status', [404, 500])
+def test_polls_when_the_stream_is_unavailable(api, session, status):
+    api.events = status
+    assert wait(api, session) == DONE
+    assert len(api.paths('/status')) == 1
+
+
+def test_poll_skips_the_event_stream(api, session):
+    assert wait(api, session, use_events=False) == DONE
+    assert api.paths('/events') == []
+
+
+def test_gives_up_at_the_timeout(api, session):
+    api.events = [STATE]
+    api.statuses = [STATE]
+    with pytest.raises(swab_cli.CliError, match='did not finish'):
+        swab_cli.wait_for_build(session, api.url, BUILD_ID, 'App', timeout=0.2)
+
+
+def test_resumes_an_interrupted_download(api, session, tmp_path):
+    content = bytes(range(256)) * 20
+    api.files['android'] = content
+    api.cut_after = 3000
+
+    path = swab_cli.download_file(session, f'{api.url}/api/build/{BUILD_ID}/download/android',
+                                  str(tmp_path), '.part', 'fallback')
+
+    assert path == str(tmp_path / 'android.bin')
+    assert open(path, 'rb').read() == content
+    ranges = [r for p, r in api.requests if p.endswith('/android')]
+    assert len(ranges) == 2
+    assert ranges[0] is None
+    assert ranges[1].startswith('bytes=') and ranges[1] != 'bytes=0-'
+    assert not (tmp_path / '.part').exists()
+
+
+def test_download_starts_over_when_the_server_sends_everything(api, session, tmp_path):
+    # Zipped bundles are sent whole even to a Range request
+    api.files['web'] = b'zip' * 1000
+    api.ranges = False
+    (tmp_path / '.part').write_bytes(b'zip' * 100)
+
+    path = swab_cli.download_file(session, f'{api.url}/api/build/{BUILD_ID}/download/web',
+                                  str(tmp_path), '.part', 'fallback')
+
+    assert open(path, 'rb').read() == b'zip' * 1000
+
+
+def test_stale_partial_download_is_discarded(api, session, tmp_path):
+    api.files['android'] = b'apk' * 100
+    (tmp_path / '.part').write_bytes(b'x' * 1000)
+
+    path = swab_cli.download_file(session, f'{api.url}/api/build/{BUILD_ID}/download/android',
+                                  str(tmp_path), '.part', 'fallback')
+
+    assert open(path, 'rb').read() == b'apk' * 100
+    assert [r for p, r in api.requests if p.endswith('/android')] == ['bytes=1000-', None]
+
+
+def test_run_build_waits_and_downloads_every_output(api, session, tmp_path):
+    api.files = {'web': b'bundle', 'android': b'apk'}
+    args = types.SimpleNamespace(api_url=api.url, wait=True, poll=False, timeout=5, download=str(tmp_path))
+
+    assert swab_cli.run_build(session, args, {'app_name': 'App', 'platforms': ['web', 'android']}, str(tmp_path))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['android.bin', 'web.bin']
+
+
+def test_run_build_fails_with_a_failed_platform(api, session):
+    api.events = [dict(DONE, platforms={'web': {'status': 'completed'}, 'ios': {'status': 'error'}})]
+    args = types.SimpleNamespace(api_url=api.url, wait=True, poll=False, timeout=5, download=None)
+
+    assert not swab_cli.run_build(session, args, {'app_name': 'App', 'platforms': ['web', 'ios']}, None)
+
+
+MANIFEST_YAML = """\
+defaults:
+  app_description: Branded app
+  app_version: 1.0.0
+  platforms: [android, web]
+builds:
+  - {app_name: Shop A, package_name: com.shops.a}
+  - {app_name: Shop B, package_name: com.shops.b, platforms: [ios], app_version: 2.0.0}
+"""
+
+
+def test_manifest_merges_defaults_into_each_build(tmp_path):
+    manifest = tmp_path / 'builds.yaml'
+    manifest.write_text(MANIFEST_YAML)
+
+    assert swab_cli.load_manifest(str(manifest)) == [
+        {'app_name': 'Shop A', 'package_name': 'com.shops.a', 'app_description': 'Branded app',
+         'app_version': '1.0.0', 'platforms': ['android', 'web']},
+        {'app_name': 'Shop B', 'package_name': 'com.shops.b', 'app_description': 'Branded app',
+         'app_version': '2.0.0', 'platforms': ['ios']},
+    ]
+
+
+def test_json_manifest_without_pyyaml(tmp_path, monkeypatch):
+    monkeypatch.setattr(swab_cli, 'yaml', None)
+    manifest = tmp_path / 'builds.json'
+    manifest.write_text(json.dumps([{'app_name': 'Shop A', 'platforms': ['web']}]))
+    assert swab_cli.load_manifest(str(manifest)) == [{'app_name': 'Shop A', 'platforms': ['web']}]
+
+    manifest.write_text(MANIFEST_YAML)
+    with pytest.raises(swab_cli.CliError, match='PyYAML'):
+        swab_cli.load_manifest(str(manifest))
+
+
+@pytest.mark.parametrize('content, error', [
+    ('builds: {app_name: Shop A}', 'list of builds'),
+    ('defaults: [web]\nbuilds: []', 'defaults must be a mapping'),
+    ('builds: [Shop A]', 'Build 0'),
+    ('builds: [{app_name: Shop A, platforms: [symbian]}]', 'Shop A: Unsupported platform'),
+])
+def test_invalid_manifests_are_rejected(tmp_path, content, error):
+    manifest = tmp_path / 'builds.yaml'
+    manifest.write_text(content)
+    with pytest.raises(swab_cli.CliError, match=error):
+        swab_cli.load_manifest(str(manifest))
@@ -0,0 +1,222 @@
+"""Round trips and tamper checks for the v1, v2 and v3 .swab project files."""
+import io
+import json
+import os
+import struct
+import zipfile
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+import app as swab
+
+PROJECT = {
+    'app_name': 'Round Trip',
+    'app_description': '',
+    'app_version': '1.2.0',
+    'build_number': '7',
+    'package_name': 'com.example.roundtrip',
+    'web_url': 'https://example.com',
+    'keystore_password': 'secret',
+    'key_alias': 'upload',
+    'key_password': 'secret',
+}
+ICON = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+LARGE = os.urandom(3 * swab.SWAB_CHUNK_SIZE + 123)  # four chunks, the last one short
+
+
+@pytest.fixture
+def client():
+    return swab.app.test_client()
+
+
+def legacy_zip(project, assets):
+    """The zip the pre-v2 save_project encrypted: project.json plus assets/<name>"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr('project.json', json.dumps(project, indent=2))
+        for name, data in assets.items():
+            zipf.writestr(f'assets/{name}', data)
+    return buffer.getvalue()
+
+
+def write_v1(project, assets):
+    return swab.encrypt_data(legacy_zip(project, assets))
+
+
+def write_v2(project, assets):
+    """A v2 container as the intermediate writer laid it out; swab no longer writes these"""
+    data = legacy_zip(project, assets)
+    version = swab.SWAB_KEY_VERSION
+    aead = swab.get_stream_key(version)
+    nonce_prefix = os.urandom(8)
+    header = swab.SWAB_V2_MAGIC + bytes([len(version)]) + version.encode() + nonce_prefix
+    chunks = [data[i:i + swab.SWAB_CHUNK_SIZE] for i in range(0, len(data), swab.SWAB_CHUNK_SIZE)] or [b'']
+    out = [header]
+    for index, chunk in enumerate(chunks):
+        final = index == len(chunks) - 1
+        ciphertext = aead.encrypt(nonce_prefix + struct.pack('>I', index), chunk, swab._chunk_aad(header, index, final))
+        out.append(struct.pack('>I?', len(ciphertext), final) + ciphertext)
+    return b''.join(out)
+
+
+def write_v3(tmp_path, project, assets):
+    refs = []
+    for name, data in assets.items():
+        path = tmp_path / f'asset-{name}'
+        path.write_bytes(data)
+        refs.append((name, str(path)))
+    dst = io.BytesIO()
+    swab.write_project_container(dst, project, refs)
+    return dst.getvalue()
+
+
+def open_file(client, data):
+    return client.post(
+        '/api/project/open',
+        data={'project': (io.BytesIO(data), 'project.swab')},
+        content_type='multipart/form-data',
+    )
+
+
+def read_asset(path):
+    with swab.open_asset(path) as f:
+        return f.read()
+
+
+def flip(data, position):
+    return data[:position] + bytes([data[position] ^ 0x01]) + data[position + 1:]
+
+
+def v3_index_end(data):
+    header_size = len(swab.SWAB_V3_MAGIC) + 1 + data[len(swab.SWAB_V3_MAGIC)] + 8
+    return header_size + 4 + struct.unpack('>I', data[header_size:header_size + 4])[0]
+
+
+@pytest.mark.parametrize('write', [write_v1, write_v2], ids=['v1', 'v2'])
+def test_legacy_files_open(client, write):
+    data = write(PROJECT, {'icon.png': ICON, 'keystore.jks': LARGE})
+
+    response = open_file(client, data)
+    assert response.status_code == 200
+    project = response.get_json()['project']
+    assert {key: project[key] for key in PROJECT} == PROJECT
+    assert read_asset(project['icon_path']) == ICON
+    assert read_asset(project['keystore_path']) == LARGE
+
+
+def test_pre_series_v1_file_still_opens(client):
+    """Exactly what the original save_project produced: no assets folder entries, no new fields"""
+    project = {key: PROJECT[key] for key in ('app_name', 'app_version', 'build_number')}
+    response = open_file(client, write_v1(project, {}))
+
+    assert response.status_code == 200
+    assert response.get_json()['project'] == project
+
+
+@pytest.mark.parametrize('write', [write_v1, write_v2], ids=['v1', 'v2'])
+def test_tampered_legacy_files_are_rejected(client, write):
+    data = write(PROJECT, {'keystore.jks': LARGE})
+
+    for tampered in (flip(data, len(data) // 2), flip(data, len(data) - 1), data[:len(data) // 2], data[:-1]):
+        response = open_file(client, tampered)
+        assert response.status_code == 403
+        assert 'project' not in response.get_json()
+
+
+def test_v2_reader_refuses_truncation_at_a_chunk_boundary():
+    data = write_v2(PROJECT, {'keystore.jks': LARGE})
+    first_chunk_end = len(swab.SWAB_V2_MAGIC) + 1 + len(swab.SWAB_KEY_VERSION) + 8 + swab.SWAB_CHUNK_OVERHEAD + swab.SWAB_CHUNK_SIZE
+
+    with pytest.raises(swab.SwabFormatError):
+        swab.decrypt_stream(io.BytesIO(data[:first_chunk_end]), io.BytesIO())
+
+
+def test_v3_round_trip(tmp_path):
+    data = write_v3(tmp_path, PROJECT, {'icon.png': ICON, 'empty.txt': b'', 'keystore.jks': LARGE})
+    path = tmp_path / 'project.swab'
+    path.write_bytes(data)
+
+    with swab.SwabContainer(str(path)) as container:
+        assert container.project == PROJECT
+        assert {name: entry['size'] for name, entry in container.assets.items()} == {
+            'icon.png': len(ICON), 'empty.txt': 0, 'keystore.jks': len(LARGE),
+        }
+        for name, expected in (('icon.png', ICON), ('empty.txt', b''), ('keystore.jks', LARGE)):
+            out = io.BytesIO()
+            container.extract(name, out)
+            assert out.getvalue() == expected
+        with pytest.raises(KeyError):
+            container.extract('missing', io.BytesIO())
+
+
+def test_v3_save_and_open_through_the_api(client, tmp_path):
+    icon = tmp_path / 'icon.png'
+    icon.write_bytes(ICON)
+    keystore = tmp_path / 'upload.jks'
+    keystore.write_bytes(LARGE)
+
+    saved = client.post('/api/project/save', json=dict(PROJECT, icon_path=str(icon), keystore_path=str(keystore)))
+    assert saved.status_code == 200
+    assert saved.get_data()[:len(swab.SWAB_V3_MAGIC)] == swab.SWAB_V3_MAGIC
+
+    response = open_file(client, saved.get_data())
+    assert response.status_code == 200
+    project = response.get_json()['project']
+    assert {key: project[key] for key in PROJECT} == PROJECT
+    assert project['keystore_path'].startswith(swab.PROJECT_ASSET_SCHEME)
+    assert read_asset(project['keystore_path']) == LARGE
+    assert client.get(project['icon_url']).get_data() == ICON
+
+    # Saving the opened project again copies its assets straight out of the container
+    resaved = client.post('/api/project/save', json=dict(project))
+    assert resaved.status_code == 200
+    reopened = open_file(client, resaved.get_data()).get_json()['project']
+    assert read_asset(reopened['keystore_path']) == LARGE
+
+
+def test_v3_flipped_index_byte_is_rejected(client, tmp_path):
+    data = write_v3(tmp_path, PROJECT, {'icon.png': ICON})
+
+    for position in (len(swab.SWAB_V3_MAGIC) + 2, v3_index_end(data) - 1):  # key version, index tag
+        response = open_file(client, flip(data, position))
+        assert response.status_code == 403
+        assert 'project' not in response.get_json()
+
+
+def test_v3_flipped_chunk_byte_fails_on_extract(client, tmp_path):
+    data = write_v3(tmp_path, PROJECT, {'icon.png': ICON, 'keystore.jks': LARGE})
+    tampered = flip(data, len(data) - 100)  # inside the keystore's last chunk
+    path = tmp_path / 'tampered.swab'
+    path.write_bytes(tampered)
+
+    with swab.SwabContainer(str(path)) as container:
+        out = io.BytesIO()
+        container.extract('icon.png', out)
+        assert out.getvalue() == ICON
+        with pytest.raises(InvalidTag):
+            container.extract('keystore.jks', io.BytesIO())
+
+    project = open_file(client, tampered).get_json()['project']
+    with pytest.raises(InvalidTag):
+        read_asset(project['keystore_path'])
+    config = {'keystore_path': project['keystore_path']}
+    with pytest.raises(swab.SwabFormatError):
+        swab.materialize_project_assets(config, str(tmp_path / 'materialized'))
+    assert not os.path.exists(tmp_path / 'materialized' / 'keystore.jks')
+
+    # The icon endpoint refuses a tampered icon instead of serving part of it
+    tampered = flip(data, v3_index_end(data) + 10)
+    project = open_file(client, tampered).get_json()['project']
+    assert client.get(project['icon_url']).status_code == 403
+
+
+@pytest.mark.parametrize('cut', [1, swab.SWAB_CHUNK_SIZE, len(LARGE)])
+def test_v3_truncated_file_is_rejected(client, tmp_path, cut):
+    data = write_v3(tmp_path, PROJECT, {'icon.png': ICON, 'keystore.jks': LARGE})
+    path = tmp_path / 'truncated.swab'
+    path.write_bytes(data[:-cut])
+
+    with pytest.raises(swab.SwabFormatError):
+        swab.SwabContainer(str(path))
+    assert open_file(client, data[:-cut]).status_code == 403
@@ -0,0 +1,140 @@
+"""Golden-file tests of the in-process app rename done by the project templates.
+
+The Flutter template is rendered for an app name that needs XML, C and RC
+escaping, and every renamed platform file is compared with its checked-in
+copy under tests/golden/. After an intended template change, regenerate them
+with:
+
+    SWAB_UPDATE_GOLDEN=1 python -m pytest tests/test_project_templates.py
+"""
+import os
+import shutil
+
+import pytest
+
+import app as swab
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+CONFIG = {
+    'app_name': 'Tom & Jerry\'s "Best" <App> \\ Co',
+    'app_description': 'Golden file test app',
+    'app_version': '2.3.4',
+    'build_number': '56',
+    'package_name': 'com.example.tomjerry',
+    'web_url': 'https://example.com/?a=1&b=2',
+    'allow_zoom': True,
+    'enable_javascript': True,
+    'enable_dom_storage': True,
+    'enable_geolocation': False,
+    'enable_pull_refresh': True,
+    'show_navigation': False,
+    'enable_file_access': False,
+    'enable_cache': True,
+    'enable_media_autoplay': False,
+}
+
+# The files that set the app label and bundle id on each of the six targets
+RENAMED_FILES = [
+    'android/app/src/main/AndroidManifest.xml',
+    'android/app/build.gradle.kts',
+    'ios/Runner/Info.plist',
+    'ios/Runner.xcodeproj/project.pbxproj',
+    'macos/Runner/Info.plist',
+    'macos/Runner/Configs/AppInfo.xcconfig',
+    'macos/Runner.xcodeproj/project.pbxproj',
+    'windows/CMakeLists.txt',
+    'windows/runner/Runner.rc',
+    'windows/runner/main.cpp',
+    'linux/CMakeLists.txt',
+    'linux/runner/my_application.cc',
+]
+
+
+@pytest.fixture(scope='module')
+def project_dir(tmp_path_factory):
+    project_dir = str(tmp_path_factory.mktemp('golden') / 'project')
+    shutil.copytree(swab.app.config['FLUTTER_TEMPLATE'], project_dir)
+    templates = swab.ProjectTemplates(swab.app.config['FLUTTER_TEMPLATE'], swab.TEMPLATE_SLOTS)
+    templates.render(project_dir, swab.template_values(CONFIG))
+    return project_dir
+
+
+@pytest.mark.parametrize('relpath', RENAMED_FILES)
+def test_rendered_file_matches_golden(project_dir, relpath):
+    with open(os.path.join(project_dir, relpath), encoding='utf-8') as f:
+        rendered = f.read()
+
+    golden_path = os.path.join(GOLDEN_DIR, relpath)
+    if os.getenv('SWAB_UPDATE_GOLDEN') == '1':
+        os.makedirs(os.path.dirname(golden_path), exist_ok=True)
+        with open(golden_path, 'w', encoding='utf-8') as f:
+            f.write(rendered)
+
+    with open(golden_path, encoding='utf-8') as f:
+        assert rendered == f.read()
+
+
+# A customised Gradle template with a release signing block, as the keystore slots expect
+SIGNING_BLOCK = """
+    signingConfigs {
+        create("release") {
+            storeFile = file("{{KEYSTORE_PATH}}")
+            storePassword = "{{KEYSTORE_PASSWORD}}"
+            keyAlias = "{{KEY_ALIAS}}"
+            keyPassword = "{{KEY_PASSWORD}}"
+        }
+    }
+"""
+
+
+@pytest.fixture(scope='module')
+def signing_template(tmp_path_factory):
+    template_dir = tmp_path_factory.mktemp('signing-template')
+    gradle_path = os.path.join(swab.app.config['FLUTTER_TEMPLATE'], 'android', 'app', 'build.gradle.kts')
+    with open(gradle_path, encoding='utf-8') as f:
+        gradle = f.read()
+    gradle = gradle.replace('\n    buildTypes {', SIGNING_BLOCK + '\n    buildTypes {', 1)
+    gradle = gradle.replace('signingConfigs.getByName("debug")', 'signingConfigs.getByName("release")')
+    os.makedirs(template_dir / 'android' / 'app')
+    (template_dir / 'android' / 'app' / 'build.gradle.kts').write_text(gradle, encoding='utf-8')
+    (template_dir / 'upload.jks').write_bytes(b'keystore')
+    return template_dir
+
+
+@pytest.mark.parametrize('keystore', [False, True], ids=['without_keystore', 'with_keystore'])
+def test_release_signing_block(signing_template, tmp_path, keystore):
+    if keystore:
+        values = swab.template_values(dict(
+            CONFIG, keystore_path=str(signing_template / 'upload.jks'),
+            keystore_password='store-pass', key_alias='upload', key_password='key-pass',
+        ))
+        values['keystore_path'] = '/keystores/upload.jks'  # keep the golden file machine independent
+    else:
+        values = swab.template_values(CONFIG)
+
+    templates = swab.ProjectTemplates(str(signing_template), swab.TEMPLATE_SLOTS)
+    templates.render(str(tmp_path), values)
+    with open(tmp_path / 'android' / 'app' / 'build.gradle.kts', encoding='utf-8') as f:
+        rendered = f.read()
+
+    if keystore:
+        assert 'storeFile = file("/keystores/upload.jks")' in rendered
+        assert 'signingConfigs.getByName("release")' in rendered
+    else:
+        assert 'signingConfigs {' not in rendered and 'storeFile' not in rendered
+        assert 'signingConfigs.getByName("debug")' in rendered
+
+    golden_path = os.path.join(GOLDEN_DIR, 'signing', f'build.gradle.{"with" if keystore else "without"}_keystore.kts')
+    if os.getenv('SWAB_UPDATE_GOLDEN') == '1':
+        os.makedirs(os.path.dirname(golden_path), exist_ok=True)
+        with open(golden_path, 'w', encoding='utf-8') as f:
+            f.write(rendered)
+
+    with open(golden_path, encoding='utf-8') as f:
+        assert rendered == f.read()
+
+
+def test_render_is_idempotent(project_dir):
+    templates = swab.ProjectTemplates(swab.app.config['FLUTTER_TEMPLATE'], swab.TEMPLATE_SLOTS)
+    assert templates.render(project_dir, swab.template_values(CONFIG)) == []
@@ -0,0 +1,147 @@
+"""StorageJanitor never reclaims what a queued or running build still needs."""
+import json
+import os
+import time
+import uuid
+
+import pytest
+
+import app as swab
+
+DAY = 86400
+CONFIG = {
+    'app_name': 'Janitor App',
+    'app_description': 'Storage janitor test app',
+    'app_version': '1.0.0',
+    'build_number': '1',
+    'package_name': 'com.example.janitor',
+    'web_url': 'https://example.com',
+    'platforms': ['web'],
+}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """A build queue without workers, so everything submitted stays queued"""
+    queue = swab.BuildQueue(workers=1, capacity=1, max_pending=10, state_path=str(tmp_path / 'queue.json'))
+    monkeypatch.setattr(swab, 'build_queue', queue)
+    return queue
+
+
+@pytest.fixture
+def janitor(tmp_path):
+    for folder in ('builds', 'uploads'):
+        os.makedirs(tmp_path / folder)
+    return swab.StorageJanitor(
+        builds_root=str(tmp_path / 'builds'),
+        uploads_root=str(tmp_path / 'uploads'),
+        output_retention=DAY,
+        upload_retention=DAY,
+        max_bytes=0,
+        interval=0,
+    )
+
+
+def old_build(janitor, state=None):
+    build_id = str(uuid.uuid4())
+    build_dir = os.path.join(janitor.builds_root, build_id, 'outputs')
+    os.makedirs(build_dir)
+    with open(os.path.join(build_dir, 'app.zip'), 'wb') as f:
+        f.write(b'x' * 1000)
+    if state:
+        swab.build_store.set(build_id, state)
+    age(os.path.join(janitor.builds_root, build_id))
+    return build_id
+
+
+def old_upload(janitor, content):
+    path = os.path.join(janitor.uploads_root, f'{uuid.uuid4().hex}.jks')
+    with open(path, 'wb') as f:
+        f.write(content)
+    age(path)
+    return path
+
+
+def age(path, days=30):
+    then = time.time() - days * DAY
+    os.utime(path, (then, then))
+
+
+def exists(janitor, build_id):
+    return os.path.isdir(os.path.join(janitor.builds_root, build_id))
+
+
+@pytest.mark.parametrize('status', ['queued', 'preparing', 'dependencies', 'building'])
+def test_unfinished_builds_are_kept(janitor, queue, status):
+    unfinished = old_build(janitor, {'status': status})
+    finished = old_build(janitor, {'status': 'completed'})
+    failed = old_build(janitor, {'status': 'error'})
+
+    reclaimed = janitor.collect()
+
+    assert exists(janitor, unfinished)
+    assert not exists(janitor, finished)
+    assert not exists(janitor, failed)
+    assert reclaimed['expired'] == 2000
+
+
+def test_queued_build_is_kept(janitor, queue):
+    build_id = old_build(janitor)
+    queue.submit(build_id, dict(CONFIG))
+    assert swab.build_store.get(build_id)['status'] == 'queued'
+
+    janitor.collect()
+
+    assert exists(janitor, build_id)
+
+
+def test_quota_skips_unfinished_builds(janitor, queue):
+    janitor.output_retention = 0
+    janitor.max_bytes = 1
+    unfinished = old_build(janitor, {'status': 'building'})
+    finished = old_build(janitor, {'status': 'completed'})
+
+    assert janitor.collect() == {'quota': 1000}
+    assert exists(janitor, unfinished)
+    assert not exists(janitor, finished)
+
+
+def test_uploads_of_queued_builds_are_kept(janitor, queue):
+    referenced = old_upload(janitor, b'keystore of a queued build')
+    unreferenced = old_upload(janitor, b'keystore nobody uses')
+    queue.submit(str(uuid.uuid4()), dict(CONFIG, keystore_path=referenced))
+
+    janitor.collect()
+
+    assert os.path.exists(referenced)
+    assert not os.path.exists(unreferenced)
+
+
+def test_uploads_of_builds_queued_by_another_process_are_kept(janitor, queue, monkeypatch):
+    monkeypatch.setattr(swab, 'PROJECT_CONTAINER_FOLDER', os.path.join(janitor.uploads_root, 'projects'))
+    referenced = old_upload(janitor, b'icon of a build queued elsewhere')
+    project = os.path.join(janitor.uploads_root, 'projects', f'{"c" * 64}.swab')
+    os.makedirs(os.path.dirname(project))
+    with open(project, 'wb') as f:
+        f.write(b'opened project')
+    age(project)
+
+    # The queue state another process persisted; this one has never seen the builds in memory
+    with open(queue.state_path, 'w') as f:
+        json.dump([
+            {'build_id': str(uuid.uuid4()), 'config': dict(CONFIG, icon_path=referenced), 'submitted_at': time.time()},
+            {'build_id': str(uuid.uuid4()), 'config': dict(CONFIG, keystore_path=f'swab://{"c" * 64}/keystore.jks'),
+             'submitted_at': time.time()},
+        ], f)
+
+    janitor.collect()
+
+    assert os.path.exists(referenced)
+    assert os.path.exists(project)
+    assert swab.upload_store.stats()['referenced_files'] == 2
+
+    with open(queue.state_path, 'w') as f:
+        f.write('[]')
+    janitor.collect()
+    assert not os.path.exists(referenced)
+    assert not os.path.exists(project)
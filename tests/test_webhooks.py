@@ -0,0 +1,177 @@
+"""WebhookDispatcher against a local HTTP stand-in for a webhook receiver."""
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+import app as swab
+
+
+class Receiver(http.server.ThreadingHTTPServer):
+    """Answers each POST with the next scripted status code, 200 once the script is used up"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ReceiverHandler)
+        self.statuses = []
+        self.requests = []
+        self.received = threading.Condition()
+        self.release = threading.Event()
+        self.release.set()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/hook'
+
+    def wait_for(self, count, timeout=5):
+        with self.received:
+            assert self.received.wait_for(lambda: len(self.requests) >= count, timeout), self.requests
+
+
+class ReceiverHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is visible
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.received:
+            server.requests.append({'port': self.client_address[1], 'body': body})
+            status = server.statuses.pop(0) if server.statuses else 200
+            server.received.notify_all()
+        server.release.wait(10)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    server = Receiver()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    def make(**options):
+        options = dict({'workers': 1, 'max_attempts': 3, 'backoff': 0.01, 'timeout': 5}, **options)
+        return swab.WebhookDispatcher(str(tmp_path / 'dead_letters.jsonl'), **options)
+    return make
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('status', [500, 503, 429])
+def test_retries_transient_errors_with_backoff(receiver, dispatcher, monkeypatch, status):
+    delays = []
+    monkeypatch.setattr(swab.random, 'uniform', lambda low, high: delays.append((low, high)) or high)
+    receiver.statuses = [status, status]
+    hooks = dispatcher()
+
+    assert hooks.notify(receiver.url, {'build_id': 'b1'})
+    receiver.wait_for(3)
+    wait_until(lambda: hooks.stats()['delivered'] == 1)
+
+    assert [r['body'] for r in receiver.requests] == [{'build_id': 'b1'}] * 3
+    assert delays == [(0, 0.01), (0, 0.02)]  # full jitter over an exponentially growing cap
+    assert hooks.stats()['retried'] == 2
+    assert hooks.dead_letters() == []
+
+
+def test_dead_letters_after_last_attempt(receiver, dispatcher):
+    receiver.statuses = [503, 503, 503]
+    hooks = dispatcher()
+
+    hooks.notify(receiver.url, {'build_id': 'b2'})
+    wait_until(lambda: hooks.stats()['failed'] == 1)
+
+    assert len(receiver.requests) == 3
+    [letter] = hooks.dead_letters()
+    assert letter['reason'] == 'failed'
+    assert letter['error'] == 'HTTP 503'
+    assert letter['attempts'] == 3
+    assert letter['payload'] == {'build_id': 'b2'}
+
+
+@pytest.mark.parametrize('status', [400, 404, 410])
+def test_other_client_errors_are_not_retried(receiver, dispatcher, status):
+    receiver.statuses = [status]
+    hooks = dispatcher()
+
+    hooks.notify(receiver.url, {'build_id': 'b3'})
+    wait_until(lambda: hooks.stats()['failed'] == 1)
+    time.sleep(0.05)
+
+    assert len(receiver.requests) == 1
+    assert hooks.stats()['retried'] == 0
+    assert hooks.dead_letters()[0]['error'] == f'HTTP {status}'
+
+
+def test_queue_overflow_is_dead_lettered(receiver, dispatcher):
+    hooks = dispatcher(queue_size=1)
+    receiver.release.clear()
+
+    assert hooks.notify(receiver.url, {'n': 1})
+    receiver.wait_for(1)  # the only worker is now busy with the first delivery
+    assert hooks.notify(receiver.url, {'n': 2})
+    assert not hooks.notify(receiver.url, {'n': 3})
+
+    [letter] = hooks.dead_letters()
+    assert letter['reason'] == 'dropped'
+    assert letter['payload'] == {'n': 3}
+    assert hooks.stats()['dropped'] == 1
+
+    receiver.release.set()
+    wait_until(lambda: hooks.stats()['delivered'] == 2)
+
+
+def test_reuses_one_session_and_connection_per_host(receiver, dispatcher):
+    hooks = dispatcher()
+    for n in range(3):
+        hooks.notify(receiver.url, {'n': n})
+        wait_until(lambda: hooks.stats()['delivered'] == n + 1)
+
+    assert len({r['port'] for r in receiver.requests}) == 1
+    assert len(hooks._sessions) == 1
+
+    hooks.notify(receiver.url.replace('127.0.0.1', 'localhost'), {'n': 3})
+    wait_until(lambda: hooks.stats()['delivered'] == 4)
+    assert len(hooks._sessions) == 2
+
+
+def test_records_latency_and_result_counters(receiver, dispatcher):
+    def count(result):
+        return swab.metrics.value('swab_webhook_deliveries_total', {'result': result})
+
+    def observed(result):
+        histogram = swab.metrics.value('swab_webhook_duration_seconds', {'result': result})
+        return histogram[-1] if histogram else 0
+
+    before = {result: (count(result), observed(result)) for result in ('delivered', 'retry', 'failed')}
+    receiver.statuses = [503, 200, 404]
+    hooks = dispatcher()
+
+    hooks.notify(receiver.url, {'n': 1})
+    wait_until(lambda: hooks.stats()['delivered'] == 1)
+    hooks.notify(receiver.url, {'n': 2})
+    wait_until(lambda: hooks.stats()['failed'] == 1)
+
+    for result in ('delivered', 'retry', 'failed'):
+        assert count(result) == before[result][0] + 1
+        assert observed(result) == before[result][1] + 1
+    assert 'swab_webhook_duration_seconds_count{result="failed"}' in swab.metrics.render()
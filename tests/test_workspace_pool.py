@@ -0,0 +1,105 @@
+"""Warm workspace checkout: only app fields are rendered and resolution is skipped."""
+import os
+
+import pytest
+
+import app as swab
+
+CONFIG = {
+    'app_name': 'Pool App',
+    'app_description': 'Checked out of the workspace pool',
+    'app_version': '3.1.0',
+    'build_number': '12',
+    'package_name': 'com.example.poolapp',
+    'web_url': 'https://example.com',
+    'allow_zoom': True,
+    'enable_javascript': True,
+    'enable_dom_storage': True,
+    'enable_geolocation': True,
+    'enable_pull_refresh': True,
+    'show_navigation': True,
+    'enable_file_access': True,
+    'enable_cache': True,
+    'enable_media_autoplay': False,
+}
+
+
+@pytest.fixture
+def pub_get(monkeypatch):
+    """Stand-in for the toolchain that records every `flutter pub get` and writes what it would"""
+    calls = []
+
+    def run_toolchain(command, cwd, log, timeout):
+        calls.append(cwd)
+        os.makedirs(os.path.join(cwd, '.dart_tool'), exist_ok=True)
+        with open(os.path.join(cwd, '.dart_tool', 'package_config.json'), 'w') as f:
+            f.write('{}')
+        with open(os.path.join(cwd, 'pubspec.lock'), 'w') as f:
+            f.write('packages: {}\n')
+
+    monkeypatch.setattr(swab, 'run_toolchain', run_toolchain)
+    return calls
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return swab.WorkspacePool(str(tmp_path / 'pool'), swab.app.config['FLUTTER_TEMPLATE'], size=1, refill_interval=0)
+
+
+def check_out(pool, tmp_path):
+    workspace = pool._prepare()
+    assert workspace
+    pool._ready.append(workspace)
+    project_dir = str(tmp_path / 'project')
+    assert pool.checkout(project_dir)
+    swab.project_templates.render(project_dir, swab.template_values(CONFIG))
+    return project_dir
+
+
+def test_checkout_renders_app_fields_and_skips_resolution(pool, pub_get, tmp_path):
+    project_dir = check_out(pool, tmp_path)
+    assert len(pub_get) == 1  # the pool's own resolution
+
+    with open(os.path.join(project_dir, 'pubspec.yaml')) as f:
+        pubspec = f.read()
+    assert 'name: poolapp' in pubspec
+    assert 'version: 3.1.0+12' in pubspec
+
+    assert swab.resolve_dependencies(project_dir) is False
+    assert len(pub_get) == 1
+    package_config = os.path.join(project_dir, '.dart_tool', 'package_config.json')
+    assert os.path.getmtime(os.path.join(project_dir, 'pubspec.yaml')) <= os.path.getmtime(package_config)
+
+
+def test_changed_dependencies_are_resolved(pool, pub_get, tmp_path):
+    project_dir = check_out(pool, tmp_path)
+    pubspec_path = os.path.join(project_dir, 'pubspec.yaml')
+    with open(pubspec_path) as f:
+        pubspec = f.read()
+    with open(pubspec_path, 'w') as f:
+        f.write(pubspec.replace('dependencies:', 'dependencies:\n  http: ^1.2.0', 1))
+
+    assert swab.resolve_dependencies(project_dir) is True
+    assert swab.resolve_dependencies(project_dir) is False
+    assert len(pub_get) == 2
+
+
+def test_changed_lockfile_is_resolved(pool, pub_get, tmp_path):
+    project_dir = check_out(pool, tmp_path)
+    with open(os.path.join(project_dir, 'pubspec.lock'), 'a') as f:
+        f.write('# edited\n')
+
+    assert swab.resolve_dependencies(project_dir) is True
+    assert len(pub_get) == 2
+
+
+def test_start_only_removes_pool_workspaces(pool, monkeypatch):
+    monkeypatch.setattr(pool, '_refill', lambda: None)
+    stale = [f'ready-{"a" * 32}', f'preparing-{"b" * 32}']
+    kept = ['notes', 'ready-backup']
+    for name in stale + kept:
+        os.makedirs(os.path.join(pool.root, name))
+
+    pool.start()
+
+    assert sorted(os.listdir(pool.root)) == sorted(kept)